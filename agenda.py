@@ -0,0 +1,43 @@
+"""
+Due-date queries: the agenda, overdue and due-soon views, without rendering the board.
+
+Every query is one range on ``idx_card_due_date_column`` (due_at, column_id).
+SQLite walks the index from the first due date in range to the last, already
+in due order, and skips Done cards on the index entry itself, so only the
+cards returned are read from the table; the per-day counts for a calendar
+strip never leave the index. Days are local calendar days, as on the board's
+due badges (card_cache.card_view). Subcards are included; they are open or
+Done with their top-level card, since moving a card to another column moves
+its subtree along (tree.py).
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from config import DONE_COLUMN_ID
+from models import Card
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def _open_due(start: Optional[date], end: Optional[date]) -> List:
+    """Conditions: not Done and due on a day from ``start`` to ``end``, both included (None: unbounded)"""
+    conditions = [Card.due_at >= _day_start(start) if start else Card.due_at.is_not(None),
+                  Card.column_id != DONE_COLUMN_ID]
+    if end:
+        conditions.append(Card.due_at < _day_start(end + timedelta(days=1)))
+    return conditions
+
+
+def due_cards(db: Session, start: Optional[date], end: Optional[date], limit: int) -> List[Card]:
+    """Open cards due from ``start`` to ``end``, soonest first, at most ``limit``"""
+    return db.scalars(select(Card).where(*_open_due(start, end)).order_by(Card.due_at).limit(limit)).all()
+
+
+def day_counts(db: Session, start: Optional[date], end: Optional[date]) -> Dict[str, int]:
+    """Open cards due per day ("YYYY-MM-DD" -> count), for the days that have any"""
+    day = func.date(Card.due_at)
+    return dict(db.execute(select(day, func.count()).where(*_open_due(start, end)).group_by(day).order_by(day)).all())
+
@@ -0,0 +1,549 @@
+"""
+Card operations behind kanban_agent.py (SQLAlchemy ORM).
+
+kanban_agent.py re-exports everything here and only imports this module when
+a command needs it; the read-only commands live in agent_reads.py.
+"""
+import sys
+import os
+import json
+import inspect
+from datetime import datetime
+from typing import Optional, List, Dict
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+# Add current directory to path to import local modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db import get_db, retry_on_busy, is_busy_error
+from models import Card
+from schema import ensure_schema
+from agent_reads import COLUMN_NAMES, get_column_id, list_cards, list_changes, list_due, get_agenda, get_subtree, get_status
+import search
+import ordering
+import mutations
+import archive
+import changes
+import tree
+from mutations import touch_card
+
+@retry_on_busy
+def ensure_setup() -> None:
+    """Ensure database and initial setup exists (one version check once it does)"""
+    ensure_schema()
+
+def _commit_if_ok(fn, *args, **kwargs) -> Dict:
+    """Run one write op in its own session; commit it only if it succeeded"""
+    ensure_setup()
+
+    with next(get_db()) as db:
+        result = fn(db, *args, **kwargs)
+        if result["success"]:
+            db.commit()
+        return result
+
+@retry_on_busy
+def add_card(title: str, notes: str = "", column: str = "todo", due_date: str = None) -> Dict:
+    """Add a new card to the specified column"""
+    return _commit_if_ok(_add_card, title, notes, column, due_date)
+
+def _add_card(db: Session, title: str, notes: str = "", column: str = "todo", due_date: str = None) -> Dict:
+    column_id = get_column_id(column)
+    if not column_id:
+        return {"success": False, "error": f"Invalid column: {column}. Use 'todo', 'doing', or 'done'"}
+
+    # Get next position in column
+    pos = ordering.next_position(db, column_id)
+
+    card = Card(
+        column_id=column_id,
+        title=title,
+        notes=notes,
+        position=pos
+    )
+
+    if due_date:
+        try:
+            card.due_at = datetime.fromisoformat(due_date)
+        except ValueError:
+            return {"success": False, "error": f"Invalid date format: {due_date}. Use YYYY-MM-DD format"}
+
+    db.add(card)
+    db.flush()
+
+    return {
+        "success": True,
+        "card_id": card.id,
+        "title": card.title,
+        "column": column,
+        "position": card.position
+    }
+
+@retry_on_busy
+def move_card(card_id: int, column: str) -> Dict:
+    """Move a card to a different column"""
+    return _commit_if_ok(_move_card, card_id, column)
+
+def _move_card(db: Session, card_id: int, column: str) -> Dict:
+    column_id = get_column_id(column)
+    if not column_id:
+        return {"success": False, "error": f"Invalid column: {column}"}
+
+    card = db.get(Card, card_id)
+    if not card:
+        return {"success": False, "error": f"Card {card_id} not found"}
+
+    if card.parent_id is not None and column_id != card.column_id:
+        return {"success": False,
+                "error": f"Card {card_id} is a subcard: it moves with its top-level card ({card.path.split('/')[0]})"}
+
+    old_column = ["", "todo", "doing", "done"][card.column_id]
+
+    # Append to the end of its new siblings (same sparse ordering as the web app)
+    pos = ordering.next_position(db, column_id, card.parent_id)
+
+    card.column_id = column_id
+    card.position = pos
+    touch_card(db, card_id)
+    db.flush()
+
+    return {
+        "success": True,
+        "card_id": card_id,
+        "title": card.title,
+        "moved_from": old_column,
+        "moved_to": column,
+        "new_position": pos
+    }
+
+@retry_on_busy
+def reparent_card(card_id: int, parent_id: Optional[int]) -> Dict:
+    """Make a card (with its subcards) a subcard of another card, or a top-level card with parent_id None"""
+    return _commit_if_ok(_reparent_card, card_id, parent_id)
+
+def _reparent_card(db: Session, card_id: int, parent_id: Optional[int]) -> Dict:
+    card = db.get(Card, card_id)
+    if not card:
+        return {"success": False, "error": f"Card {card_id} not found"}
+
+    old_parent = card.parent_id
+    try:
+        tree.reparent(db, card, parent_id)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    return {
+        "success": True,
+        "card_id": card_id,
+        "title": card.title,
+        "old_parent_id": old_parent,
+        "parent_id": parent_id,
+        "column": COLUMN_NAMES[card.column_id],
+        "new_position": card.position
+    }
+
+@retry_on_busy
+def update_card(card_id: int, title: Optional[str] = None, notes: Optional[str] = None, due_date: Optional[str] = None) -> Dict:
+    """Update card details"""
+    return _commit_if_ok(_update_card, card_id, title, notes, due_date)
+
+def _update_card(db: Session, card_id: int, title: Optional[str] = None, notes: Optional[str] = None, due_date: Optional[str] = None) -> Dict:
+    card = db.get(Card, card_id)
+    if not card:
+        return {"success": False, "error": f"Card {card_id} not found"}
+
+    if title is not None:
+        card.title = title
+    if notes is not None:
+        card.notes = notes
+    if due_date is not None:
+        if due_date == "":
+            card.due_at = None
+        else:
+            try:
+                card.due_at = datetime.fromisoformat(due_date)
+            except ValueError:
+                return {"success": False, "error": f"Invalid date format: {due_date}"}
+
+    touch_card(db, card_id)
+    db.flush()
+    column_name = ["", "todo", "doing", "done"][card.column_id]
+
+    return {
+        "success": True,
+        "card_id": card_id,
+        "title": card.title,
+        "notes": card.notes,
+        "column": column_name,
+        "due_at": card.due_at.isoformat() if card.due_at else None
+    }
+
+@retry_on_busy
+def remove_card(card_id: int) -> Dict:
+    """Remove a card and all its checklist items"""
+    return _commit_if_ok(_remove_card, card_id)
+
+def _remove_card(db: Session, card_id: int) -> Dict:
+    # Subcards and checklist items are deleted by the database (ON DELETE CASCADE)
+    rows = mutations.delete_cards(db, [card_id])
+    if not rows:
+        return {"success": False, "error": f"Card {card_id} not found"}
+
+    return {
+        "success": True,
+        "card_id": card_id,
+        "title": rows[0].title,
+        "column": COLUMN_NAMES[rows[0].column_id],
+        "message": "Card deleted successfully"
+    }
+
+@retry_on_busy
+def purge_done(older_than_days: float) -> Dict:
+    """Delete Done cards completed more than N days ago, with their subcards and checklists"""
+    return _commit_if_ok(_purge_done, older_than_days)
+
+def _purge_done(db: Session, older_than_days: float) -> Dict:
+    if older_than_days < 0:
+        return {"success": False, "error": "older_than_days must not be negative"}
+    rows = mutations.delete_done_cards(db, older_than_days)
+    return {
+        "success": True,
+        "deleted": len(rows),
+        "card_ids": [row.id for row in rows],
+        "message": f"Deleted {len(rows)} Done card(s) completed more than {older_than_days:g} day(s) ago"
+    }
+
+@retry_on_busy
+def compact_changes() -> Dict:
+    """Merge old change log entries per card/item and drop those past the retention window"""
+    return _commit_if_ok(_compact_changes)
+
+def _compact_changes(db: Session) -> Dict:
+    compacted, pruned = changes.compact(db), changes.prune(db)
+    return {
+        "success": True,
+        "compacted": compacted,
+        "pruned": pruned,
+        "message": f"Merged {compacted} superseded change(s), pruned {pruned} expired change(s)"
+    }
+
+@retry_on_busy
+def archive_done(older_than_days: float) -> Dict:
+    """Move Done cards completed more than N days ago into the archive (archive.db)"""
+    if older_than_days < 0:
+        return {"success": False, "error": "older_than_days must not be negative"}
+    ensure_setup()
+
+    with next(get_db()) as db:
+        card_ids = archive.archive_done(db, older_than_days)
+        return {
+            "success": True,
+            "archived": len(card_ids),
+            "card_ids": card_ids,
+            "message": f"Archived {len(card_ids)} Done card(s) completed more than {older_than_days:g} day(s) ago"
+        }
+
+def list_archive(limit: int = 50, offset: int = 0) -> Dict:
+    """List archived cards, most recently archived first"""
+    ensure_setup()
+
+    with next(get_db()) as db:
+        result = archive.list_archived(db, limit, offset)
+        for card in result["cards"]:
+            card["column"] = COLUMN_NAMES[card.pop("column_id")]
+        return {"success": True, "cards": result["cards"], "count": len(result["cards"]), "total": result["total"]}
+
+def search_archive(query: str, limit: int = 20) -> Dict:
+    """Full-text search over archived cards"""
+    ensure_setup()
+
+    with next(get_db()) as db:
+        results = archive.search_archived(db, query, limit=limit)
+        for r in results:
+            r["column"] = COLUMN_NAMES[r.pop("column_id")]
+        return {"success": True, "query": query, "results": results, "count": len(results)}
+
+@retry_on_busy
+def restore_card(card_id: int) -> Dict:
+    """Move an archived card (with its subcards and checklists) back onto the board"""
+    return _commit_if_ok(_restore_card, card_id)
+
+def _restore_card(db: Session, card_id: int) -> Dict:
+    restored = archive.restore(db, card_id)
+    if not restored:
+        return {"success": False, "error": f"Card {card_id} not found in the archive"}
+    return {
+        "success": True,
+        "card_id": restored["id"],
+        "cards": restored["cards"],
+        "checklist_items": restored["checklist_items"],
+        "message": f"Restored card {card_id}" + (f" as card {restored['id']}" if restored["id"] != card_id else "")
+    }
+
+@retry_on_busy
+def add_checklist(card_id: int, text: str) -> Dict:
+    """Add a checklist item to a card"""
+    return _commit_if_ok(_add_checklist, card_id, text)
+
+def _add_checklist(db: Session, card_id: int, text: str) -> Dict:
+    card = db.get(Card, card_id)
+    if not card:
+        return {"success": False, "error": f"Card {card_id} not found"}
+
+    # Appends at the next position and updates the card's checklist counters
+    item = mutations.add_checklist_item(db, card_id, text)
+
+    return {
+        "success": True,
+        "item_id": item.id,
+        "card_id": card_id,
+        "text": item.text,
+        "done": item.done,
+        "position": item.position
+    }
+
+@retry_on_busy
+def toggle_checklist(item_id: int) -> Dict:
+    """Toggle completion status of a checklist item"""
+    return _commit_if_ok(_toggle_checklist, item_id)
+
+def _toggle_checklist(db: Session, item_id: int) -> Dict:
+    item = mutations.toggle_checklist_item(db, item_id)
+    if not item:
+        return {"success": False, "error": f"Checklist item {item_id} not found"}
+
+    return {
+        "success": True,
+        "item_id": item.id,
+        "card_id": item.card_id,
+        "text": item.text,
+        "done": item.done
+    }
+
+def search_cards(query: str, limit: int = 20) -> Dict:
+    """Full-text search over card titles, notes and checklist items (prefix matching)"""
+    ensure_setup()
+
+    with next(get_db()) as db:
+        results = search.query(db, query, limit=limit)
+        for r in results:
+            r["column"] = ["", "todo", "doing", "done"][r.pop("column_id")]
+
+        return {"success": True, "query": query, "results": results, "count": len(results)}
+
+@retry_on_busy
+def check_counters(fix: bool = False) -> Dict:
+    """Compare the denormalized checklist counters on cards with their checklist items"""
+    ensure_setup()
+
+    with next(get_db()) as db:
+        drift = mutations.find_checklist_drift(db)
+        if drift and fix:
+            mutations.recount_checklists(db, [d["card_id"] for d in drift])
+            db.commit()
+
+        return {
+            "success": True,
+            "consistent": not drift,
+            "mismatches": drift,
+            "fixed": bool(drift and fix)
+        }
+
+# Batch mode: many ops, one process, one setup, few transactions
+BATCH_OPS = {
+    "add": _add_card,
+    "move": _move_card,
+    "reparent": _reparent_card,
+    "update": _update_card,
+    "remove": _remove_card,
+    "checklist": _add_checklist,
+    "toggle": _toggle_checklist,
+}
+
+def _apply_op(db: Session, op: Dict) -> Dict:
+    """Apply one batch op inside a savepoint, so a failed op leaves no trace"""
+    if not isinstance(op, dict) or op.get("op") not in BATCH_OPS:
+        kind = op.get("op") if isinstance(op, dict) else op
+        return {"success": False, "error": f"Unknown op: {kind}. Use one of: {', '.join(BATCH_OPS)}"}
+    fields = {k: v for k, v in op.items() if k != "op"}
+
+    savepoint = db.begin_nested()
+    try:
+        result = BATCH_OPS[op["op"]](db, **fields)
+    except Exception as e:
+        savepoint.rollback()
+        if is_busy_error(e):
+            raise  # retried by _apply_chunk as a whole
+        return {"success": False, "error": f"{type(e).__name__}: {e}"}
+    if result["success"]:
+        savepoint.commit()
+    else:
+        savepoint.rollback()
+    return result
+
+@retry_on_busy
+def _apply_chunk(db: Session, chunk: List, continue_on_error: bool) -> List[Dict]:
+    """
+    Apply a chunk of (line_no, op) pairs in one transaction.
+
+    Stops at the first failed op unless ``continue_on_error``; the chunk is then
+    rolled back as a whole and its earlier ops are reported as rolled back.
+    """
+    # Take the write lock up front: a deferred transaction that later upgrades to
+    # a writer is the usual SQLITE_BUSY case, and pysqlite only emits BEGIN on the
+    # first DML, which would turn the first SAVEPOINT into the outer transaction
+    db.execute(text("BEGIN IMMEDIATE"))
+    results = []
+    for line_no, op in chunk:
+        result = _apply_op(db, op) if not isinstance(op, Exception) else {"success": False, "error": f"Invalid JSON: {op}"}
+        results.append({"line": line_no, "op": op.get("op") if isinstance(op, dict) else None, **result})
+        if not result["success"] and not continue_on_error:
+            db.rollback()
+            rolled_back = {"success": False, "error": f"Rolled back: batch stopped at line {line_no}"}
+            return [{"line": r["line"], "op": r["op"], **rolled_back} for r in results[:-1]] + results[-1:]
+    db.commit()
+    return results
+
+def _read_ops(lines):
+    """(line_no, op) for every non-blank line; unparsable lines yield the exception"""
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+def run_batch(lines, chunk_size: int = 1000, continue_on_error: bool = False, out=sys.stdout) -> Dict:
+    """
+    Apply newline-delimited JSON ops, e.g. ``{"op": "add", "title": "Task", "column": "todo"}``.
+
+    Ops take the same fields as the single-command functions (add_card,
+    move_card, update_card, remove_card, add_checklist, toggle_checklist):
+    ``add`` (title, notes, column, due_date), ``move`` (card_id, column),
+    ``update`` (card_id, title, notes, due_date), ``remove`` (card_id),
+    ``checklist`` (card_id, text) and ``toggle`` (item_id).
+
+    Setup runs once and ops are committed ``chunk_size`` at a time (0 = the whole
+    batch in one transaction). One JSON result line per op is written to ``out``
+    after its chunk commits. Without ``continue_on_error`` the first failure
+    rolls back its chunk and ends the batch; chunks already committed stay.
+    """
+    ensure_setup()
+
+    summary = {"success": False, "applied": 0, "failed": 0, "stopped_at": None}
+    with next(get_db()) as db:
+        chunk = []
+        ops = _read_ops(lines)
+        while True:
+            for item in ops:
+                chunk.append(item)
+                if chunk_size and len(chunk) >= chunk_size:
+                    break
+            if not chunk:
+                break
+            results = _apply_chunk(db, chunk, continue_on_error)
+            for r in results:
+                out.write(json.dumps(r, default=str) + "\n")
+                summary["applied" if r["success"] else "failed"] += 1
+            out.flush()
+            db.expunge_all()  # committed; don't keep every imported card in memory
+            if not continue_on_error and not results[-1]["success"]:
+                summary["stopped_at"] = results[-1]["line"]
+                break
+            chunk = []
+
+    summary["success"] = summary["failed"] == 0
+    return summary
+
+# Persistent JSON-RPC 2.0 server: one warm process instead of one per call
+RPC_METHODS = {fn.__name__: fn for fn in (
+    add_card, list_cards, list_changes, compact_changes, move_card, reparent_card, update_card, remove_card,
+    add_checklist, toggle_checklist, get_status, get_subtree, list_due, get_agenda, search_cards, check_counters, purge_done,
+    archive_done, list_archive, search_archive, restore_card,
+)}
+
+def _rpc_error(request_id, code: int, message: str) -> Dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+def handle_rpc(request) -> Optional[Dict]:
+    """
+    Answer one JSON-RPC 2.0 request. ``params`` may be a list (positional) or an
+    object (keyword arguments) for the function named by ``method``. Returns
+    None for notifications (requests without an ``id``).
+    """
+    if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+        return _rpc_error(None, -32600, "Invalid Request")
+    request_id = request.get("id")
+    fn = RPC_METHODS.get(request["method"])
+    params = request.get("params", [])
+    if fn is None:
+        response = _rpc_error(request_id, -32601, f"Method not found: {request['method']}")
+    elif not isinstance(params, (list, dict)):
+        response = _rpc_error(request_id, -32602, "Invalid params: expected an array or object")
+    else:
+        args, kwargs = (params, {}) if isinstance(params, list) else ([], params)
+        try:
+            inspect.signature(fn).bind(*args, **kwargs)
+        except TypeError as e:
+            return _rpc_error(request_id, -32602, f"Invalid params: {e}") if "id" in request else None
+        try:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": fn(*args, **kwargs)}
+        except Exception as e:
+            response = _rpc_error(request_id, -32603, f"{type(e).__name__}: {e}")
+    return response if "id" in request else None
+
+def _rpc_line(line: str) -> Optional[str]:
+    """One line in, one line out (or None); a JSON array is a JSON-RPC batch"""
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return json.dumps(_rpc_error(None, -32700, "Parse error"))
+    if isinstance(request, list):
+        responses = [r for r in map(handle_rpc, request) if r is not None] if request else [_rpc_error(None, -32600, "Invalid Request")]
+        return json.dumps(responses, default=str) if responses else None
+    response = handle_rpc(request)
+    return json.dumps(response, default=str) if response is not None else None
+
+def serve_stdio(stdin=sys.stdin, stdout=sys.stdout) -> None:
+    """Serve newline-delimited JSON-RPC requests on stdin until EOF"""
+    ensure_setup()
+    for line in stdin:
+        if not line.strip():
+            continue
+        reply = _rpc_line(line)
+        if reply is not None:
+            stdout.write(reply + "\n")
+            stdout.flush()
+
+def serve_socket(path: str) -> None:
+    """Serve newline-delimited JSON-RPC on a local Unix socket, one thread per client"""
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                line = raw.decode("utf-8")
+                if not line.strip():
+                    continue
+                reply = _rpc_line(line)
+                if reply is not None:
+                    self.wfile.write((reply + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    ensure_setup()
+    if os.path.exists(path):
+        os.unlink(path)  # stale socket from a previous run
+    with Server(path, Handler) as server:
+        os.chmod(path, 0o600)
+        print(f"Kanban agent listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(path)
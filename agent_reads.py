@@ -0,0 +1,250 @@
+"""
+Read-only kanban_agent.py commands on plain sqlite3.
+
+``status`` and ``list`` are the most frequent agent calls and need no ORM
+(nor do ``changes``, the change feed for pollers, ``subtree`` and ``due``), so they skip the SQLAlchemy import entirely. They fall back to the full setup in
+agent_ops.py only when the database is missing or its schema is behind.
+"""
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+from urllib.parse import quote
+from config import DB_PATH, BUSY_TIMEOUT_MS, SCHEMA_VERSION, DONE_COLUMN_ID, DUE_SOON_DAYS
+
+COLUMN_NAMES = ["", "todo", "doing", "done"]
+
+
+def get_column_id(column_name: str) -> Optional[int]:
+    """Get column ID by name (case insensitive)"""
+    column_map = {"todo": 1, "doing": 2, "done": 3}
+    return column_map.get(column_name.lower())
+
+
+def _connect() -> sqlite3.Connection:
+    """Connection to a database with the current schema, creating/migrating it first if needed"""
+    try:
+        # mode=rw: never create an empty file here, setup below does that properly
+        conn = sqlite3.connect(f"file:{quote(DB_PATH)}?mode=rw", uri=True, timeout=BUSY_TIMEOUT_MS / 1000)
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return conn
+        conn.close()
+    except sqlite3.OperationalError:
+        pass
+    import agent_ops
+    agent_ops.ensure_setup()
+    return sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000)
+
+
+_CARD_COLUMNS = "id, title, notes, column_id, position, due_at, checklist_total, checklist_done"
+
+
+def _card_dict(row) -> Dict:
+    card_id, title, notes, column_id, position, due_at, checklist_total, checklist_done = row
+    return {
+        "id": card_id,
+        "title": title,
+        "notes": notes,
+        "column": COLUMN_NAMES[column_id],
+        "position": position,
+        "due_at": datetime.fromisoformat(due_at).isoformat() if due_at else None,
+        "checklist_count": checklist_total,
+        "checklist_done": checklist_done
+    }
+
+
+def _latest_change(conn: sqlite3.Connection) -> int:
+    # As changes.latest_id: the pruning horizon once the log is empty, so seq never goes backwards
+    return conn.execute("SELECT max(coalesce((SELECT max(id) FROM card_changes), 0), "
+                        "coalesce((SELECT pruned_through FROM card_changes_state), 0))").fetchone()[0]
+
+
+def _horizon(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT pruned_through FROM card_changes_state").fetchone()
+    return row[0] if row else 0
+
+
+def list_cards(column: Optional[str] = None, since: Optional[int] = None) -> Dict:
+    """
+    List all cards or cards in a specific column. ``seq`` is the change log
+    position of the list: pass it as ``since`` later to get only the cards
+    changed since (``removed`` are ids no longer listed - deleted, moved to
+    another column or made subcards). ``reset`` means the log no longer reaches
+    back that far and the list is complete instead.
+    """
+    where, params = "parent_id IS NULL", ()
+    if column:
+        column_id = get_column_id(column)
+        if not column_id:
+            return {"success": False, "error": f"Invalid column: {column}"}
+        where += " AND column_id = ?"
+        params = (column_id,)
+
+    with closing(_connect()) as conn:
+        # seq first: a card changed in between is listed now and again next time, never skipped
+        seq = _latest_change(conn)
+        reset = since is not None and since < _horizon(conn)
+        if since is None or reset:
+            rows = conn.execute(f"SELECT {_CARD_COLUMNS} FROM cards WHERE {where} ORDER BY column_id, position", params).fetchall()
+            removed = None
+        else:
+            changed = "SELECT card_id FROM card_changes WHERE id > ? AND id <= ?"
+            rows = conn.execute(f"SELECT {_CARD_COLUMNS} FROM cards WHERE {where} AND id IN ({changed}) "
+                                "ORDER BY column_id, position", params + (since, seq)).fetchall()
+            removed = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT card_id FROM card_changes WHERE id > ? AND id <= ? "
+                f"AND card_id NOT IN (SELECT id FROM cards WHERE {where}) ORDER BY card_id", (since, seq) + params)]
+
+    card_list = [_card_dict(row) for row in rows]
+    result = {"success": True, "cards": card_list, "count": len(card_list), "seq": seq}
+    if since is not None:
+        result.update(since=since, reset=reset, removed=removed or [])
+    return result
+
+
+def list_changes(since: int = 0, limit: int = 1000) -> Dict:
+    """Change log entries after ``since``, oldest first (see changes.py and GET /api/changes)"""
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT id, entity, entity_id, card_id, op, fields, created_at FROM card_changes WHERE id > ? "
+            "ORDER BY id LIMIT ?", (since, limit + 1)).fetchall()
+        reset = since < _horizon(conn)
+    more, rows = len(rows) > limit, rows[:limit]
+    return {
+        "success": True,
+        "since": since,
+        "next": rows[-1][0] if rows else since,
+        "more": more,
+        "reset": reset,
+        "changes": [{
+            "seq": seq, "entity": entity, "id": entity_id, "card_id": card_id, "op": op,
+            "fields": fields.split(",") if fields else None,
+            "at": datetime.fromisoformat(created_at).isoformat() if created_at else None,
+        } for seq, entity, entity_id, card_id, op, fields, created_at in rows],
+        "count": len(rows),
+    }
+
+
+def _open_due(start: Optional[date], end: Optional[date]):
+    """
+    WHERE clause for open (not Done) cards due from ``start`` to ``end``
+    (whole days, both included, None: unbounded): a range on
+    idx_card_due_date_column, as in agenda.py
+    """
+    where, params = [f"column_id != {DONE_COLUMN_ID}", "due_at IS NOT NULL"], []
+    if start:
+        where.append("due_at >= ?"); params.append(start.isoformat())
+    if end:
+        where.append("due_at < ?"); params.append((end + timedelta(days=1)).isoformat())
+    return " AND ".join(where), params
+
+
+def _due_rows(conn: sqlite3.Connection, start: Optional[date], end: Optional[date], limit: int):
+    where, params = _open_due(start, end)
+    return conn.execute(f"SELECT {_CARD_COLUMNS}, parent_id FROM cards WHERE {where} ORDER BY due_at LIMIT ?",
+                        params + [limit]).fetchall()
+
+
+def _due_count(conn: sqlite3.Connection, start: Optional[date], end: Optional[date]) -> int:
+    where, params = _open_due(start, end)
+    return conn.execute(f"SELECT count(*) FROM cards WHERE {where}", params).fetchone()[0]
+
+
+def _due_dict(row) -> Dict:
+    return {**_card_dict(row[:-1]), "parent_id": row[-1]}
+
+
+def list_due(days: int = DUE_SOON_DAYS, limit: int = 100) -> Dict:
+    """Open cards that are overdue, and those due from today to ``days`` days ahead - without rendering the board"""
+    today = date.today()
+    overdue_days, soon_days = (None, today - timedelta(days=1)), (today, today + timedelta(days=days))
+    with closing(_connect()) as conn:
+        overdue, soon = _due_rows(conn, *overdue_days, limit), _due_rows(conn, *soon_days, limit)
+        # Counts past the limit come from the index alone
+        overdue_count = len(overdue) if len(overdue) < limit else _due_count(conn, *overdue_days)
+        soon_count = len(soon) if len(soon) < limit else _due_count(conn, *soon_days)
+    return {
+        "success": True,
+        "today": today.isoformat(),
+        "overdue": [_due_dict(row) for row in overdue],
+        "due_soon": [_due_dict(row) for row in soon],
+        "overdue_count": overdue_count,
+        "due_soon_count": soon_count,
+    }
+
+
+def get_agenda(start: str, end: Optional[str] = None, counts: bool = False, limit: int = 200) -> Dict:
+    """Open cards due from ``start`` to ``end`` (YYYY-MM-DD, both included; default a week), with per-day counts"""
+    try:
+        first = date.fromisoformat(start)
+        last = date.fromisoformat(end) if end else first + timedelta(days=6)
+    except ValueError:
+        return {"success": False, "error": "Invalid date format. Use YYYY-MM-DD format"}
+    if last < first:
+        return {"success": False, "error": f"End date {last} is before start date {first}"}
+    with closing(_connect()) as conn:
+        rows = _due_rows(conn, first, last, limit)
+        if counts:
+            where, params = _open_due(first, last)
+            days = dict(conn.execute(f"SELECT date(due_at), count(*) FROM cards WHERE {where} GROUP BY 1 ORDER BY 1",
+                                     params).fetchall())
+    result = {"success": True, "from": first.isoformat(), "to": last.isoformat(),
+              "cards": [_due_dict(row) for row in rows], "count": len(rows)}
+    if counts:
+        result["days"] = days
+    return result
+
+
+def get_subtree(card_id: int) -> Dict:
+    """
+    A card and its subcards at any depth, parents first and siblings in
+    order, with totals for the whole subtree. One range read on the path
+    index (tree.py), however deep the nesting.
+    """
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT path FROM cards WHERE id = ?", (card_id,)).fetchone()
+        if not row:
+            return {"success": False, "error": f"Card {card_id} not found"}
+        path = row[0]
+        rows = conn.execute(f"SELECT {_CARD_COLUMNS}, parent_id, path FROM cards WHERE path >= ? AND path < ?",
+                            (path, path[:-1] + "0")).fetchall()
+
+    children = {}
+    for row in rows:
+        children.setdefault(row[-2], []).append(row)
+    root_depth = path.count("/")
+    cards, pending = [], [row for row in rows if row[0] == card_id]
+    while pending:
+        row = pending.pop()
+        cards.append({**_card_dict(row[:-2]), "parent_id": row[-2], "depth": row[-1].count("/") - root_depth})
+        pending.extend(sorted(children.get(row[0], []), key=lambda r: (r[4], r[0]), reverse=True))
+    total, done = sum(card["checklist_count"] for card in cards), sum(card["checklist_done"] for card in cards)
+    return {
+        "success": True,
+        "card_id": card_id,
+        "cards": cards,
+        "descendants": len(cards) - 1,
+        "depth": max(card["depth"] for card in cards),
+        "checklist_total": total,
+        "checklist_done": done,
+        "checklist_open": total - done,
+    }
+
+
+def get_status() -> Dict:
+    """Get overall kanban board status"""
+    with closing(_connect()) as conn:
+        counts = dict(conn.execute(
+            "SELECT column_id, count(*) FROM cards WHERE parent_id IS NULL GROUP BY column_id"
+        ).fetchall())
+
+    todo_count, doing_count, done_count = (counts.get(column_id, 0) for column_id in (1, 2, 3))
+    return {
+        "success": True,
+        "status": {
+            "todo": todo_count,
+            "doing": doing_count,
+            "done": done_count,
+            "total": todo_count + doing_count + done_count
+        }
+    }
@@ -0,0 +1,334 @@
+"""
+JSON API for integrations, mounted at /api/v1 (and /api as an alias).
+
+Bulk endpoints take a JSON array, validate every element with the models in
+schemas.py, check all references up front and apply the whole batch in one
+transaction with multi-row INSERT/UPDATE statements: either every element is
+applied or none is. Responses are compact JSON (orjson when installed).
+"""
+import os
+from datetime import date, timedelta
+from typing import Annotated, Dict, List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, insert
+from sqlalchemy.orm import Session
+from config import DUE_SOON_DAYS
+from db import get_session, run_db, retry_on_busy
+from models import Card, ChecklistItem, ColumnModel
+from schemas import CardCreate, CardUpdate, CardMove, ChecklistBulkItem
+from mutations import touch_cards
+import mutations
+import ordering
+import agenda
+import archive
+import changes
+import tree
+
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as APIResponse
+except ImportError:
+    APIResponse = JSONResponse
+
+# Largest array accepted by the bulk endpoints
+MAX_BULK = int(os.environ.get("KANBAN_API_MAX_BULK", "5000"))
+# Largest page of the change feed
+MAX_CHANGES = 5000
+# Most cards one agenda request returns
+MAX_AGENDA = 1000
+
+router = APIRouter(tags=["api"], default_response_class=APIResponse)
+
+
+def card_json(card: Card) -> Dict:
+    return {
+        "id": card.id,
+        "column_id": card.column_id,
+        "parent_id": card.parent_id,
+        "title": card.title,
+        "notes": card.notes,
+        "due_at": card.due_at.isoformat() if card.due_at else None,
+        "position": card.position,
+        "version": card.version,
+        "checklist_total": card.checklist_total,
+        "checklist_done": card.checklist_done,
+        "completed_at": card.completed_at.isoformat() if card.completed_at else None,
+    }
+
+
+def item_json(item: ChecklistItem) -> Dict:
+    return {"id": item.id, "card_id": item.card_id, "text": item.text, "done": item.done, "position": item.position}
+
+
+def _missing(db: Session, model, ids) -> set:
+    """The ids in ``ids`` with no row in ``model``'s table (one query)"""
+    ids = set(ids)
+    if not ids:
+        return set()
+    return ids - set(db.scalars(select(model.id).where(model.id.in_(ids))).all())
+
+
+def _check_refs(errors: List[Dict]) -> None:
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+
+@router.get("/cards")
+async def list_cards(db=Depends(get_session)):
+    return await run_db(db, _list_cards)
+
+def _list_cards(db: Session):
+    # seq first: a change landing in between shows up in both the cards and the feed, never in neither
+    seq = changes.latest_id(db)
+    cards = db.scalars(select(Card).order_by(Card.column_id, Card.parent_id.is_not(None), Card.parent_id, Card.position))
+    return APIResponse({"seq": seq, "cards": [card_json(card) for card in cards]})
+
+
+@router.get("/cards/{card_id}")
+async def get_card(card_id: int, db=Depends(get_session)):
+    return await run_db(db, _get_card, card_id)
+
+def _get_card(db: Session, card_id: int):
+    card = db.get(Card, card_id)
+    if not card: raise HTTPException(status_code=404, detail=f"Card {card_id} not found")
+    return APIResponse(card_json(card))
+
+
+@router.get("/cards/{card_id}/subtree")
+async def get_subtree(card_id: int, db=Depends(get_session)):
+    return await run_db(db, _get_subtree, card_id)
+
+def _get_subtree(db: Session, card_id: int):
+    """The card and its subcards at any depth (parents first, siblings in order) with totals for the subtree"""
+    cards = tree.load_subtree(db, card_id)
+    if not cards: raise HTTPException(status_code=404, detail=f"Card {card_id} not found")
+    root_depth = tree.depth(cards[0].path)
+    depths = [tree.depth(card.path) - root_depth for card in cards]
+    counts = tree.subtree_counts(db, [card_id])[card_id]
+    return APIResponse({**counts, "depth": max(depths),
+                        "cards": [{**card_json(card), "depth": depth} for card, depth in zip(cards, depths)]})
+
+
+@router.get("/agenda")
+async def get_agenda(start: Annotated[Optional[date], Query(alias="from")] = None,
+                     end: Annotated[Optional[date], Query(alias="to")] = None, counts: bool = False,
+                     limit: Annotated[int, Query(ge=1, le=MAX_AGENDA)] = 200, db=Depends(get_session)):
+    start = start or date.today()
+    end = end or start + timedelta(days=6)
+    if end < start: raise HTTPException(status_code=422, detail="'to' is before 'from'")
+    return await run_db(db, _agenda, start, end, limit, counts)
+
+@router.get("/agenda/overdue")
+async def get_overdue(limit: Annotated[int, Query(ge=1, le=MAX_AGENDA)] = 200, db=Depends(get_session)):
+    return await run_db(db, _agenda, None, date.today() - timedelta(days=1), limit, False)
+
+@router.get("/agenda/due-soon")
+async def get_due_soon(days: Annotated[int, Query(ge=0, le=366)] = DUE_SOON_DAYS,
+                       limit: Annotated[int, Query(ge=1, le=MAX_AGENDA)] = 200, db=Depends(get_session)):
+    today = date.today()
+    return await run_db(db, _agenda, today, today + timedelta(days=days), limit, False)
+
+def _agenda(db: Session, start: Optional[date], end: date, limit: int, counts: bool):
+    """Open (not Done) cards due from ``start`` (None: any time before) to ``end``, soonest first"""
+    cards = agenda.due_cards(db, start, end, limit + 1)
+    body = {"from": start.isoformat() if start else None, "to": end.isoformat(), "more": len(cards) > limit,
+            "cards": [card_json(card) for card in cards[:limit]]}
+    if counts: body["days"] = agenda.day_counts(db, start, end)
+    return APIResponse(body)
+
+
+@router.get("/changes")
+async def list_changes(since: Annotated[int, Query(ge=0)] = 0,
+                       limit: Annotated[int, Query(ge=1, le=MAX_CHANGES)] = 1000, db=Depends(get_session)):
+    return await run_db(db, _list_changes, since, limit)
+
+def _list_changes(db: Session, since: int, limit: int):
+    """
+    Changes after ``since`` (see changes.py), oldest first, with the current row
+    of each card and checklist item they upserted. Pass ``next`` as ``since``
+    next time; ``more`` means another page is ready now. ``reset`` means some
+    changes after ``since`` were pruned: re-read the cards (``GET /cards``) and
+    resume from the ``seq`` that came with them.
+    """
+    rows = changes.since(db, since, limit + 1)
+    more, rows = len(rows) > limit, rows[:limit]
+    upserted = {"card": set(), "checklist_item": set()}
+    for change in rows:
+        if change.op == "upsert": upserted[change.entity].add(change.entity_id)
+    cards = db.scalars(select(Card).where(Card.id.in_(upserted["card"])).order_by(Card.id)) if upserted["card"] else []
+    items = db.scalars(select(ChecklistItem).where(ChecklistItem.id.in_(upserted["checklist_item"]))
+                       .order_by(ChecklistItem.id)) if upserted["checklist_item"] else []
+    return APIResponse({
+        "since": since,
+        "next": rows[-1].id if rows else since,
+        "more": more,
+        "reset": since < changes.horizon(db),
+        "changes": [changes.change_json(change) for change in rows],
+        "cards": [card_json(card) for card in cards],
+        "checklist_items": [item_json(item) for item in items],
+    })
+
+
+@router.post("/cards", status_code=201)
+async def create_card(payload: CardCreate, db=Depends(get_session)):
+    return await run_db(db, _create_cards, [payload], single=True)
+
+
+@router.post("/cards/bulk", status_code=201)
+async def create_cards(payload: Annotated[List[CardCreate], Body(max_length=MAX_BULK)], db=Depends(get_session)):
+    return await run_db(db, _create_cards, payload)
+
+@retry_on_busy
+def _create_cards(db: Session, payload: List[CardCreate], single: bool = False):
+    missing_columns = _missing(db, ColumnModel, (c.column_id for c in payload))
+    missing_parents = _missing(db, Card, (c.parent_id for c in payload if c.parent_id is not None))
+    _check_refs(
+        [{"index": i, "error": f"Column {c.column_id} not found"} for i, c in enumerate(payload) if c.column_id in missing_columns] +
+        [{"index": i, "error": f"Parent card {c.parent_id} not found"} for i, c in enumerate(payload) if c.parent_id in missing_parents]
+    )
+
+    # New cards append to their sibling lists in request order; a subcard lives in its parent's column
+    parent_columns = tree.parent_columns(db, (c.parent_id for c in payload))
+    groups = [(parent_columns.get(c.parent_id, c.column_id), c.parent_id) for c in payload]
+    next_pos = ordering.next_positions(db, groups)
+    rows = []
+    for c, group in zip(payload, groups):
+        rows.append({**c.model_dump(), "column_id": group[0], "position": next_pos[group]})
+        next_pos[group] += ordering.POSITION_GAP
+    ids = db.scalars(insert(Card).returning(Card.id, sort_by_parameter_order=True), rows).all()
+    touch_cards(db, (c.parent_id for c in payload))
+    db.commit()
+
+    if single:
+        return APIResponse(card_json(db.get(Card, ids[0])), status_code=201)
+    return APIResponse({"created": len(ids), "ids": ids}, status_code=201)
+
+
+@router.patch("/cards/{card_id}")
+async def update_card(card_id: int, payload: CardUpdate, db=Depends(get_session)):
+    return await run_db(db, _update_card, card_id, payload)
+
+@retry_on_busy
+def _update_card(db: Session, card_id: int, payload: CardUpdate):
+    card = db.get(Card, card_id)
+    if not card: raise HTTPException(status_code=404, detail=f"Card {card_id} not found")
+    updates = payload.model_dump(exclude_unset=True)
+    for field in ("title", "notes", "due_at"):
+        if field in updates: setattr(card, field, updates[field])
+
+    # column_id / parent_id / position move the card; position is its index among the new siblings
+    if {"column_id", "parent_id", "position"} & updates.keys():
+        column_id = updates.get("column_id") or card.column_id
+        parent_id = updates["parent_id"] if "parent_id" in updates else card.parent_id
+        _check_refs([{"error": f"Column {column_id} not found"}] if _missing(db, ColumnModel, [column_id]) else [])
+        # The subtree moves along; a subcard lives in its parent's column
+        try:
+            tree.reparent(db, card, parent_id, updates.get("position"), column_id)
+        except ValueError as e:
+            _check_refs([{"error": str(e)}])
+    db.flush(); touch_cards(db, [card.id]); db.commit(); db.refresh(card)
+    return APIResponse(card_json(card))
+
+
+@router.post("/moves/bulk")
+async def move_cards(payload: Annotated[List[CardMove], Body(max_length=MAX_BULK)], db=Depends(get_session)):
+    return await run_db(db, _move_cards, payload)
+
+@retry_on_busy
+def _move_cards(db: Session, payload: List[CardMove]):
+    cards = {card.id: card for card in db.scalars(select(Card).where(Card.id.in_({m.card_id for m in payload})))}
+    missing_columns = _missing(db, ColumnModel, (m.column_id for m in payload))
+    _check_refs(
+        [{"index": i, "error": f"Card {m.card_id} not found"} for i, m in enumerate(payload) if m.card_id not in cards] +
+        [{"index": i, "error": f"Column {m.column_id} not found"} for i, m in enumerate(payload) if m.column_id in missing_columns]
+    )
+
+    # Appends need no per-move queries; placing at an index looks at the new neighbours,
+    # so earlier moves are flushed first. The ORM flush groups the row UPDATEs into one executemany.
+    # A subcard only moves among its siblings: its column is its parent's.
+    groups = [(m.column_id if cards[m.card_id].parent_id is None else cards[m.card_id].column_id,
+               cards[m.card_id].parent_id) for m in payload]
+    next_pos = ordering.next_positions(db, {group for m, group in zip(payload, groups) if m.index is None})
+    for m, (column_id, parent_id) in zip(payload, groups):
+        card = cards[m.card_id]
+        if m.index is None:
+            card.column_id, card.position = column_id, next_pos[(column_id, parent_id)]
+            next_pos[(column_id, parent_id)] += ordering.POSITION_GAP
+        else:
+            db.flush()
+            ordering.place_card(db, card, column_id, m.index, parent_id)
+    db.flush(); touch_cards(db, cards); db.commit()
+    return APIResponse({"moved": len(payload), "positions": {card.id: card.position for card in cards.values()}})
+
+
+@router.post("/deletes/bulk")
+async def delete_cards(payload: Annotated[List[int], Body(max_length=MAX_BULK)], db=Depends(get_session)):
+    return await run_db(db, _delete_cards, payload)
+
+@retry_on_busy
+def _delete_cards(db: Session, payload: List[int]):
+    missing_cards = _missing(db, Card, payload)
+    _check_refs([{"index": i, "error": f"Card {card_id} not found"} for i, card_id in enumerate(payload) if card_id in missing_cards])
+    # One DELETE; subcards and checklist items cascade in the database
+    rows = mutations.delete_cards(db, payload)
+    db.commit()
+    return APIResponse({"deleted": len(rows), "ids": [row.id for row in rows]})
+
+
+@router.delete("/cards/done")
+async def purge_done(older_than_days: Annotated[float, Query(ge=0)], db=Depends(get_session)):
+    return await run_db(db, _purge_done, older_than_days)
+
+@retry_on_busy
+def _purge_done(db: Session, older_than_days: float):
+    rows = mutations.delete_done_cards(db, older_than_days)
+    db.commit()
+    return APIResponse({"deleted": len(rows), "ids": [row.id for row in rows]})
+
+
+@router.post("/archive")
+async def archive_done(older_than_days: Annotated[float, Query(ge=0)], db=Depends(get_session)):
+    return await run_db(db, _archive_done, older_than_days)
+
+@retry_on_busy
+def _archive_done(db: Session, older_than_days: float):
+    ids = archive.archive_done(db, older_than_days)  # commits per chunk
+    return APIResponse({"archived": len(ids), "ids": ids})
+
+
+@router.get("/archive/cards")
+async def list_archived(limit: Annotated[int, Query(ge=1, le=500)] = 50, offset: Annotated[int, Query(ge=0)] = 0,
+                        db=Depends(get_session)):
+    return APIResponse(await run_db(db, archive.list_archived, limit, offset))
+
+
+@router.get("/archive/search")
+async def search_archived(q: str = "", limit: Annotated[int, Query(ge=1, le=500)] = 20, db=Depends(get_session)):
+    results = await run_db(db, archive.search_archived, q, limit)
+    return APIResponse({"query": q, "results": results, "count": len(results)})
+
+
+@router.post("/archive/cards/{card_id}/restore")
+async def restore_card(card_id: int, db=Depends(get_session)):
+    return await run_db(db, _restore_card, card_id)
+
+@retry_on_busy
+def _restore_card(db: Session, card_id: int):
+    restored = archive.restore(db, card_id)
+    if not restored: raise HTTPException(status_code=404, detail=f"Card {card_id} not found in the archive")
+    db.commit()
+    return APIResponse({**restored, "card": card_json(db.get(Card, restored["id"]))})
+
+
+@router.post("/checklist/bulk", status_code=201)
+async def add_checklist_items(payload: Annotated[List[ChecklistBulkItem], Body(max_length=MAX_BULK)], db=Depends(get_session)):
+    return await run_db(db, _add_checklist_items, payload)
+
+@retry_on_busy
+def _add_checklist_items(db: Session, payload: List[ChecklistBulkItem]):
+    missing_cards = _missing(db, Card, (item.card_id for item in payload))
+    _check_refs([{"index": i, "error": f"Card {item.card_id} not found"} for i, item in enumerate(payload) if item.card_id in missing_cards])
+    ids = mutations.add_checklist_items(db, [item.model_dump() for item in payload])
+    db.commit()
+    return APIResponse({"created": len(ids), "ids": ids}, status_code=201)
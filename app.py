@@ -1,121 +1,407 @@
 import os
-from fastapi import FastAPI, Depends, Form, Request
-from fastapi.responses import HTMLResponse
+import hashlib
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Form, Request, BackgroundTasks
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache, pass_context
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select
 from datetime import datetime
-from db import Base, engine, get_db
+from config import KANBAN_DIR, DB_PATH, SCHEMA_VERSION
+from db import engine, async_engine, get_session, run_db, Render, SessionLocal, retry_on_busy, file_lock
 from models import Board, ColumnModel, Card, ChecklistItem
+from schema import ensure_schema, seed_board
+import search
+import ordering
+import card_cache
+import mutations
+import api
+import changes
+import events
+import compression
+import archive
+import metrics
+import coalesce
+import tree
+from mutations import touch_card
+from loaders import load_trees, load_board, load_column_page, column_counts, PAGE_SIZE, MAX_PAGE_SIZE
 import uvicorn
 from typing import Optional
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+@retry_on_busy
+def _archive_sweep(older_than_days: float):
+    # With several workers, whichever holds the lock sweeps and the others skip the round
+    with file_lock(f"{DB_PATH}.sweep-lock", blocking=False) as locked:
+        if not locked:
+            return []
+        with SessionLocal() as db:
+            return archive.archive_done(db, older_than_days)
+
+async def _archive_sweeps(older_than_days: float):
+    """Optional background sweep (KANBAN_ARCHIVE_AFTER_DAYS): keeps old Done cards off the board"""
+    while True:
+        try:
+            await asyncio.to_thread(_archive_sweep, older_than_days)
+        except Exception:
+            # Keep sweeping: the next round may succeed (e.g. after a locked database)
+            logger.exception("Archive sweep failed")
+        await asyncio.sleep(archive.SWEEP_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema and default board once per worker at startup, not at import or on
+    # requests; ensure_schema serializes workers that start together
+    await asyncio.to_thread(ensure_schema, engine)
+    sweeps = asyncio.create_task(_archive_sweeps(float(archive.SWEEP_DAYS))) if archive.SWEEP_DAYS else None
+    yield
+    if sweeps is not None:
+        sweeps.cancel()
+    await writes.close()
+    await broadcaster.close()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+# Compiled templates are cached on disk, so a new worker process loads them
+# instead of running the Jinja compiler; KANBAN_TEMPLATE_CACHE=0 turns it off
+if os.environ.get("KANBAN_TEMPLATE_CACHE", "1") != "0":
+    TEMPLATE_CACHE_DIR = os.environ.get("KANBAN_TEMPLATE_CACHE_DIR", os.path.join(KANBAN_DIR, "template-cache"))
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    templates.env.bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+templates.env.template_class = metrics.TimedTemplate
+templates.env.globals["render_card"] = card_cache.render_card
+templates.env.globals["flush"] = lambda: ""  # only does something when streaming (_stream_template)
+
+@pass_context
+def _loaded_column_page(context, col):
+    """board.html's ``column_page(col)``: the cards load_board already put on the column, and whether more follow"""
+    return col.cards, context["counts"][col.id] > len(col.cards)
+
+templates.env.globals["column_page"] = _loaded_column_page
+
+if compression.ENABLED:
+    app.add_middleware(compression.CompressionMiddleware)
+if metrics.ENABLED:
+    # Outermost, so latency includes compression
+    app.add_middleware(metrics.MetricsMiddleware)
 
-Base.metadata.create_all(bind=engine)
+# JSON API for integrations; /api is an alias for the current version
+app.include_router(api.router, prefix="/api/v1")
+app.include_router(api.router, prefix="/api", include_in_schema=False)
 
 def ensure_seed(db: Session) -> Board:
-    board = db.scalar(select(Board).where(Board.name=="My Board"))
-    if board: return board
-    board = Board(name="My Board")
-    # Fixed columns: Todo/Doing/Done
-    todo = ColumnModel(name="Todo", position=0)
-    doing = ColumnModel(name="Doing", position=1)
-    done = ColumnModel(name="Done", position=2)
-    board.columns = [todo, doing, done]
-    db.add(board); db.commit(); db.refresh(board)
-    return board
+    # Only needed if the board was deleted after setup; INSERT OR IGNORE, as two workers may race here
+    seed_board(db.connection()); db.commit()
+    return db.scalar(select(Board).where(Board.name=="My Board"))
 
 @app.get("/test")
 def test():
     return {"status": "ok", "message": "Server is running"}
 
+# Routes are async and hand their database work - plain synchronous ORM code in
+# the _underscore functions below them - to run_db, which runs it on the async
+# engine (KANBAN_DB_ASYNC=1) or a threadpool thread. Templates are rendered
+# after it on a threadpool thread (db.Render), never on the event loop.
+
 @app.get("/", response_class=HTMLResponse)
-def home(request: Request, db: Session = Depends(get_db)):
+async def home(request: Request, db=Depends(get_session)):
     try:
-        from datetime import date
-        board = ensure_seed(db)
-
-        # Eagerly load all relationships to avoid N+1 queries
-        for c in board.columns:
-            _ = c.cards  # Load cards
-            for card in c.cards:
-                _ = card.checklist  # Load checklist items
-                _ = card.children   # Load child cards
-
-        return templates.TemplateResponse("board.html", {
-            "request": request,
-            "board": board,
-            "title": "Kanban",
-            "today": date.today()
-        })
+        return await run_db(db, _home, request)
     except Exception as e:
         import traceback
         return HTMLResponse(content=f"<pre>Error: {str(e)}\n\n{traceback.format_exc()}</pre>", status_code=500)
 
+# The board page changes only when a card does (every write lands in the change
+# log, see changes.py), at midnight (due badges) and when the templates or the
+# schema change. The salt depends on nothing else, so every worker process sends
+# the same ETag. Revalidating a cached page costs one index lookup.
+def _etag_salt() -> str:
+    digest = hashlib.sha1(str(SCHEMA_VERSION).encode())
+    template_dir = os.path.join(BASE_DIR, "templates")
+    for name in sorted(os.listdir(template_dir)):
+        with open(os.path.join(template_dir, name), "rb") as f:
+            digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()[:12]
+
+ETAG_SALT = _etag_salt()
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match: return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+def _home(db: Session, request: Request):
+    from datetime import date
+    revision = changes.latest_id(db)
+    etag = f'W/"{revision}-{date.today()}-{ETAG_SALT}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # Board, columns, every card tree and all checklist items in a fixed number of queries
+    board = load_board(db, with_cards=not STREAM_BOARD)
+    if not board:
+        ensure_seed(db)
+        board = load_board(db, with_cards=not STREAM_BOARD)
+
+    counts = column_counts(db, [c.id for c in board.columns])
+    context = {
+        "request": request,
+        "board": board,
+        "change_id": revision,
+        "counts": counts,
+        "page_size": PAGE_SIZE,
+        "title": "Kanban",
+        "today": date.today()
+    }
+    if STREAM_BOARD:
+        return StreamingResponse(_stream_board(context), media_type="text/html; charset=utf-8", headers=headers)
+    return Render(templates.TemplateResponse, "board.html", context, headers=headers)
+
+# KANBAN_STREAM_BOARD=1: send the board page as it renders - the shell first, then
+# each column as soon as its first page of cards is loaded (one bounded query per
+# column) - instead of building the whole page in memory before the first byte.
+# change_id is read before any column, so a write landing mid-stream is replayed
+# by the live updates (/events).
+STREAM_BOARD = os.environ.get("KANBAN_STREAM_BOARD", "0") == "1"
+
+class _Flush:
+    """Template global ``{{ flush() }}``: marks a point where the buffered output should go out"""
+    def __init__(self):
+        self.pending = False
+    def __call__(self):
+        self.pending = True
+        return ""
+
+def _stream_template(name: str, context: dict):
+    """Render a template lazily, yielding the buffered output at each ``{{ flush() }}``"""
+    flush = context["flush"] = _Flush()
+    buffer = []
+    for chunk in templates.get_template(name).generate(context):
+        buffer.append(chunk)
+        if flush.pending:
+            flush.pending = False
+            yield "".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield "".join(buffer)
+
+def _column_page(col):
+    # Its own short session per column: the stream outlives the request's session
+    with SessionLocal() as db:
+        return load_column_page(db, col.id, limit=PAGE_SIZE)
+
+def _stream_board(context: dict):
+    # A plain iterator: StreamingResponse runs it on the threadpool, where the queries may block
+    context["column_page"] = _column_page
+    yield from _stream_template("board.html", context)
+
+
+@app.get("/columns/{column_id}/cards", response_class=HTMLResponse)
+async def column_cards(column_id: int, request: Request, after: Optional[int] = None, after_id: Optional[int] = None,
+                       limit: int = PAGE_SIZE, db=Depends(get_session)):
+    return await run_db(db, _column_cards, request, column_id, after, after_id, max(1, min(limit, MAX_PAGE_SIZE)))
+
+def _column_cards(db: Session, request: Request, column_id: int, after: Optional[int], after_id: Optional[int], limit: int):
+    from datetime import date
+    cards, has_more = load_column_page(db, column_id, after, after_id, limit)
+    return Render(templates.TemplateResponse, "_cards_page.html", {
+        "request": request,
+        "column_id": column_id,
+        "cards": cards,
+        "has_more": has_more,
+        "page_size": limit,
+        "today": date.today()
+    })
+
+@app.get("/cards/{card_id}", response_class=HTMLResponse)
+async def card_fragment(card_id: int, db=Depends(get_session)):
+    return await run_db(db, _card_fragment, card_id)
+
+def _card_fragment(db: Session, card_id: int):
+    cards = load_trees(db, [card_id])
+    if not cards: return HTMLResponse(status_code=404, content="")
+    return Render(_card_response, cards[0])
+
+def _card_response(card: Card) -> HTMLResponse:
+    # Through Render (run_db): ``card`` comes from load_trees, with its whole subtree loaded
+    return HTMLResponse(card_cache.render(templates.env, card))
+
+# Live updates: every open board keeps one event stream. Changes from any process
+# reach the change log (changes.py); the broadcaster renders each changed card once.
+MAX_EVENT_BATCH = 1000
+
+def _change_events(after_id: int, upto_id: Optional[int] = None):
+    with SessionLocal() as db:
+        rows = [c for c in changes.since(db, after_id, MAX_EVENT_BATCH + 1) if upto_id is None or c.id <= upto_id]
+        if not rows: return [], after_id
+        last_id = rows[-1].id
+        if len(rows) > MAX_EVENT_BATCH or after_id < changes.horizon(db):
+            # Too much changed (or the gap was pruned): a fresh page is cheaper
+            return [events.RELOAD], last_id
+        latest = {}
+        for change in rows:
+            # Checklist edits also log their card, whose fragment shows the item
+            if change.entity == "card": latest[change.card_id] = change
+        alive = [card_id for card_id, change in latest.items() if change.op != "delete"]
+        # Top-level cards only: a changed sub-card also bumps its ancestors, whose fragment contains it
+        cards = {card.id: card for card in load_trees(db, select(Card.id).where(Card.id.in_(alive), Card.parent_id.is_(None)))}
+        out = []
+        for card_id, change in sorted(latest.items(), key=lambda item: item[1].id):
+            if change.op == "delete":
+                out.append({"event": "card", "id": change.id, "data": {"card_id": card_id, "op": "delete"}})
+            elif card_id in cards:
+                card = cards[card_id]
+                out.append({"event": "card", "id": change.id, "data": {
+                    "card_id": card_id, "op": "upsert", "column_id": card.column_id, "position": card.position,
+                    "html": str(card_cache.render(templates.env, card)),
+                }})
+            else:
+                # Now a sub-card: shown inside its parent's fragment, which changed too
+                out.append({"event": "card", "id": change.id, "data": {"card_id": card_id, "op": "nested"}})
+        out.append({"event": "counts", "id": last_id, "data": column_counts(db, db.scalars(select(ColumnModel.id)).all())})
+        return out, last_id
+
+def _latest_change_id():
+    with SessionLocal() as db:
+        return changes.latest_id(db)
+
+@retry_on_busy
+def _prune_changes():
+    with SessionLocal() as db:
+        removed = changes.compact(db) + changes.prune(db); db.commit()
+        return removed
+
+broadcaster = events.Broadcaster(_change_events, _latest_change_id, _prune_changes)
+
+@app.get("/events")
+async def board_events(request: Request, since: Optional[int] = None):
+    # EventSource sends Last-Event-ID when it reconnects; the first connect passes ?since=
+    last_event_id = request.headers.get("last-event-id")
+    since = int(last_event_id) if last_event_id and last_event_id.isdigit() else since
+    return StreamingResponse(events.stream(broadcaster, since, request.is_disconnected), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/cache/stats")
+def cache_stats():
+    return card_cache.cache.stats()
+
+@app.get("/metrics")
+def metrics_endpoint():
+    engines = {"sync": engine, **({"async": async_engine.sync_engine} if async_engine is not None else {})}
+    return Response(metrics.render(engines, card_cache.cache.stats()), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/search")
+async def search_cards(q: str = "", limit: int = 20, db=Depends(get_session)):
+    results = await run_db(db, search.query, q, limit=max(1, min(limit, 500)))
+    return {"query": q, "results": results, "count": len(results)}
 
 @app.post("/cards", response_class=HTMLResponse)
-def create_card(
+async def create_card(
     request: Request,
     column_id: int = Form(...),
     parent_id: Optional[int] = Form(None),
     title: str = Form(...),
     notes: str = Form(""),
     due_at: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
+    db=Depends(get_session),
 ):
-    pos = db.scalar(select(func.coalesce(func.max(Card.position), -1)).where(Card.column_id==column_id, Card.parent_id==parent_id)) + 1
+    return await run_db(db, _create_card, column_id, parent_id, title, notes, due_at)
+
+@retry_on_busy
+def _create_card(db: Session, column_id: int, parent_id: Optional[int], title: str, notes: str, due_at: Optional[str]):
+    column_id = tree.parent_columns(db, [parent_id]).get(parent_id, column_id)  # a subcard lives in its parent's column
+    pos = ordering.next_position(db, column_id, parent_id)
     card = Card(column_id=column_id, parent_id=parent_id, title=title, notes=notes, position=pos)
     if due_at: card.due_at = datetime.fromisoformat(due_at)
-    db.add(card); db.commit(); db.refresh(card)
-    # Access relationships to ensure they're loaded (lazy loading)
-    _ = card.children  
-    _ = card.checklist
-    return templates.TemplateResponse("_card.html", {"request": request, "card": card})
+    db.add(card); touch_card(db, parent_id); db.commit()
+    return Render(_card_response, load_trees(db, [card.id])[0])
 
 @app.put("/cards/{card_id}", response_class=HTMLResponse)
-async def update_card(card_id: int, request: Request, db: Session = Depends(get_db), **form):
+async def update_card(card_id: int, request: Request, db=Depends(get_session)):
+    form = await request.form()
+    fields = _card_fields(form.get("title"), form.get("notes"), form.get("due_at"))
+    if coalesce.ENABLED:
+        html = await writes.submit(("card", card_id), fields, coalesce.merge_fields)
+        return HTMLResponse(html) if html is not None else HTMLResponse(status_code=404, content="Not found")
+    return await run_db(db, _update_card, card_id, fields)
+
+def _card_fields(title: Optional[str], notes: Optional[str], due_at: Optional[str]) -> dict:
+    """The fields a PUT /cards form sets; an empty due_at clears the date"""
+    fields = {}
+    if title is not None: fields["title"] = title
+    if notes is not None: fields["notes"] = notes
+    if due_at is not None: fields["due_at"] = datetime.fromisoformat(due_at) if due_at else None
+    return fields
+
+@retry_on_busy
+def _update_card(db: Session, card_id: int, fields: dict):
     card = db.get(Card, card_id)
     if not card: return HTMLResponse(status_code=404, content="Not found")
-    title = form.get("title"); notes = form.get("notes"); due_at = form.get("due_at")
-    if title is not None: card.title = title
-    if notes is not None: card.notes = notes
-    if due_at == "": card.due_at = None
-    elif due_at is not None: card.due_at = datetime.fromisoformat(due_at)
-    db.commit(); db.refresh(card)
-    return templates.TemplateResponse("_card.html", {"request": request, "card": card})
+    for name, value in fields.items(): setattr(card, name, value)
+    touch_card(db, card.id); db.commit()
+    return Render(_card_response, load_trees(db, [card_id])[0])
 
 @app.delete("/cards/{card_id}", response_class=HTMLResponse)
-def delete_card(card_id: int, db: Session = Depends(get_db)):
-    card = db.get(Card, card_id)
-    if not card: return HTMLResponse(status_code=404, content="")
-    db.delete(card); db.commit()
+async def delete_card(card_id: int, db=Depends(get_session)):
+    return await run_db(db, _delete_card, card_id)
+
+@retry_on_busy
+def _delete_card(db: Session, card_id: int):
+    # One DELETE: subcards and checklist items cascade in the database
+    if not mutations.delete_cards(db, [card_id]): return HTMLResponse(status_code=404, content="")
+    db.commit()
     return HTMLResponse("")
 
+@retry_on_busy
+def rebalance_column(column_id: int, parent_id: Optional[int] = None):
+    with SessionLocal() as db:
+        ordering.rebalance(db, column_id, parent_id); db.commit()
+
 @app.post("/move/{card_id}")
-def move_card(card_id: int, payload: dict, db: Session = Depends(get_db)):
+async def move_card(card_id: int, payload: dict, background_tasks: BackgroundTasks, db=Depends(get_session)):
+    result, rebalance = await run_db(db, _move_card, card_id, payload)
+    # Only the moved row is written; the column is renumbered off the request path when gaps run out
+    if rebalance is not None:
+        background_tasks.add_task(rebalance_column, *rebalance)
+    return result
+
+@retry_on_busy
+def _move_card(db: Session, card_id: int, payload: dict):
     card = db.get(Card, card_id)
-    if not card: return {"ok": False}
+    if not card: return {"ok": False}, None
     new_col = int(payload.get("column_id", card.column_id))
     new_pos = int(payload.get("position", 0))
-    card.column_id = new_col
-    siblings = db.scalars(select(Card).where(Card.column_id==new_col, Card.parent_id==None).order_by(Card.position)).all()
-    siblings = [c for c in siblings if c.id != card.id]
-    siblings.insert(min(new_pos, len(siblings)), card)
-    for i, c in enumerate(siblings): c.position = i
+    if "parent_id" in payload:
+        # Reparenting moves the whole subtree (tree.py); null moves the card to the top level
+        parent_id = None if payload["parent_id"] is None else int(payload["parent_id"])
+        try:
+            tight = tree.reparent(db, card, parent_id, new_pos, new_col)
+        except ValueError as e:
+            db.rollback(); return {"ok": False, "error": str(e)}, None
+    else:
+        # A subcard only moves among its siblings; its column is its parent's
+        tight = ordering.place_card(db, card, new_col if card.parent_id is None else card.column_id, new_pos, card.parent_id)
+        touch_card(db, card.id)
     db.commit()
-    return {"ok": True}
+    return {"ok": True}, (card.column_id, card.parent_id) if tight else None
 
 @app.post("/checklist/{card_id}", response_class=HTMLResponse)
-def add_checklist_item(card_id: int, request: Request, text: str = Form(...), db: Session = Depends(get_db)):
-    pos = db.scalar(select(func.coalesce(func.max(ChecklistItem.position), -1)).where(ChecklistItem.card_id==card_id)) + 1
-    item = ChecklistItem(card_id=card_id, text=text, position=pos)
-    db.add(item); db.commit(); db.refresh(item)
+async def add_checklist_item(card_id: int, request: Request, text: str = Form(...), db=Depends(get_session)):
+    return await run_db(db, _add_checklist_item, card_id, text)
+
+@retry_on_busy
+def _add_checklist_item(db: Session, card_id: int, text: str):
+    item = mutations.add_checklist_item(db, card_id, text); db.commit(); db.refresh(item)
     return HTMLResponse(f'''
       <li data-item-id="{item.id}">
         <button type="button" class="check-btn" onclick="toggleChecklistItem({item.id}, this)">☐</button>
@@ -124,24 +410,65 @@ def add_checklist_item(card_id: int, request: Request, text: str = Form(...), db
       </li>''')
 
 @app.post("/toggle/{item_id}", response_class=HTMLResponse)
-def toggle_item(item_id: int, db: Session = Depends(get_db)):
-    it = db.get(ChecklistItem, item_id)
+async def toggle_item(item_id: int, db=Depends(get_session)):
+    if coalesce.ENABLED:
+        html = await writes.submit(("toggle", item_id), 1, coalesce.count)
+        return HTMLResponse(html) if html is not None else HTMLResponse(status_code=404, content="")
+    return await run_db(db, _toggle_item, item_id)
+
+@retry_on_busy
+def _toggle_item(db: Session, item_id: int):
+    it = mutations.toggle_checklist_item(db, item_id)
     if not it: return HTMLResponse(status_code=404, content="")
-    it.done = not it.done; db.commit()
+    db.commit()
+    return HTMLResponse(_checklist_item_html(it))
+
+def _checklist_item_html(it) -> str:
     box = "☑" if it.done else "☐"
-    return HTMLResponse(f'''
+    return f'''
       <li class="{'checked' if it.done else ''}" data-item-id="{it.id}">
         <button type="button" class="check-btn" onclick="toggleChecklistItem({it.id}, this)">{box}</button>
         <span class="checklist-text {'done' if it.done else ''}">{it.text}</span>
         <button type="button" class="delete-item-btn" onclick="deleteChecklistItem({it.id}, this)" title="Delete item">×</button>
-      </li>''')
+      </li>'''
+
+# Card edits and checklist toggles go through one writer per process (coalesce.py):
+# everything pending is applied in one session and one commit, edits to the same
+# card merged field by field and toggles of the same item netted out, then each
+# request gets the fragment for its card or item as committed.
+@retry_on_busy
+def _apply_writes(batch: dict) -> dict:
+    with SessionLocal() as db:
+        cards = {}
+        for (kind, target_id), change in batch.items():
+            if kind == "card":
+                card = db.get(Card, target_id)
+                if card is None: continue
+                for name, value in change.items(): setattr(card, name, value)
+                cards[target_id] = card
+            elif kind == "toggle" and change % 2:
+                mutations.toggle_checklist_item(db, target_id)
+        db.flush(); mutations.touch_cards(db, cards); db.commit()
+        results = {("card", card_id): str(card_cache.render(templates.env, card)) for card_id, card in cards.items()}
+        toggled = [target_id for kind, target_id in batch if kind == "toggle"]
+        if toggled:
+            for it in db.scalars(select(ChecklistItem).where(ChecklistItem.id.in_(toggled))):
+                results[("toggle", it.id)] = _checklist_item_html(it)
+        return results
+
+writes = coalesce.WriteCoalescer(_apply_writes)
 
 @app.delete("/checklist-item/{item_id}", response_class=HTMLResponse)
-def delete_checklist_item(item_id: int, db: Session = Depends(get_db)):
-    item = db.get(ChecklistItem, item_id)
+async def delete_checklist_item(item_id: int, db=Depends(get_session)):
+    return await run_db(db, _delete_checklist_item, item_id)
+
+@retry_on_busy
+def _delete_checklist_item(db: Session, item_id: int):
+    item = mutations.delete_checklist_item(db, item_id)
     if not item: return HTMLResponse(status_code=404, content="")
-    db.delete(item); db.commit()
+    db.commit()
     return HTMLResponse("")
 
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True, log_level="debug")
+    uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True, log_level="debug",
+                timeout_graceful_shutdown=5)  # open event streams would otherwise hold up a reload
@@ -0,0 +1,267 @@
+"""
+Cold archive for finished cards, kept in ``archive.db`` next to ``app.db``.
+
+Every connection ATTACHes the archive as schema ``archive`` (db.py). Archiving
+copies Done cards - with their subcards, checklist items and search text - into
+the archive tables with set-based INSERT ... SELECT statements, then deletes
+them from the board with one cascading DELETE (mutations.delete_cards). The
+board database and its indexes only hold live cards however much history piles
+up; the archive has its own search index, listing and restore.
+
+The two files commit separately in WAL mode, so a crash between the two commits
+can leave a card in both; copying uses INSERT OR REPLACE, so archiving it again
+just overwrites the copy.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, Text, DateTime, Boolean, Index,
+    table, column, select, insert, delete, func, text,
+)
+from sqlalchemy.orm import Session
+from config import DONE_COLUMN_ID
+from db import DB_PROFILE, PRAGMAS
+from models import Card, ChecklistItem
+import mutations
+import ordering
+import search
+import tree
+
+SCHEMA = "archive"
+ARCHIVE_VERSION = 1  # PRAGMA archive.user_version
+
+# Optional sweep run by the web app (app.py): archive Done cards completed more
+# than this many days ago, every SWEEP_INTERVAL seconds. Unset = no sweep.
+SWEEP_DAYS = os.environ.get("KANBAN_ARCHIVE_AFTER_DAYS")
+SWEEP_INTERVAL = int(os.environ.get("KANBAN_ARCHIVE_SWEEP_INTERVAL", "3600"))
+
+# Root cards archived per transaction, so a first sweep over years of history
+# never holds the write lock for long
+CHUNK_SIZE = 500
+
+metadata = MetaData(schema=SCHEMA)
+
+# Same columns as the board tables, without foreign keys (they would point into
+# the archive file), plus the time of archiving
+archived_cards = Table(
+    "cards", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("column_id", Integer),
+    Column("parent_id", Integer, nullable=True, index=True),
+    Column("title", String(200)),
+    Column("notes", Text),
+    Column("due_at", DateTime, nullable=True),
+    Column("position", Integer),
+    Column("version", Integer),
+    Column("checklist_total", Integer),
+    Column("checklist_done", Integer),
+    Column("completed_at", DateTime, nullable=True),
+    Column("archived_at", DateTime, server_default=func.current_timestamp()),
+    Index("idx_archive_cards_archived_at", "archived_at"),
+)
+
+archived_checklist = Table(
+    "checklist_items", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("card_id", Integer, index=True),
+    Column("text", String(300)),
+    Column("done", Boolean),
+    Column("position", Integer),
+)
+
+CARD_COLUMNS = ["id", "column_id", "parent_id", "title", "notes", "due_at", "position", "version",
+                "checklist_total", "checklist_done", "completed_at"]
+CHECKLIST_COLUMNS = ["id", "card_id", "text", "done", "position"]
+
+# The FTS5 search tables of both files (see search.py)
+board_search = table(search.SEARCH_TABLE, column("rowid"), column("title"), column("notes"), column("checklist"), schema="main")
+archived_search = table(search.SEARCH_TABLE, column("rowid"), column("title"), column("notes"), column("checklist"), schema=SCHEMA)
+SEARCH_COLUMNS = ["rowid", "title", "notes", "checklist"]
+
+_SEARCH_DDL = f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SCHEMA}.{search.SEARCH_TABLE} USING fts5(
+    title, notes, checklist,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)"""
+
+
+def ensure_archive(db: Session) -> None:
+    """Create the archive tables on first use (one PRAGMA read afterwards)"""
+    if db.execute(text(f"PRAGMA {SCHEMA}.user_version")).scalar() >= ARCHIVE_VERSION:
+        return
+    conn = db.connection()
+    if DB_PROFILE != "legacy":
+        conn.execute(text(f"PRAGMA {SCHEMA}.journal_mode = {PRAGMAS['journal_mode']}"))
+    metadata.create_all(conn, checkfirst=True)
+    conn.execute(text(_SEARCH_DDL))
+    conn.execute(text(f"PRAGMA {SCHEMA}.user_version = {ARCHIVE_VERSION}"))
+
+
+def _tree(table, root_ids):
+    """Recursive CTE: the ids of ``root_ids`` and all their descendants in ``table``"""
+    tree = select(table.c.id).where(table.c.id.in_(root_ids)).cte("tree", recursive=True)
+    return tree.union_all(select(table.c.id).join(tree, table.c.parent_id == tree.c.id))
+
+
+def archive_cards(db: Session, root_ids: List[int]) -> int:
+    """
+    Move cards, their subtrees and checklists into the archive (no commit).
+    Returns the number of root cards moved.
+    """
+    ensure_archive(db)
+    cards, items = Card.__table__, ChecklistItem.__table__
+    ids = tree.subtree_ids(root_ids)  # path ranges on the board; the archive has no paths
+    db.execute(insert(archived_cards).prefix_with("OR REPLACE").from_select(
+        CARD_COLUMNS, select(*(cards.c[name] for name in CARD_COLUMNS)).where(cards.c.id.in_(ids))))
+    db.execute(insert(archived_checklist).prefix_with("OR REPLACE").from_select(
+        CHECKLIST_COLUMNS, select(*(items.c[name] for name in CHECKLIST_COLUMNS)).where(items.c.card_id.in_(ids))))
+    # The search text is already indexed on the board: copy it across as it is
+    db.execute(delete(archived_search).where(archived_search.c.rowid.in_(ids)))
+    db.execute(insert(archived_search).from_select(
+        SEARCH_COLUMNS, select(*(board_search.c[name] for name in SEARCH_COLUMNS)).where(board_search.c.rowid.in_(ids))))
+    return len(mutations.delete_cards(db, root_ids))
+
+
+def archive_done(db: Session, older_than_days: float, chunk_size: int = CHUNK_SIZE) -> List[int]:
+    """
+    Archive top-level Done cards completed more than ``older_than_days`` ago,
+    committing every ``chunk_size`` cards. Returns the archived root ids.
+    """
+    # Fixed once, so every chunk agrees on it; completed_at is UTC (CURRENT_TIMESTAMP)
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=older_than_days)
+    archived = []
+    while True:
+        root_ids = db.scalars(
+            select(Card.id).where(Card.column_id == DONE_COLUMN_ID, Card.parent_id.is_(None), Card.completed_at < cutoff)
+            .order_by(Card.completed_at, Card.id).limit(chunk_size)
+        ).all()
+        if not root_ids:
+            if archived:
+                # Deleted cards linger in the board's search index until its segments merge
+                search.optimize_index(db)
+                db.commit()
+            return archived
+        archive_cards(db, root_ids)
+        db.commit()
+        archived += root_ids
+
+
+def card_json(row) -> Dict:
+    return {
+        "id": row.id,
+        "column_id": row.column_id,
+        "parent_id": row.parent_id,
+        "title": row.title,
+        "notes": row.notes,
+        "due_at": row.due_at.isoformat() if row.due_at else None,
+        "checklist_total": row.checklist_total,
+        "checklist_done": row.checklist_done,
+        "completed_at": row.completed_at.isoformat() if row.completed_at else None,
+        "archived_at": row.archived_at.isoformat() if row.archived_at else None,
+    }
+
+
+def list_archived(db: Session, limit: int = 50, offset: int = 0) -> Dict:
+    """Archived top-level cards, most recently archived first"""
+    ensure_archive(db)
+    top = archived_cards.c.parent_id.is_(None)
+    rows = db.execute(
+        select(archived_cards).where(top)
+        .order_by(archived_cards.c.archived_at.desc(), archived_cards.c.id.desc())
+        .limit(limit).offset(offset)
+    ).all()
+    total = db.scalar(select(func.count()).select_from(archived_cards).where(top))
+    return {"cards": [card_json(row) for row in rows], "total": total}
+
+
+def search_archived(db: Session, q: str, limit: int = 20) -> List[Dict]:
+    """Archived cards matching ``q`` (title, notes, checklist text), best first"""
+    ensure_archive(db)
+    expr = search.match_expression(q)
+    if not expr:
+        return []
+    rows = db.execute(text(f"""
+        SELECT c.id, c.title, c.column_id, c.parent_id, c.archived_at,
+               snippet({search.SEARCH_TABLE}, -1, '[', ']', '…', 12) AS snippet,
+               bm25({search.SEARCH_TABLE}, {", ".join(map(str, search.RANK_WEIGHTS))}) AS score
+        FROM {SCHEMA}.{search.SEARCH_TABLE}
+        JOIN {SCHEMA}.cards c ON c.id = {search.SEARCH_TABLE}.rowid
+        WHERE {search.SEARCH_TABLE} MATCH :expr
+        ORDER BY score
+        LIMIT :limit
+    """), {"expr": expr, "limit": limit}).mappings().all()
+    return [
+        {
+            "id": r["id"],
+            "title": r["title"],
+            "column_id": r["column_id"],
+            "parent_id": r["parent_id"],
+            "archived_at": r["archived_at"],
+            "snippet": r["snippet"],
+            "score": round(-r["score"], 6),
+        }
+        for r in rows
+    ]
+
+
+def restore(db: Session, card_id: int) -> Optional[Dict]:
+    """
+    Move an archived card and its subtree back onto the board (no commit), at
+    the end of its column. Cards keep their ids unless a board card took one in
+    the meantime; then the whole subtree gets new ids. Returns the new root id
+    and the id mapping, or None if ``card_id`` is not in the archive.
+    """
+    ensure_archive(db)
+    subtree = _tree(archived_cards, [card_id])
+    rows = db.execute(select(archived_cards).where(archived_cards.c.id.in_(select(subtree.c.id)))).all()
+    if not rows:
+        return None
+    items = db.execute(
+        select(archived_checklist).where(archived_checklist.c.card_id.in_([row.id for row in rows]))
+    ).all()
+
+    keep_card_ids = not db.scalar(select(func.count(Card.id)).where(Card.id.in_([row.id for row in rows])))
+    keep_item_ids = not items or not db.scalar(
+        select(func.count(ChecklistItem.id)).where(ChecklistItem.id.in_([item.id for item in items])))
+
+    # Parents before children, so every parent_id can be mapped
+    by_parent = {}
+    for row in rows:
+        by_parent.setdefault(row.parent_id, []).append(row)
+    root = next(row for row in rows if row.id == card_id)
+    # A sub-card comes back under its parent, in the parent's column, if that is
+    # still on the board, and as a top-level card of its own column otherwise
+    parent = db.get(Card, root.parent_id) if root.parent_id is not None else None
+    parent_id, column_id = (parent.id, parent.column_id) if parent else (None, root.column_id)
+    id_map = {}
+    pending = [root]
+    while pending:
+        row = pending.pop()
+        values = {name: getattr(row, name) for name in CARD_COLUMNS if name != "id"}
+        values["column_id"] = column_id  # the whole subtree lives in its top-level card's column
+        if row is root:
+            # At the end of its siblings; a Done card counts as completed now, so
+            # the next sweep does not archive it straight away
+            values.update(parent_id=parent_id, completed_at=None,
+                          position=ordering.next_position(db, column_id, parent_id))
+        else:
+            values["parent_id"] = id_map[row.parent_id]
+        if keep_card_ids:
+            values["id"] = row.id
+        id_map[row.id] = db.scalar(insert(Card).values(**values).returning(Card.id))
+        pending.extend(by_parent.get(row.id, []))
+
+    if items:
+        db.execute(insert(ChecklistItem), [
+            {**({"id": item.id} if keep_item_ids else {}), "card_id": id_map[item.card_id],
+             "text": item.text, "done": item.done, "position": item.position}
+            for item in items
+        ])
+    mutations.touch_cards(db, [id_map[card_id]])
+
+    archived_ids = list(id_map)
+    db.execute(delete(archived_checklist).where(archived_checklist.c.card_id.in_(archived_ids)))
+    db.execute(delete(archived_cards).where(archived_cards.c.id.in_(archived_ids)))
+    db.execute(delete(archived_search).where(archived_search.c.rowid.in_(archived_ids)))
+    return {"id": id_map[card_id], "cards": len(id_map), "checklist_items": len(items), "ids": id_map}
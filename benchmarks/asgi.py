@@ -0,0 +1,64 @@
+"""
+Minimal in-process ASGI client for the benchmarks (no HTTP server, no httpx).
+"""
+import asyncio
+import json as jsonlib
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+
+async def request(app, method: str, path: str, *, form: Optional[Dict] = None, json=None,
+                  headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+    """Send one request straight into an ASGI app and collect the full response"""
+    body = b""
+    hdrs = {k.lower(): v for k, v in (headers or {}).items()}
+    if form is not None:
+        body = urlencode(form).encode()
+        hdrs.setdefault("content-type", "application/x-www-form-urlencoded")
+    elif json is not None:
+        body = jsonlib.dumps(json).encode()
+        hdrs.setdefault("content-type", "application/json")
+    hdrs["content-length"] = str(len(body))
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method.upper(), "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "",
+        "headers": [(k.encode(), v.encode()) for k, v in hdrs.items()],
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+    }
+    sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Like a real client, stay connected until the response is complete
+        # (StreamingResponse stops early on a disconnect)
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    status, response_headers, chunks = 0, {}, []
+
+    async def send(message):
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = {k.decode().lower(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return status, response_headers, b"".join(chunks)
+
+
+def percentile(sorted_values, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
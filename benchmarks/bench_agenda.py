@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+"What's overdue?" without rendering the board: agenda queries vs the board page.
+
+Fills a throwaway database with ``--cards`` cards (generate.py, a share of
+them with due dates spread over +-30 days), then times the board page (where
+the due badges were the only due-date logic), ``GET /api/agenda/overdue``,
+``GET /api/agenda`` for a month with day counts and ``kanban_agent.py due``
+(agent_reads.list_due). Checks the overdue lists and count against a Python
+filter over every card, that the queries are index range scans with no sort,
+and that an overdue subcard leaves the overdue lists when its top-level card
+is moved to Done, by each move path (board, REST, CLI agent), and that no
+write path puts a subcard in another column than its top-level card.
+
+    python benchmarks/bench_agenda.py [--cards 30000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+os.environ["KANBAN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from sqlalchemy import select  # noqa: E402
+from asgi import request  # noqa: E402
+from config import DB_PATH, DONE_COLUMN_ID  # noqa: E402
+from db import SessionLocal  # noqa: E402
+from models import Card  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+import generate  # noqa: E402
+import agent_reads  # noqa: E402
+import agent_ops  # noqa: E402
+import tree  # noqa: E402
+import card_cache  # noqa: E402
+import app  # noqa: E402
+
+
+def get(path):
+    status, _, body = asyncio.run(request(app.app, "GET", path))
+    assert status == 200, (path, status)
+    return body
+
+
+def send(method, path, json=None, form=None, expect=200):
+    status, _, _ = asyncio.run(request(app.app, method, path, json=json, form=form))
+    assert status == expect, (path, status)
+
+
+TODO_COLUMN_ID = 1  # schema.seed_board
+
+
+def overdue_ids():
+    api = {card["id"] for card in json.loads(get("/api/agenda/overdue"))["cards"]}
+    return api | {card["id"] for card in agent_reads.list_due()["overdue"]}
+
+
+def render(card_id):
+    """The card's fragment, through the fragment cache"""
+    with SessionLocal() as db:
+        return str(card_cache.render(app.templates.env, db.get(Card, card_id)))
+
+
+def check_done_subtree():
+    """An overdue subcard (and its own subcard) is Done once its top-level card is moved to Done"""
+    long_ago = datetime(2000, 1, 1)  # first in the overdue lists, whatever their limit
+    with SessionLocal() as db:
+        root = Card(column_id=TODO_COLUMN_ID, title="release", due_at=datetime.combine(date.today(), datetime.min.time()))
+        db.add(root); db.flush()
+        sub = Card(column_id=TODO_COLUMN_ID, parent_id=root.id, title="changelog", due_at=long_ago)
+        db.add(sub); db.flush()
+        db.add(Card(column_id=TODO_COLUMN_ID, parent_id=sub.id, title="typos", due_at=long_ago))
+        db.commit()
+        root_id, sub_id = root.id, sub.id
+    moves = {
+        "board": lambda column_id: send("POST", f"/move/{root_id}", {"column_id": column_id}),
+        "REST": lambda column_id: send("PATCH", f"/api/cards/{root_id}", {"column_id": column_id}),
+        "REST bulk": lambda column_id: send("POST", "/api/moves/bulk", [{"card_id": root_id, "column_id": column_id}]),
+        "CLI agent": lambda column_id: agent_ops.move_card(root_id, "done" if column_id == DONE_COLUMN_ID else "todo"),
+    }
+    for name, move in moves.items():
+        assert sub_id in overdue_ids(), name
+        assert f'value="{TODO_COLUMN_ID}" selected' in render(sub_id), name
+        move(DONE_COLUMN_ID)
+        assert not {sub_id, sub_id + 1} & overdue_ids(), f"{name}: Done card's subcards still overdue"
+        assert f'value="{DONE_COLUMN_ID}" selected' in render(sub_id), f"{name}: stale cached subcard"
+        move(TODO_COLUMN_ID)
+
+    # Subcards stay in their top-level card's column whatever a request asks for
+    assert not agent_ops.move_card(sub_id, "done")["success"], "CLI moved a subcard on its own"
+    send("POST", f"/move/{sub_id}", {"column_id": DONE_COLUMN_ID})
+    send("POST", "/api/moves/bulk", [{"card_id": sub_id, "column_id": DONE_COLUMN_ID}])
+    send("POST", "/api/cards/bulk", [{"column_id": DONE_COLUMN_ID, "parent_id": sub_id, "title": "notes"}], expect=201)
+    send("POST", "/cards", form={"column_id": DONE_COLUMN_ID, "parent_id": root_id, "title": "blog post"})
+    with SessionLocal() as db:
+        columns = {card.id: card.column_id for card in db.scalars(select(Card).where(tree.within(Card.path, f"{root_id}/")))}
+    assert len(columns) == 5 and set(columns.values()) == {TODO_COLUMN_ID}, f"subcards left their card's column: {columns}"
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    ensure_schema()
+    with SessionLocal() as db:
+        generate.build(db, generate.BoardSpec(cards_per_column=args.cards // 3, notes_bytes=100))
+        midnight = datetime.combine(date.today(), datetime.min.time())
+        expected = sorted(card.id for card in db.scalars(select(Card)) if card.due_at and card.due_at < midnight
+                          and card.column_id != DONE_COLUMN_ID)
+
+    month = f"from={date.today().replace(day=1)}&to={date.today().replace(day=1) + timedelta(days=30)}&counts=true"
+    runs = {
+        "GET / (board page)": lambda: get("/"),
+        "GET /api/agenda/overdue": lambda: get("/api/agenda/overdue"),
+        "GET /api/agenda (month)": lambda: get(f"/api/agenda?{month}"),
+        "due (agent_reads)": lambda: agent_reads.list_due(),
+    }
+    print(f"{args.cards} cards, {len(expected)} overdue")
+    print(f"{'query':<26} {'ms':>8} {'KB':>8}")
+    results = {}
+    for name, fn in runs.items():
+        results[name], ms = timed(fn, args.repeat)
+        size = len(results[name]) if isinstance(results[name], bytes) else len(json.dumps(results[name]))
+        print(f"{name:<26} {ms:>8.2f} {size / 1024:>8.1f}")
+
+    # Both return the most overdue cards up to their limit (ties on the cut-off due date may differ);
+    # due counts them all
+    due = results["due (agent_reads)"]
+    for cards, limit in ((json.loads(results["GET /api/agenda/overdue"])["cards"], 200), (due["overdue"], 100)):
+        assert len(cards) == min(limit, len(expected)) and {card["id"] for card in cards} <= set(expected), "overdue differs"
+        assert [card["due_at"] for card in cards] == sorted(card["due_at"] for card in cards), "not in due order"
+    assert due["overdue_count"] == len(expected), "overdue count differs"
+    with sqlite3.connect(DB_PATH) as conn:
+        for start, end in ((None, date.today() - timedelta(days=1)), (date.today(), date.today() + timedelta(days=30))):
+            where, params = agent_reads._open_due(start, end)
+            plan = " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM cards WHERE {where} "
+                                                           "ORDER BY due_at", params))
+            assert re.search(r"SEARCH cards USING (COVERING )?INDEX \S+ \(due_at[<>]", plan) and "TEMP B-TREE" not in plan, plan
+    check_done_subtree()
+    print("OK: overdue lists match, index range scans with no sort, Done cards' subcards not overdue")
+
+
+if __name__ == "__main__":
+    main()
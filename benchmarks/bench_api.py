@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Card import through the web app: one form POST per card vs the bulk JSON API.
+
+Creates ``--cards`` cards (and one checklist item each) both ways, in-process
+against a throwaway database, and reports requests, total time and cards/s.
+
+    python benchmarks/bench_api.py [--cards 5000] [--chunk 1000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ["KANBAN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from asgi import request  # noqa: E402
+import app  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+
+
+async def per_card(cards):
+    requests = 0
+    for i in range(cards):
+        status, _, body = await request(app.app, "POST", "/cards", form={"column_id": i % 3 + 1, "title": f"form {i}"})
+        card_id = int(body.split(b'data-card="', 1)[1].split(b'"', 1)[0])
+        await request(app.app, "POST", f"/checklist/{card_id}", form={"text": "item"})
+        requests += 2
+    return requests
+
+
+async def bulk(cards, chunk):
+    requests = 0
+    for start in range(0, cards, chunk):
+        batch = [{"column_id": i % 3 + 1, "title": f"bulk {i}"} for i in range(start, min(cards, start + chunk))]
+        status, _, body = await request(app.app, "POST", "/api/v1/cards/bulk", json=batch)
+        assert status == 201, body
+        ids = json.loads(body)["ids"]
+        status, _, body = await request(app.app, "POST", "/api/v1/checklist/bulk", json=[{"card_id": i, "text": "item"} for i in ids])
+        assert status == 201, body
+        requests += 2
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=5000)
+    parser.add_argument("--chunk", type=int, default=1000, help="cards per bulk request")
+    args = parser.parse_args()
+
+    ensure_schema()  # what the app's startup (lifespan) does
+    asyncio.run(request(app.app, "GET", "/"))
+    print(f"{'mode':<12} {'requests':>9} {'seconds':>9} {'cards/s':>9}")
+    for label, run in (("form posts", lambda: per_card(args.cards)), ("bulk API", lambda: bulk(args.cards, args.chunk))):
+        start = time.perf_counter()
+        requests = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        print(f"{label:<12} {requests:>9} {elapsed:>9.2f} {args.cards / elapsed:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Board database size and hot-path latency before and after archiving old Done cards.
+
+Builds ``--active`` Todo/Doing cards and ``--done`` old Done cards (two checklist
+items each) in a throwaway database, times the board page, ``status`` and a
+search, archives the Done cards into archive.db and times them again.
+
+    python benchmarks/bench_archive.py [--active 500] [--done 50000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+os.environ["KANBAN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import insert, text  # noqa: E402
+from asgi import request  # noqa: E402
+from config import DB_PATH, ARCHIVE_PATH  # noqa: E402
+from db import SessionLocal  # noqa: E402
+from models import Card, ChecklistItem  # noqa: E402
+import agent_reads  # noqa: E402
+import archive  # noqa: E402
+import changes  # noqa: E402
+import app  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+
+
+def build(active, done):
+    with SessionLocal() as db:
+        rows = [{"id": i, "column_id": 1 + i % 2, "title": f"Active {i}", "notes": "", "position": i * 1024}
+                for i in range(1, active + 1)]
+        rows += [{"id": i, "column_id": 3, "title": f"Finished {i}", "notes": f"Notes {i}", "position": i * 1024,
+                  "checklist_total": 2, "checklist_done": 2} for i in range(active + 1, active + done + 1)]
+        db.execute(insert(Card), rows)
+        db.execute(insert(ChecklistItem), [{"card_id": r["id"], "text": f"step {n}", "done": True, "position": n}
+                                           for r in rows[active:] for n in range(2)])
+        db.execute(text("UPDATE cards SET completed_at = datetime('now', '-90 days') WHERE column_id = 3"))
+        db.commit()
+
+
+def used_bytes(path):
+    """Pages in use (file size minus free pages): what has to stay in cache"""
+    with sqlite3.connect(path) as conn:
+        page_size, pages, free = (conn.execute(f"PRAGMA {p}").fetchone()[0] for p in ("page_size", "page_count", "freelist_count"))
+    return (pages - free) * page_size
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def measure(label, repeat):
+    board = timed(lambda: asyncio.run(request(app.app, "GET", "/")), repeat)
+    status = timed(agent_reads.get_status, repeat)
+    found = timed(lambda: asyncio.run(request(app.app, "GET", "/search?q=active&limit=50")), repeat)
+    print(f"{label:<16} {used_bytes(DB_PATH) / 1e6:>9.1f} {board:>9.1f} {status:>9.1f} {found:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--active", type=int, default=500)
+    parser.add_argument("--done", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    ensure_schema()  # what the app's startup (lifespan) does
+    asyncio.run(request(app.app, "GET", "/"))
+    build(args.active, args.done)
+    print(f"{args.active} active cards, {args.done} Done cards")
+    print(f"{'':<16} {'board MB':>9} {'GET / ms':>9} {'status':>9} {'search':>9}")
+    measure("before archive", args.repeat)
+
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        archived = archive.archive_done(db, 30)
+    print(f"archived {len(archived)} cards in {time.perf_counter() - start:.1f} s "
+          f"(archive.db {used_bytes(ARCHIVE_PATH) / 1e6:.1f} MB)")
+    with SessionLocal() as db:
+        # Steady state: the live-update change log is pruned after KANBAN_CHANGES_RETENTION
+        changes.prune(db, 0); db.commit()
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("VACUUM")  # give the freed pages back, as a periodic VACUUM would
+    measure("after archive", args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Load test: latency of the web routes under concurrency, sync vs async DB path.
+
+Drives app.py in-process with a fixed number of requests in flight (default
+200): a mix of board loads, card updates, checklist toggles and searches.
+Runs once with the threadpool + sync Session path and once with
+KANBAN_DB_ASYNC=1 (AsyncSession over aiosqlite), each in its own process on a
+throwaway database, and reports p50/p95/p99 latency and throughput.
+
+    python benchmarks/bench_async.py [--concurrency 200] [--requests 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+async def load(concurrency, total, cards):
+    from asgi import request, percentile
+    import app
+    from schema import ensure_schema
+
+    ensure_schema()  # what the app's startup (lifespan) does
+    await request(app.app, "GET", "/")
+    for i in range(cards):
+        await request(app.app, "POST", "/cards", form={"column_id": i % 3 + 1, "title": f"card {i}", "notes": "seed"})
+        await request(app.app, "POST", f"/checklist/{i + 1}", form={"text": f"item {i}"})
+
+    rnd = random.Random(1)
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def one():
+        r = rnd.random()
+        card = rnd.randint(1, cards)
+        if r < 0.25:
+            return await request(app.app, "GET", "/")
+        if r < 0.5:
+            return await request(app.app, "PUT", f"/cards/{card}", form={"title": f"edit {rnd.random():.4f}"})
+        if r < 0.75:
+            return await request(app.app, "POST", f"/toggle/{card}")
+        return await request(app.app, "GET", "/search?q=card")
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            status, _, _ = await one()
+            assert status == 200, status
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    from db import async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+    return {
+        "p50_ms": percentile(latencies, 50), "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99), "rps": total / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(load(args.concurrency, args.requests, args.cards))))
+        return
+
+    print(f"{args.requests} requests, {args.concurrency} in flight, {args.cards} cards")
+    print(f"{'mode':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for mode, flag in (("sync", "0"), ("async", "1")):
+        env = dict(os.environ, KANBAN_DB_ASYNC=flag,
+                   KANBAN_DB_PATH=os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db"))
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker",
+                              "--concurrency", str(args.concurrency), "--requests", str(args.requests),
+                              "--cards", str(args.cards)], env=env, cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout
+        r = json.loads(out)
+        print(f"{mode:>6} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['rps']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
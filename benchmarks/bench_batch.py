@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+CLI import benchmark: one kanban_agent.py process per card vs one batch.
+
+Times ``--singles`` separate ``kanban_agent.py add`` invocations (the way
+automation used to call it) and extrapolates to ``--cards``, then imports
+``--cards`` cards plus a checklist item on every tenth card with a single
+``kanban_agent.py batch`` run. Uses a throwaway database.
+
+    python benchmarks/bench_batch.py [--cards 10000] [--singles 30] [--chunk-size 1000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT = os.path.join(ROOT, "kanban_agent.py")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=10000)
+    parser.add_argument("--singles", type=int, default=30, help="single-op processes to time")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    env = dict(os.environ, KANBAN_DB_PATH=os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db"))
+
+    start = time.perf_counter()
+    for i in range(args.singles):
+        subprocess.run([sys.executable, AGENT, "add", f"Single {i}", "", "todo"], env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+    per_call = (time.perf_counter() - start) / args.singles
+
+    lines = [json.dumps({"op": "add", "title": f"Card {i}", "notes": "imported", "column": ["todo", "doing", "done"][i % 3]})
+             for i in range(args.cards)]
+    # Cards from the batch follow the single-op cards
+    lines += [json.dumps({"op": "checklist", "card_id": args.singles + i + 1, "text": "Review"})
+              for i in range(0, args.cards, 10)]
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, AGENT, "batch", "-", "--chunk-size", str(args.chunk_size)], env=env,
+                          input="\n".join(lines), capture_output=True, text=True)
+    batch_time = time.perf_counter() - start
+    summary = json.loads(proc.stderr.strip().splitlines()[-1])
+    if proc.returncode != 0:
+        print(proc.stderr)
+        sys.exit(1)
+
+    ops = len(lines)
+    print(f"single-op processes : {per_call * 1000:8.1f} ms/op  -> {per_call * ops:8.1f} s for {ops} ops (extrapolated)")
+    print(f"batch (chunk {args.chunk_size:>5}) : {batch_time / ops * 1000:8.2f} ms/op  -> {batch_time:8.1f} s for {ops} ops")
+    print(f"applied={summary['applied']} failed={summary['failed']}  speedup x{per_call * ops / batch_time:.0f}")
+
+
+if __name__ == "__main__":
+    main()
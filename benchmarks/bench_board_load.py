@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Board load benchmark: SQL statements and time to load and render the board.
+
+Builds boards of increasing size with nested subcards and checklists, then
+loads and renders board.html the old way (lazy relationship loading) and with
+loaders.load_board (plus the per-column COUNT query). Exits non-zero if the loader's statement count changes
+with board size or nesting depth.
+
+    python benchmarks/bench_board_load.py [--cards 500 3000] [--depth 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+BENCH_DIR = tempfile.mkdtemp(prefix="kanban-bench-")
+os.environ["KANBAN_DB_PATH"] = os.path.join(BENCH_DIR, "bench.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, delete, insert, select  # noqa: E402
+from db import engine, SessionLocal  # noqa: E402
+from models import Board, ColumnModel, Card, ChecklistItem  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+from loaders import load_board, column_counts  # noqa: E402
+import app  # noqa: E402
+
+statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    global statements
+    statements += 1
+
+
+def build_board(cards, depth, checklist):
+    """Top-level cards spread over the columns, each with a chain of ``depth`` subcards"""
+    with SessionLocal() as db:
+        db.execute(delete(ChecklistItem)); db.execute(delete(Card))
+        columns = db.scalars(select(ColumnModel).order_by(ColumnModel.position)).all()
+        per_tree = depth + 1
+        next_id = 1
+        rows, items = [], []
+        for t in range(max(1, cards // per_tree)):
+            col = columns[t % len(columns)]
+            parent = None
+            for level in range(per_tree):
+                rows.append({"id": next_id, "column_id": col.id, "parent_id": parent,
+                             "title": f"card {next_id}", "notes": "", "position": t})
+                items += [{"card_id": next_id, "text": f"item {i}", "done": i % 2 == 0, "position": i} for i in range(checklist)]
+                parent = next_id
+                next_id += 1
+        db.execute(insert(Card), rows)
+        db.execute(insert(ChecklistItem), items)
+        db.commit()
+        return len(rows)
+
+
+def legacy_load(db):
+    board = db.scalar(select(Board).where(Board.name == "My Board"))
+    for c in board.columns:
+        for card in c.cards:
+            _ = card.checklist
+            _ = card.children
+    return board
+
+
+def measure(loader):
+    global statements
+    template = app.templates.get_template("board.html")
+    with SessionLocal() as db:
+        statements = 0
+        start = time.perf_counter()
+        board = loader(db)
+        counts = column_counts(db, [c.id for c in board.columns])
+        template.render(request=None, board=board, counts=counts, page_size=10**9, title="Kanban", today=date.today())
+        return statements, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, nargs="+", default=[500, 3000])
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--checklist", type=int, default=3)
+    args = parser.parse_args()
+
+    ensure_schema()
+    with SessionLocal() as db:
+        app.ensure_seed(db)
+
+    counts = set()
+    print(f"{'cards':>7} {'depth':>6} {'loader':>8} {'statements':>11} {'ms':>9}")
+    for cards in args.cards:
+        for depth in sorted({1, args.depth}):
+            total = build_board(cards, depth, args.checklist)
+            # Load every card (no paging) so both loaders render the same board
+            for name, loader in (("lazy", legacy_load), ("fixed", lambda db: load_board(db, page_size=10**9))):
+                n, ms = measure(loader)
+                if name == "fixed":
+                    counts.add(n)
+                print(f"{total:>7} {depth:>6} {name:>8} {n:>11} {ms:>9.1f}")
+
+    if len(counts) != 1:
+        print(f"FAIL: board load statement count varies with board shape: {sorted(counts)}")
+        sys.exit(1)
+    print(f"OK: board load uses {counts.pop()} statements regardless of size and depth")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Poller sync cost: re-reading the whole board vs reading only what changed.
+
+Fills a throwaway database with ``--cards`` top-level cards (generate.py),
+then for each of ``--rounds`` rounds edits ``--edits`` random cards (titles
+and checklist toggles) and syncs the way a mirroring poller would: a full
+``list_cards()`` / ``GET /api/cards``, and a delta ``list_cards(since=seq)`` /
+``GET /api/changes?since=seq``. Reports bytes transferred and time per sync,
+and checks that the deltas rebuild exactly the full listing, and that a live
+event stream that had to catch up first still receives later changes.
+
+    python benchmarks/bench_changes.py [--cards 20000] [--edits 20] [--rounds 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ["KANBAN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from sqlalchemy import select  # noqa: E402
+from asgi import request  # noqa: E402
+from db import SessionLocal  # noqa: E402
+from models import Card, ChecklistItem  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+import generate  # noqa: E402
+import agent_reads  # noqa: E402
+import agent_ops  # noqa: E402
+import app  # noqa: E402
+import events  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def get(path):
+    status, _, body = asyncio.run(request(app.app, "GET", path))
+    assert status == 200, (path, status)
+    return body
+
+
+async def live_after_catch_up(card_id):
+    """Subscribe a few changes behind, drain the catch-up, then wait for an edit made afterwards"""
+    queue = await app.broadcaster.subscribe(app._latest_change_id() - 5)
+    try:
+        while not queue.empty():
+            queue.get_nowait()
+        await asyncio.to_thread(agent_ops.update_card, card_id, title="Edited live")
+        while True:
+            event = await asyncio.wait_for(queue.get(), timeout=events.POLL_INTERVAL * 20)
+            if event["event"] == "card" and event["data"]["card_id"] == card_id:
+                return
+    finally:
+        await app.broadcaster.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=20000)
+    parser.add_argument("--edits", type=int, default=20, help="cards changed between two syncs")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    ensure_schema()
+    with SessionLocal() as db:
+        generate.build(db, generate.BoardSpec(cards_per_column=args.cards // 3, notes_bytes=100))
+        card_ids = db.scalars(select(Card.id).where(Card.parent_id.is_(None))).all()
+        item_ids = db.scalars(select(ChecklistItem.id)).all()
+    rnd = random.Random(1)
+
+    mirror = {card["id"]: card for card in agent_reads.list_cards()["cards"]}
+    seq = agent_reads.list_cards()["seq"]
+    api_seq = json.loads(get("/api/cards"))["seq"]
+    totals = {name: [0, 0.0] for name in ("list", "list --since", "GET /api/cards", "GET /api/changes")}
+    for _ in range(args.rounds):
+        for n in range(args.edits):
+            if n % 2:
+                agent_ops.toggle_checklist(rnd.choice(item_ids))
+            else:
+                agent_ops.update_card(rnd.choice(card_ids), title=f"Edited {rnd.random():.6f}")
+
+        full, ms = timed(agent_reads.list_cards)
+        totals["list"][0] += len(json.dumps(full)); totals["list"][1] += ms
+        delta, ms = timed(lambda: agent_reads.list_cards(since=seq))
+        totals["list --since"][0] += len(json.dumps(delta)); totals["list --since"][1] += ms
+        mirror.update((card["id"], card) for card in delta["cards"])
+        for card_id in delta["removed"]:
+            mirror.pop(card_id, None)
+        seq = delta["seq"]
+        assert sorted(mirror.values(), key=lambda c: c["id"]) == sorted(full["cards"], key=lambda c: c["id"]), \
+            "delta sync diverged from the full listing"
+
+        body, ms = timed(lambda: get("/api/cards"))
+        totals["GET /api/cards"][0] += len(body); totals["GET /api/cards"][1] += ms
+        body, ms = timed(lambda: get(f"/api/changes?since={api_seq}&limit=5000"))
+        totals["GET /api/changes"][0] += len(body); totals["GET /api/changes"][1] += ms
+        api_seq = json.loads(body)["next"]
+
+    print(f"{len(card_ids)} top-level cards, {args.edits} edits between syncs, {args.rounds} syncs")
+    print(f"{'sync':<18} {'KB/sync':>9} {'ms/sync':>9}")
+    for name, (size, ms) in totals.items():
+        print(f"{name:<18} {size / 1024 / args.rounds:>9.1f} {ms / args.rounds:>9.1f}")
+    asyncio.run(live_after_catch_up(card_ids[0]))
+    print("OK: delta sync matches the full listing; a stream that caught up still gets live changes")
+
+
+if __name__ == "__main__":
+    main()
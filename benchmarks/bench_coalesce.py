@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Write coalescing benchmark: commits per second against edit rate.
+
+``--editors`` simulated clients each type into one card (``--cards`` cards
+shared between them), sending a full PUT /cards/{id} per keystroke every
+``--interval-ms``, while ``--togglers`` clients click checklist items. Runs
+app.py in-process (no server) for ``--seconds`` with coalescing off (one
+commit per request) and on (coalesce.py), and reports requests/second,
+commits/second and p50/p95 latency, then checks that the last fragment
+returned for each card shows the title the database ended up with.
+
+    python benchmarks/bench_coalesce.py [--editors 20] [--togglers 5] [--cards 5] [--interval-ms 5] [--seconds 3]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from html import escape
+
+os.environ["KANBAN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from sqlalchemy import event, select  # noqa: E402
+from asgi import request, percentile  # noqa: E402
+from db import engine, SessionLocal  # noqa: E402
+from models import Card, ChecklistItem  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+import coalesce  # noqa: E402
+import mutations  # noqa: E402
+import app  # noqa: E402
+
+commits = 0
+
+
+@event.listens_for(engine, "commit")
+def _count_commit(conn):
+    global commits
+    commits += 1
+
+
+def setup(cards):
+    ensure_schema()
+    with SessionLocal() as db:
+        ids = []
+        for n in range(cards):
+            card = Card(column_id=1, title=f"Card {n}", notes="", position=(n + 1) * 1024)
+            db.add(card); db.flush()
+            for i in range(3):
+                mutations.add_checklist_item(db, card.id, f"Step {i}")
+            ids.append(card.id)
+        db.commit()
+        items = db.scalars(select(ChecklistItem.id)).all()
+    return ids, items
+
+
+async def run(args, card_ids, item_ids):
+    deadline = time.perf_counter() + args.seconds
+    latencies, confirmed = [], {}
+    interval = args.interval_ms / 1000
+
+    async def timed(method, path, **kwargs):
+        start = time.perf_counter()
+        status, _, body = await request(app.app, method, path, **kwargs)
+        assert status == 200, (method, path, status)
+        latencies.append((time.perf_counter() - start) * 1000)
+        return body
+
+    async def editor(n):
+        card_id, typed = card_ids[n % len(card_ids)], ""
+        while time.perf_counter() < deadline:
+            typed += random.choice("abcdefgh ")
+            body = await timed("PUT", f"/cards/{card_id}", form={"title": f"{n}:{typed}", "notes": f"typed by {n}"})
+            confirmed[card_id] = body.decode()
+            await asyncio.sleep(interval)
+
+    async def toggler(n):
+        rnd = random.Random(n)
+        while time.perf_counter() < deadline:
+            await timed("POST", f"/toggle/{rnd.choice(item_ids)}")
+            await asyncio.sleep(interval)
+
+    before, start = commits, time.perf_counter()
+    await asyncio.gather(*(editor(n) for n in range(args.editors)), *(toggler(n) for n in range(args.togglers)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed, "commits": (commits - before) / elapsed,
+        "p50": percentile(latencies, 50), "p95": percentile(latencies, 95), "confirmed": confirmed,
+    }
+
+
+def titles_match(confirmed):
+    """The fragment the last answered client shows has the card's stored title"""
+    with SessionLocal() as db:
+        stored = dict(db.execute(select(Card.id, Card.title).where(Card.id.in_(confirmed))).all())
+    return all(f"<strong>{escape(stored[card_id])}</strong>" in html for card_id, html in confirmed.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--editors", type=int, default=20)
+    parser.add_argument("--togglers", type=int, default=5)
+    parser.add_argument("--cards", type=int, default=5)
+    parser.add_argument("--interval-ms", type=float, default=5, help="pause between one client's requests")
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    card_ids, item_ids = setup(args.cards)
+    print(f"{args.editors} editors on {args.cards} cards, {args.togglers} togglers, "
+          f"{args.interval_ms:g} ms between requests, window {coalesce.WINDOW * 1000:g} ms")
+    print(f"{'coalescing':<11} {'req/s':>8} {'commits/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'final':>6}")
+    failed = False
+    for enabled in (False, True):
+        coalesce.ENABLED = enabled  # read by the routes on every request
+        r = asyncio.run(run(args, card_ids, item_ids))
+        ok = titles_match(r["confirmed"])
+        # Without coalescing, concurrent writes to one card can be answered out of commit order
+        failed |= enabled and not ok
+        print(f"{'on' if enabled else 'off':<11} {r['rps']:>8.0f} {r['commits']:>10.0f} {r['p50']:>8.2f} "
+              f"{r['p95']:>8.2f} {'ok' if ok else 'stale':>6}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Board page cost on the wire and on the server CPU: uncompressed, gzip, brotli,
+and a conditional request answered with 304 Not Modified.
+
+Builds a ``--cards`` board (with checklists) in a throwaway database and sends
+``--requests`` GET / requests per mode in-process. ``--page-size`` defaults to
+rendering every card, the worst case; the app's default is KANBAN_PAGE_SIZE=50
+per column.
+
+    python benchmarks/bench_compression.py [--cards 5000] [--requests 20] [--page-size 5000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ["KANBAN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_board(cards):
+    from sqlalchemy import insert
+    from db import SessionLocal
+    from models import Card, ChecklistItem
+    with SessionLocal() as db:
+        db.execute(insert(Card), [
+            {"id": i, "column_id": i % 3 + 1, "title": f"Card {i}", "notes": f"Notes for card {i}",
+             "position": i * 1024, "checklist_total": 3, "checklist_done": min(i % 4, 3)}
+            for i in range(1, cards + 1)
+        ])
+        db.execute(insert(ChecklistItem), [
+            {"card_id": i, "text": f"Step {n}", "done": n < i % 4, "position": n * 1024}
+            for i in range(1, cards + 1) for n in range(3)
+        ])
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=5000, help="top-level cards rendered per column")
+    args = parser.parse_args()
+    os.environ["KANBAN_PAGE_SIZE"] = str(args.page_size)
+
+    from asgi import request
+    import app
+    import compression
+
+    from schema import ensure_schema
+    ensure_schema()  # what the app's startup (lifespan) does
+    asyncio.run(request(app.app, "GET", "/"))
+    build_board(args.cards)
+    _, headers, _ = asyncio.run(request(app.app, "GET", "/"))
+    etag = headers["etag"]
+
+    modes = [("identity", {}), ("gzip", {"Accept-Encoding": "gzip"})]
+    if compression.brotli is not None:
+        modes.append(("br", {"Accept-Encoding": "br"}))
+    else:
+        print("brotli not installed (pip install brotli): skipping br")
+    modes.append(("304", {"Accept-Encoding": "gzip, br", "If-None-Match": etag}))
+
+    print(f"{args.cards} cards, {args.requests} requests per mode")
+    print(f"{'mode':<10} {'status':>6} {'bytes':>10} {'ratio':>7} {'cpu ms/req':>11} {'wall ms/req':>12}")
+    baseline = None
+    for label, hdrs in modes:
+        async def run():
+            result = None
+            for _ in range(args.requests):
+                result = await request(app.app, "GET", "/", headers=hdrs)
+            return result
+        cpu, wall = time.process_time(), time.perf_counter()
+        status, response_headers, body = asyncio.run(run())
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        assert response_headers.get("content-encoding", "identity") == label or label == "304", response_headers
+        baseline = baseline or len(body)
+        ratio = f"{baseline / len(body):.1f}x" if body else "-"
+        print(f"{label:<10} {status:>6} {len(body):>10} {ratio:>7} "
+              f"{cpu / args.requests * 1000:>11.1f} {wall / args.requests * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Write contention benchmark: web-server writers against CLI-agent writers.
+
+Runs one "web" process with N threads calling the app.py write routes through
+a shared engine, and M "CLI" processes calling kanban_agent functions, all on
+the same throwaway database for a fixed time. Reports writes/second and
+"database is locked" failures for the legacy connection setup (rollback
+journal, no retries) and for the tuned PRAGMA profile in db.py.
+
+    python benchmarks/bench_contention.py [--web 8] [--cli 4] [--seconds 5]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def web_worker(threads, seconds):
+    from sqlalchemy.exc import OperationalError
+    from db import SessionLocal, is_busy_error
+    import app
+
+    stats = {"ok": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.time() + seconds
+
+    def run(seed):
+        rnd = random.Random(seed)
+        while time.time() < deadline:
+            with SessionLocal() as db:
+                try:
+                    # The synchronous bodies the async routes hand to run_db
+                    if rnd.random() < 0.5:
+                        app._move_card(db, rnd.randint(1, 200), {"column_id": rnd.randint(1, 3), "position": rnd.randint(0, 50)})
+                    else:
+                        app._toggle_item(db, rnd.randint(1, 200))
+                    outcome = "ok"
+                except OperationalError as e:
+                    if not is_busy_error(e):
+                        raise
+                    outcome = "locked"
+            with lock:
+                stats[outcome] += 1
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for w in workers: w.start()
+    for w in workers: w.join()
+    return stats
+
+
+def cli_worker(seconds):
+    from sqlalchemy.exc import OperationalError
+    from db import is_busy_error
+    import kanban_agent
+
+    stats = {"ok": 0, "locked": 0}
+    rnd = random.Random(os.getpid())
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        try:
+            if rnd.random() < 0.5:
+                kanban_agent.add_card(f"cli card {rnd.random():.6f}", "", rnd.choice(["todo", "doing", "done"]))
+            else:
+                kanban_agent.toggle_checklist(rnd.randint(1, 200))
+            stats["ok"] += 1
+        except OperationalError as e:
+            if not is_busy_error(e):
+                raise
+            stats["locked"] += 1
+    return stats
+
+
+def seed(env):
+    code = (
+        "import kanban_agent as k\n"
+        "k.ensure_setup()\n"
+        "for i in range(200):\n"
+        "    k.add_card(f'seed {i}', '', ['todo', 'doing', 'done'][i % 3])\n"
+        "    k.add_checklist(i + 1, 'item')\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def run_profile(profile, args):
+    env = dict(os.environ, KANBAN_DB_PATH=os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db"),
+               KANBAN_DB_PROFILE=profile, PYTHONPATH=ROOT)
+    seed(env)
+    me = os.path.abspath(__file__)
+    procs = [subprocess.Popen([sys.executable, me, "--worker", "web", "--web", str(args.web), "--seconds", str(args.seconds)],
+                              cwd=ROOT, env=env, stdout=subprocess.PIPE)]
+    procs += [subprocess.Popen([sys.executable, me, "--worker", "cli", "--seconds", str(args.seconds)],
+                               cwd=ROOT, env=env, stdout=subprocess.PIPE) for _ in range(args.cli)]
+    results = [json.loads(p.communicate()[0]) for p in procs]
+    web, cli = results[0], results[1:]
+    return {
+        "web_ok": web["ok"], "web_locked": web["locked"],
+        "cli_ok": sum(r["ok"] for r in cli), "cli_locked": sum(r["locked"] for r in cli),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--web", type=int, default=8, help="web writer threads")
+    parser.add_argument("--cli", type=int, default=4, help="CLI writer processes")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--worker", choices=["web", "cli"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.path.insert(0, ROOT)
+        stats = web_worker(args.web, args.seconds) if args.worker == "web" else cli_worker(args.seconds)
+        print(json.dumps(stats))
+        return
+
+    print(f"{args.web} web threads vs {args.cli} CLI processes, {args.seconds:g}s each")
+    print(f"{'profile':>8} {'writes/s':>9} {'web ok':>7} {'web locked':>11} {'cli ok':>7} {'cli locked':>11}")
+    for profile in ("legacy", "tuned"):
+        r = run_profile(profile, args)
+        rate = (r["web_ok"] + r["cli_ok"]) / args.seconds
+        print(f"{profile:>8} {rate:>9.1f} {r['web_ok']:>7} {r['web_locked']:>11} {r['cli_ok']:>7} {r['cli_locked']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Card delete cost: SQL statements and time to delete a card with a large subtree.
+
+Builds a card with ``--descendants`` subcards (``--fanout`` children per card,
+two checklist items each) in a throwaway database, deletes it through the web
+app's delete route and checks that the whole subtree and its checklists are
+gone. Exits non-zero if the delete took more than one DELETE statement.
+
+    python benchmarks/bench_delete.py [--descendants 100 1000 10000] [--fanout 10]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ["KANBAN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert, select, func  # noqa: E402
+from db import engine, SessionLocal  # noqa: E402
+from models import Card, ChecklistItem  # noqa: E402
+import app  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+
+statements = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _record(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement.lstrip().split(None, 1)[0].upper())
+
+
+def build_tree(descendants, fanout):
+    """A root card with ``descendants`` cards below it, breadth first; returns the root id"""
+    with SessionLocal() as db:
+        root = db.scalar(insert(Card).values(column_id=1, title="root", notes="", position=0).returning(Card.id))
+        rows, parents, next_id = [], [root], root + 1
+        while len(rows) < descendants:
+            children = []
+            for parent in parents:
+                for _ in range(fanout):
+                    if len(rows) == descendants:
+                        break
+                    rows.append({"id": next_id, "column_id": 1, "parent_id": parent, "title": f"card {next_id}",
+                                 "notes": "", "position": len(children)})
+                    children.append(next_id)
+                    next_id += 1
+            parents = children
+        db.execute(insert(Card), rows)
+        db.execute(insert(ChecklistItem), [{"card_id": r["id"], "text": f"item {i}", "position": i}
+                                           for r in rows for i in range(2)])
+        db.commit()
+        return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--descendants", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--fanout", type=int, default=10)
+    args = parser.parse_args()
+
+    ensure_schema()  # what the app's startup (lifespan) does
+    failed = False
+    print(f"{'descendants':>11} {'statements':>10} {'deletes':>8} {'ms':>9}")
+    for descendants in args.descendants:
+        root = build_tree(descendants, args.fanout)
+        statements.clear()
+        start = time.perf_counter()
+        with SessionLocal() as db:
+            app._delete_card(db, root)
+        elapsed = (time.perf_counter() - start) * 1000
+        deletes = statements.count("DELETE")
+
+        with SessionLocal() as db:
+            left = db.scalar(select(func.count(Card.id))) + db.scalar(select(func.count(ChecklistItem.id)))
+        failed |= deletes != 1 or left != 0
+        print(f"{descendants:>11} {len(statements):>10} {deletes:>8} {elapsed:>9.1f}" + (f"  {left} rows left!" if left else ""))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Card move benchmark: rows written and latency per move as a column grows.
+
+Compares the old "renumber every sibling" move with the sparse ordering in
+ordering.py. Runs against a throwaway database, never the real board.
+
+    python benchmarks/bench_move.py [--sizes 100 1000 5000] [--moves 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ["KANBAN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert, select  # noqa: E402
+from db import engine, SessionLocal  # noqa: E402
+from models import Board, ColumnModel, Card  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+import ordering  # noqa: E402
+
+writes = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_writes(conn, cursor, statement, parameters, context, executemany):
+    global writes
+    if statement.lstrip().upper().startswith("UPDATE CARDS"):
+        writes += len(parameters) if executemany else 1
+
+
+def legacy_move(db, card, column_id, index):
+    """The previous app.py move: load the column and rewrite every position"""
+    card.column_id = column_id
+    siblings = db.scalars(select(Card).where(Card.column_id == column_id, Card.parent_id == None).order_by(Card.position)).all()
+    siblings = [c for c in siblings if c.id != card.id]
+    siblings.insert(min(index, len(siblings)), card)
+    for i, c in enumerate(siblings):
+        c.position = i
+
+
+def sparse_move(db, card, column_id, index):
+    ordering.place_card(db, card, column_id, index)
+
+
+def make_column(db, board, size, gap):
+    col = ColumnModel(board_id=board.id, name=f"bench-{size}-{gap}", position=99)
+    db.add(col); db.flush()
+    db.execute(insert(Card), [
+        {"column_id": col.id, "title": f"card {i}", "notes": "", "position": i * gap} for i in range(size)
+    ])
+    db.commit()
+    return col.id
+
+
+def run(move, size, moves, gap):
+    global writes
+    rnd = random.Random(size)
+    with SessionLocal() as db:
+        board = db.scalar(select(Board)) or Board(name="bench")
+        db.add(board); db.flush()
+        column_id = make_column(db, board, size, gap)
+        ids = db.scalars(select(Card.id).where(Card.column_id == column_id)).all()
+        latencies, writes = [], 0
+        for _ in range(moves):
+            card = db.get(Card, rnd.choice(ids))
+            start = time.perf_counter()
+            move(db, card, column_id, rnd.randrange(size))
+            db.commit()
+            latencies.append((time.perf_counter() - start) * 1000)
+            db.expire_all()
+        latencies.sort()
+        return {
+            "writes_per_move": writes / moves,
+            "p50_ms": statistics.median(latencies),
+            "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--moves", type=int, default=200)
+    args = parser.parse_args()
+
+    ensure_schema()
+    print(f"{'cards':>7} {'scheme':>8} {'writes/move':>12} {'p50 ms':>8} {'p95 ms':>8}")
+    for size in args.sizes:
+        for name, move, gap in (("renumber", legacy_move, 1), ("sparse", sparse_move, ordering.POSITION_GAP)):
+            r = run(move, size, args.moves, gap)
+            print(f"{size:>7} {name:>8} {r['writes_per_move']:>12.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Render-only microbenchmark: time to turn ``--cards`` cards into HTML.
+
+Builds the cards in memory (no database queries): top-level cards with
+``--depth`` levels of ``--fanout`` subcards, three checklist items each and a
+mix of due dates. Renders them through card_cache.render with an empty
+fragment cache (every card rendered) and with a full one (every card a hit).
+Exits non-zero if a cold render of all cards takes longer than ``--budget-ms``.
+
+    python benchmarks/bench_render.py [--cards 10000] [--depth 1] [--fanout 3] [--repeat 5] [--budget-ms 0]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+os.environ["KANBAN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm.attributes import set_committed_value  # noqa: E402
+from models import Card, ChecklistItem  # noqa: E402
+import card_cache  # noqa: E402
+import app  # noqa: E402
+
+
+def build(total, depth, fanout):
+    """Top-level cards with their subtrees, ``total`` cards in all"""
+    now = datetime.now()
+    per_tree = sum(fanout ** level for level in range(depth + 1))
+    next_id = 1
+
+    def make(level, column_id):
+        nonlocal next_id
+        card_id, next_id = next_id, next_id + 1
+        card = Card(id=card_id, column_id=column_id, parent_id=None, title=f"Card {card_id}",
+                    notes=f"Notes for card {card_id}" if card_id % 2 else "", position=card_id * 1024, version=1,
+                    due_at=now + timedelta(days=card_id % 11 - 5) if card_id % 3 == 0 else None,
+                    checklist_total=3, checklist_done=card_id % 4 if card_id % 4 < 3 else 3)
+        set_committed_value(card, "checklist", [
+            ChecklistItem(id=card_id * 3 + n, card_id=card_id, text=f"Step {n}", done=n < card_id % 4, position=n)
+            for n in range(3)
+        ])
+        set_committed_value(card, "children", [make(level + 1, column_id) for _ in range(fanout)] if level < depth else [])
+        return card
+
+    return [make(0, i % 3 + 1) for i in range(max(1, total // per_tree))], next_id - 1
+
+
+def render_all(roots, today):
+    return sum(len(card_cache.render(app.templates.env, card, today)) for card in roots)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=0, help="fail if a cold render takes longer (0 = no check)")
+    args = parser.parse_args()
+
+    roots, total = build(args.cards, args.depth, args.fanout)
+    card_cache.cache.maxsize = total
+    today = date.today()
+    render_all(roots, today)  # compile the templates
+
+    cold = []
+    for _ in range(args.repeat):
+        card_cache.cache.clear()
+        start = time.perf_counter()
+        size = render_all(roots, today)
+        cold.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        render_all(roots, today)
+    warm = (time.perf_counter() - start) * 1000 / args.repeat
+
+    best = min(cold)
+    print(f"{total} cards ({len(roots)} top-level, depth {args.depth}), {size / 1e6:.1f} MB of HTML")
+    print(f"cold: {best:.1f} ms ({best * 1000 / total:.1f} us/card)   warm (cache hits): {warm:.1f} ms")
+    if args.budget_ms and best > args.budget_ms:
+        print(f"FAIL: cold render over budget ({best:.1f} > {args.budget_ms} ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
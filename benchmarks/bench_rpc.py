@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Agent call latency: one kanban_agent.py process per call vs `serve --stdio`.
+
+Issues the same mix of calls (add_card, list_cards, move_card, get_status)
+both ways against a throwaway database and reports p50/p95 per call.
+
+    python benchmarks/bench_rpc.py [--calls 40] [--cards 200]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT = os.path.join(ROOT, "kanban_agent.py")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from asgi import percentile  # noqa: E402
+
+
+def call_mix(i: int):
+    """(method, params, equivalent CLI argv) for the i-th call"""
+    card_id = i // 4 + 1
+    return [
+        ("add_card", [f"Card {i}", "", "todo"], ["add", f"Card {i}", "", "todo"]),
+        ("list_cards", ["todo"], ["list", "todo"]),
+        ("move_card", [card_id, "doing"], ["move", str(card_id), "doing"]),
+        ("get_status", [], ["status"]),
+    ][i % 4]
+
+
+def subprocess_calls(env, calls):
+    timings = []
+    for i in range(calls):
+        _, _, argv = call_mix(i)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, AGENT, *argv], env=env, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def server_calls(env, calls):
+    server = subprocess.Popen([sys.executable, AGENT, "serve", "--stdio"], env=env, text=True,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    timings = []
+    try:
+        for i in range(calls):
+            method, params, _ = call_mix(i)
+            start = time.perf_counter()
+            server.stdin.write(json.dumps({"jsonrpc": "2.0", "id": i, "method": method, "params": params}) + "\n")
+            server.stdin.flush()
+            reply = json.loads(server.stdout.readline())
+            timings.append(time.perf_counter() - start)
+            if "error" in reply:
+                raise RuntimeError(reply["error"])
+    finally:
+        server.stdin.close()
+        server.wait()
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    print(f"{label:<22} p50 {percentile(timings, 50) * 1000:8.2f} ms   p95 {percentile(timings, 95) * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--cards", type=int, default=200, help="cards on the board before timing")
+    args = parser.parse_args()
+
+    env = dict(os.environ, KANBAN_DB_PATH=os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db"))
+    seed = "\n".join(json.dumps({"op": "add", "title": f"Seed {i}"}) for i in range(args.cards))
+    subprocess.run([sys.executable, AGENT, "batch", "-"], env=env, input=seed, text=True, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    report("process per call", subprocess_calls(env, args.calls))
+    # The first call also waits for the server process to start
+    report("serve --stdio", server_calls(env, args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+CLI startup budget: wall time of `python kanban_agent.py status` and `list`.
+
+Runs each command ``--runs`` times against a throwaway database that is
+already set up, next to a bare ``python -c pass`` for reference, and exits 1
+if the median for a budgeted command exceeds ``--budget-ms``. ``add`` (which
+imports SQLAlchemy) is reported for comparison but not budgeted.
+
+    python benchmarks/bench_startup.py [--runs 15] [--budget-ms 250]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT = os.path.join(ROOT, "kanban_agent.py")
+
+BUDGETED = {"status": ["status"], "list": ["list"]}
+REFERENCE = {"python -c pass": None, "add (ORM)": ["add", "Startup probe"]}
+
+
+def median_ms(env, argv, runs):
+    cmd = [sys.executable, "-c", "pass"] if argv is None else [sys.executable, AGENT, *argv]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("KANBAN_STARTUP_BUDGET_MS", "250")))
+    args = parser.parse_args()
+
+    env = dict(os.environ, KANBAN_DB_PATH=os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db"))
+    seed = "\n".join('{"op": "add", "title": "Card %d"}' % i for i in range(100))
+    subprocess.run([sys.executable, AGENT, "batch", "-"], env=env, input=seed, text=True, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    over = []
+    print(f"{'command':<16} {'median ms':>10}")
+    for label, argv in REFERENCE.items():
+        print(f"{label:<16} {median_ms(env, argv, args.runs):>10.1f}")
+    for label, argv in BUDGETED.items():
+        ms = median_ms(env, argv, args.runs)
+        flag = "" if ms <= args.budget_ms else "  OVER BUDGET"
+        print(f"{label:<16} {ms:>10.1f}{flag}")
+        if flag:
+            over.append(label)
+
+    print(f"budget: {args.budget_ms:.0f} ms for {', '.join(BUDGETED)}")
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
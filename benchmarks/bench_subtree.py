@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Subtree queries on deeply nested cards: recursive CTE vs materialized paths.
+
+Builds ``--roots`` top-level cards per column, each with subcards ``--depth``
+levels deep (``--fanout`` children per card), in a throwaway database. Times
+the SQL, for random cards at every level, of fetching the subtree ids and the
+subtree counts (descendants, checklist totals) with a recursive CTE on
+parent_id and with a range on the path index (tree.py), and checks both give
+the same answer. Then times reparenting random subtrees with tree.reparent,
+counting the SQL statements a move issues, and checks every path and column.
+
+    python benchmarks/bench_subtree.py [--roots 10] [--depth 5] [--fanout 4] [--samples 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ["KANBAN_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="kanban-bench-"), "bench.db")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from sqlalchemy import event, select, func  # noqa: E402
+from db import engine, SessionLocal  # noqa: E402
+from models import Card  # noqa: E402
+from schema import ensure_schema  # noqa: E402
+import generate  # noqa: E402
+import tree  # noqa: E402
+
+statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(*_):
+    global statements
+    statements += 1
+
+
+def cte_ids(card_id):
+    subtree = select(Card.id).where(Card.id == card_id).cte("subtree", recursive=True)
+    return select(subtree.union_all(select(Card.id).join(subtree, Card.parent_id == subtree.c.id)).c.id)
+
+
+def cte_counts(card_id):
+    return select(func.count(Card.id) - 1, func.sum(Card.checklist_total), func.sum(Card.checklist_done)) \
+        .where(Card.id.in_(cte_ids(card_id)))
+
+
+def sql(stmt):
+    return str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+
+
+def timed(conn, statements, repeat):
+    """Mean ms to run each SQL string and fetch its rows (SQLite only, no statement building)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [conn.execute(statement).fetchall() for statement in statements]
+    return results, (time.perf_counter() - start) / repeat / len(statements) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--roots", type=int, default=10, help="top-level cards per column")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=200, help="cards per level, and reparent moves")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ensure_schema()
+    spec = generate.BoardSpec(cards_per_column=args.roots, depth=args.depth, fanout=args.fanout, notes_bytes=50)
+    with SessionLocal() as db:
+        generate.build(db, spec)
+        levels = {}
+        for card_id, path in db.execute(select(Card.id, Card.path)):
+            levels.setdefault(tree.depth(path), []).append(card_id)
+        card_ids = [card_id for ids in levels.values() for card_id in ids]
+    rnd = random.Random(1)
+    print(f"{len(card_ids)} cards, depth {args.depth}, fanout {args.fanout}; SQL time per query, in ms")
+
+    print(f"{'level':>5} {'subtree':>8} {'ids CTE':>9} {'ids path':>9} {'counts CTE':>11} {'counts path':>12}")
+    raw = engine.raw_connection()
+    for level, ids in sorted(levels.items()):
+        sample = rnd.sample(ids, min(args.samples, len(ids)))
+        cte, cte_ms = timed(raw, [sql(cte_ids(c)) for c in sample], args.repeat)
+        path, path_ms = timed(raw, [sql(tree.subtree_ids([c])) for c in sample], args.repeat)
+        assert [sorted(r) for r in cte] == [sorted(r) for r in path], "subtree ids differ"
+        size = sum(len(r) for r in path) / len(sample)
+        cte, cte_counts_ms = timed(raw, [sql(cte_counts(c)) for c in sample], args.repeat)
+        path, path_counts_ms = timed(raw, [sql(tree._counts([c])) for c in sample], args.repeat)
+        assert [tuple(r[0]) for r in cte] == [tuple(r[0][1:]) for r in path], "subtree counts differ"
+        print(f"{level:>5} {size:>8.0f} {cte_ms:>9.3f} {path_ms:>9.3f} {cte_counts_ms:>11.3f} {path_counts_ms:>12.3f}")
+    raw.close()
+
+    # Reparent random cards under random cards outside their own subtree
+    moves, moved_cards, ms = 0, 0, 0.0
+    with SessionLocal() as db:
+        while moves < args.samples:
+            card, parent_id = db.get(Card, rnd.choice(card_ids)), rnd.choice(card_ids + [None])
+            size = len(db.scalars(tree.subtree_ids([card.id])).all())
+            before = statements
+            start = time.perf_counter()
+            try:
+                tree.reparent(db, card, parent_id)
+            except ValueError:
+                db.rollback()
+                continue
+            db.commit()
+            ms += (time.perf_counter() - start) * 1000
+            moves, moved_cards, per_move = moves + 1, moved_cards + size, statements - before
+        check = {c.id: c for c in db.scalars(select(Card))}
+        for c in check.values():
+            expected = (check[c.parent_id].path if c.parent_id else "") + f"{c.id}/"
+            assert c.path == expected, f"card {c.id}: path {c.path} != {expected}"
+            assert c.parent_id is None or c.column_id == check[c.parent_id].column_id, f"card {c.id}: column"
+    print(f"reparent: {ms / moves:.3f} ms/move, {moved_cards / moves:.1f} cards/move, "
+          f"{per_move} statements for the last move")
+    print("OK: CTE and path queries agree; paths and columns consistent after the moves")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Production server scaling: requests/second from 1 to N uvicorn workers.
+
+For each worker count, starts ``uvicorn app:app --workers N`` (the command
+``start.py --prod`` runs) on a fresh throwaway database, so the workers race
+through first-time setup together, and checks that setup left exactly one
+board with three columns. It then fills the board (generate.py) and drives
+``--path`` with ``--clients`` client processes, each holding ``--connections``
+keep-alive HTTP connections, for ``--seconds``.
+
+    python benchmarks/bench_workers.py [--workers 1 2 4] [--clients 4] [--connections 8] [--seconds 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from start import production_command  # noqa: E402
+
+
+async def fetch(reader, writer, path):
+    """One keep-alive GET; returns the status code"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.lower().split(": ", 1) for line in lines[1:] if ": " in line)
+    await reader.readexactly(int(headers["content-length"]))
+    return int(lines[0].split()[1])
+
+
+async def client(port, path, connections, seconds):
+    deadline = time.perf_counter() + seconds
+    counts = {"ok": 0, "errors": 0}
+
+    async def connection():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while time.perf_counter() < deadline:
+            status = await fetch(reader, writer, path)
+            counts["ok" if status == 200 else "errors"] += 1
+        writer.close()
+
+    await asyncio.gather(*(connection() for _ in range(connections)))
+    return counts
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/test", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def run(workers, args):
+    workdir = tempfile.mkdtemp(prefix="kanban-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    env = dict(os.environ, KANBAN_DB_PATH=db_path, KANBAN_TEMPLATE_CACHE_DIR=os.path.join(workdir, "templates"))
+    port = free_port()
+    server = subprocess.Popen(production_command(sys.executable, "127.0.0.1", port, workers), cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        wait_ready(port)
+        time.sleep(1)  # let every worker finish its startup
+        with sqlite3.connect(db_path) as conn:
+            boards = conn.execute("SELECT count(*) FROM boards").fetchone()[0]
+            columns = conn.execute("SELECT count(*) FROM columns").fetchone()[0]
+        subprocess.run([sys.executable, os.path.join(BENCH_DIR, "generate.py"), "--db", db_path,
+                        "--cards-per-column", str(args.cards_per_column)], cwd=ROOT, env=env, check=True,
+                       capture_output=True)
+
+        me = os.path.abspath(__file__)
+        clients = [subprocess.Popen([sys.executable, me, "--client", str(port), "--path", args.path,
+                                     "--connections", str(args.connections), "--seconds", str(args.seconds)],
+                                    stdout=subprocess.PIPE) for _ in range(args.clients)]
+        results = [json.loads(c.communicate()[0]) for c in clients]
+    finally:
+        server.terminate()
+        _, stderr = server.communicate(timeout=30)
+    ok = sum(r["ok"] for r in results)
+    errors = sum(r["errors"] for r in results) + stderr.count(b"Traceback")
+    return {"rps": ok / args.seconds, "errors": errors, "setup_ok": boards == 1 and columns == 3}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=4, help="load generator processes")
+    parser.add_argument("--connections", type=int, default=8, help="keep-alive connections per client process")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--cards-per-column", type=int, default=50)
+    parser.add_argument("--client", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.client:
+        print(json.dumps(asyncio.run(client(args.client, args.path, args.connections, args.seconds))))
+        return
+
+    print(f"GET {args.path}, {args.clients} clients x {args.connections} connections, {args.seconds:g}s, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'errors':>7} {'setup':>6}")
+    base = None
+    failed = False
+    for workers in args.workers:
+        r = run(workers, args)
+        base = base or r["rps"]
+        failed |= not r["setup_ok"] or r["errors"] > 0
+        print(f"{workers:>7} {r['rps']:>9.1f} {r['rps'] / base:>7.2f}x {r['errors']:>7} "
+              f"{'ok' if r['setup_ok'] else 'BROKEN':>6}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Synthetic board generator: fills a database with a board of configurable size.
+
+Top-level cards are spread over the three columns (``--cards-per-column``),
+each with a tree of subcards ``--depth`` levels deep (``--fanout`` children
+per card). Every card gets ``--checklist`` items (about a third of them done)
+and ``--notes-bytes`` of notes drawn from a fixed vocabulary, so search has
+something realistic to rank. ``--due-fraction`` of the cards get a due date
+spread uniformly over ``--due-spread-days`` days either side of today. The
+same ``--seed`` always builds the same board.
+
+Writes to ``--db`` (created if missing, never an existing board by accident:
+it refuses a database that already holds cards unless ``--force``).
+
+    python benchmarks/generate.py --db /tmp/big.db [--cards-per-column 1000] [--depth 2] [--fanout 3]
+"""
+import argparse
+import os
+import random
+import sys
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VOCABULARY = (
+    "deploy release review refactor database index query cache latency budget migration schema test fixture "
+    "login session token search board column card checklist backlog sprint estimate customer invoice report "
+    "export import sync offline mobile layout style icon font accessibility keyboard shortcut drag drop "
+    "archive restore backup monitor alert metric dashboard error timeout retry queue worker thread lock"
+).split()
+
+INSERT_CHUNK = 5000
+
+
+@dataclass
+class BoardSpec:
+    cards_per_column: int = 1000
+    depth: int = 0
+    fanout: int = 3
+    checklist: int = 3
+    notes_bytes: int = 200
+    due_fraction: float = 0.3
+    due_spread_days: int = 30
+    seed: int = 1
+
+    def total_cards(self) -> int:
+        per_tree = sum(self.fanout ** level for level in range(self.depth + 1))
+        return self.cards_per_column * 3 * per_tree
+
+
+def _text(rnd: random.Random, size: int) -> str:
+    words, length = [], 0
+    while length < size:
+        word = rnd.choice(VOCABULARY)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def build(db, spec: BoardSpec) -> Dict[str, int]:
+    """Insert the board described by ``spec`` (set-based, committed in chunks); returns row counts"""
+    from sqlalchemy import insert, select, func
+    from models import Card, ChecklistItem
+    from ordering import POSITION_GAP
+
+    rnd = random.Random(spec.seed)
+    now = datetime.now().replace(second=0, microsecond=0)
+    next_id = (db.scalar(select(func.max(Card.id))) or 0) + 1
+    next_item = (db.scalar(select(func.max(ChecklistItem.id))) or 0) + 1
+    cards, items = [], []
+    totals = {"cards": 0, "checklist_items": 0}
+
+    def flush():
+        if cards:
+            db.execute(insert(Card), cards)
+        if items:
+            db.execute(insert(ChecklistItem), items)
+        db.commit()
+        totals["cards"] += len(cards)
+        totals["checklist_items"] += len(items)
+        cards.clear()
+        items.clear()
+
+    def add(column_id, parent_id, index, level):
+        nonlocal next_id, next_item
+        card_id, next_id = next_id, next_id + 1
+        due_at = None
+        if rnd.random() < spec.due_fraction:
+            due_at = now + timedelta(minutes=rnd.randint(-spec.due_spread_days * 1440, spec.due_spread_days * 1440))
+        done = [rnd.random() < 1 / 3 for _ in range(spec.checklist)]
+        cards.append({
+            "id": card_id, "column_id": column_id, "parent_id": parent_id,
+            "title": f"{rnd.choice(VOCABULARY).capitalize()} {rnd.choice(VOCABULARY)} #{card_id}",
+            "notes": _text(rnd, spec.notes_bytes), "due_at": due_at, "position": (index + 1) * POSITION_GAP,
+            "checklist_total": spec.checklist, "checklist_done": sum(done),
+        })
+        for n, is_done in enumerate(done):
+            items.append({"id": next_item, "card_id": card_id, "text": _text(rnd, 30), "done": is_done,
+                          "position": (n + 1) * POSITION_GAP})
+            next_item += 1
+        if len(cards) >= INSERT_CHUNK:
+            flush()
+        if level < spec.depth:
+            for child in range(spec.fanout):
+                add(column_id, card_id, child, level + 1)
+
+    for column_id in (1, 2, 3):
+        for index in range(spec.cards_per_column):
+            add(column_id, None, index, 0)
+    flush()
+    return totals
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """The BoardSpec fields as command line options (shared with run.py)"""
+    defaults = BoardSpec()
+    parser.add_argument("--cards-per-column", type=int, default=defaults.cards_per_column,
+                        help="top-level cards in each column")
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="levels of subcards below each card")
+    parser.add_argument("--fanout", type=int, default=defaults.fanout, help="subcards per card on each level")
+    parser.add_argument("--checklist", type=int, default=defaults.checklist, help="checklist items per card")
+    parser.add_argument("--notes-bytes", type=int, default=defaults.notes_bytes, help="notes length per card")
+    parser.add_argument("--due-fraction", type=float, default=defaults.due_fraction,
+                        help="share of cards with a due date")
+    parser.add_argument("--due-spread-days", type=int, default=defaults.due_spread_days,
+                        help="due dates fall uniformly within this many days of today, either side")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_args(args) -> BoardSpec:
+    return BoardSpec(**{name: getattr(args, name) for name in asdict(BoardSpec())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", required=True, help="database file to fill")
+    parser.add_argument("--force", action="store_true", help="add to a database that already has cards")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    os.environ["KANBAN_DB_PATH"] = os.path.abspath(args.db)
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import select, func
+    from db import SessionLocal
+    from models import Card
+    from schema import ensure_schema
+
+    spec = spec_from_args(args)
+    ensure_schema()
+    with SessionLocal() as db:
+        if db.scalar(select(func.count(Card.id))) and not args.force:
+            sys.exit(f"{args.db} already has cards; pass --force to add more")
+        totals = build(db, spec)
+    print(f"{totals['cards']} cards, {totals['checklist_items']} checklist items -> {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: latency, throughput and peak memory of the web and CLI paths.
+
+Generates one synthetic board (see generate.py; the same options apply), then
+runs each scenario in a fresh process on its own copy of that database:
+
+    web   GET /, POST /move, POST /toggle, PUT /cards, GET /search (app.py in-process, no server)
+    cli   list, status, search (the kanban_agent.py functions, called directly)
+
+and reports p50/p95/p99 latency, calls per second and the peak RSS of the
+process. ``--json FILE`` writes the results with the board spec, commit and
+versions; ``--baseline FILE`` compares against an earlier run.
+
+    python benchmarks/run.py [--cards-per-column 1000] [--requests 200] [--json out.json] [--baseline old.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import generate  # noqa: E402
+
+WEB_SCENARIOS = ["GET /", "POST /move", "POST /toggle", "PUT /cards", "GET /search"]
+CLI_SCENARIOS = ["list", "status", "search"]
+SCENARIOS = WEB_SCENARIOS + CLI_SCENARIOS
+WARMUP = 5
+SEARCH_TERMS = ["deploy", "cache latency", "revie", "board column", "timeout retry"]
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)  # bytes on macOS, KiB elsewhere
+
+
+def _ids(query):
+    from config import DB_PATH
+    with sqlite3.connect(DB_PATH) as conn:
+        return [row[0] for row in conn.execute(query)]
+
+
+def _calls(scenario, rnd):
+    """An endless supply of zero-argument callables for one scenario"""
+    from asgi import request
+    import agent_reads
+    import agent_ops
+    import app
+
+    def web(method, path, **kwargs):
+        status, _, _ = asyncio.run(request(app.app, method, path, **kwargs))
+        assert status == 200, (method, path, status)
+
+    if scenario in WEB_SCENARIOS:
+        cards = _ids("SELECT id FROM cards WHERE parent_id IS NULL")
+        items = _ids("SELECT id FROM checklist_items") or [0]
+    while True:
+        if scenario == "GET /":
+            yield lambda: web("GET", "/")
+        elif scenario == "POST /move":
+            card, column, index = rnd.choice(cards), rnd.randint(1, 3), rnd.randint(0, 20)
+            yield lambda: web("POST", f"/move/{card}", json={"column_id": column, "position": index})
+        elif scenario == "POST /toggle":
+            item = rnd.choice(items)
+            yield lambda: web("POST", f"/toggle/{item}")
+        elif scenario == "PUT /cards":
+            card, title = rnd.choice(cards), f"Edited {rnd.random():.6f}"
+            yield lambda: web("PUT", f"/cards/{card}", form={"title": title})
+        elif scenario == "GET /search":
+            q = rnd.choice(SEARCH_TERMS)
+            yield lambda: web("GET", f"/search?q={q}")
+        elif scenario == "list":
+            yield agent_reads.list_cards
+        elif scenario == "status":
+            yield agent_reads.get_status
+        elif scenario == "search":
+            q = rnd.choice(SEARCH_TERMS)
+            yield lambda: agent_ops.search_cards(q)
+        else:
+            raise ValueError(f"unknown scenario {scenario!r}")
+
+
+def run_scenario(scenario, count, seed):
+    """Runs in the worker process: ``count`` timed calls after a short warmup"""
+    from asgi import percentile
+    sys.path.insert(0, ROOT)
+    rnd = random.Random(seed)
+    calls = _calls(scenario, rnd)
+    for _ in range(WARMUP):
+        next(calls)()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        call = next(calls)
+        t = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "calls": count,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "per_second": round(count / elapsed, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _build_template(spec, path):
+    out = subprocess.run([sys.executable, os.path.join(BENCH_DIR, "generate.py"), "--db", path,
+                          *(f"--{name.replace('_', '-')}={value}" for name, value in vars(spec).items())],
+                         cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # so copying the main file copies everything
+    return out.strip()
+
+
+def _compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path} ({baseline.get('commit') or 'unknown commit'})")
+    print(f"{'scenario':<14} {'p50':>9} {'p95':>9} {'p99':>9} {'per s':>9}")
+    for scenario, r in results.items():
+        old = baseline["results"].get(scenario)
+        if not old:
+            continue
+        change = [f"{(r[key] / old[key] - 1) * 100:+8.1f}%" if old[key] else f"{'-':>9}"
+                  for key in ("p50_ms", "p95_ms", "p99_ms", "per_second")]
+        print(f"{scenario:<14} {' '.join(change)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    generate.add_arguments(parser)
+    parser.add_argument("--requests", type=int, default=200, help="timed calls per scenario")
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS, metavar="SCENARIO")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare with the JSON of an earlier run")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_scenario(args.worker, args.requests, args.seed)))
+        return
+
+    spec = generate.spec_from_args(args)
+    workdir = tempfile.mkdtemp(prefix="kanban-bench-")
+    template = os.path.join(workdir, "template.db")
+    print(f"Generating board: {_build_template(spec, template)}")
+
+    results = {}
+    print(f"{'scenario':<14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'per s':>9} {'peak MB':>9}")
+    for n, scenario in enumerate(args.scenarios):
+        db_path = os.path.join(workdir, f"run{n}.db")
+        shutil.copyfile(template, db_path)
+        env = dict(os.environ, KANBAN_DB_PATH=db_path, KANBAN_ARCHIVE_PATH=os.path.join(workdir, f"run{n}-archive.db"))
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", scenario,
+                              "--requests", str(args.requests), "--seed", str(args.seed)],
+                             env=env, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        r = results[scenario] = json.loads(out.strip().splitlines()[-1])
+        print(f"{scenario:<14} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+              f"{r['per_second']:>9.1f} {r['peak_rss_mb']:>9.1f}")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "commit": _git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "spec": vars(spec),
+        "cards": spec.total_cards(),
+        "requests": args.requests,
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.json}")
+    if args.baseline:
+        _compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+In-process LRU cache of rendered card fragments.
+
+Fragments are keyed by ``(card_id, card.version, today)``: every write that
+changes what a card renders bumps its version (see mutations.touch_card), and
+the date is part of the key because the due badge depends on it. Card ids are
+never reused (AUTOINCREMENT), so a new card cannot pick up the fragment of a
+deleted one. Stale entries are never served, they simply age out of the LRU.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Hashable, NamedTuple, Optional
+from jinja2 import Environment, pass_context
+from markupsafe import Markup
+from config import DUE_SOON_DAYS
+import metrics
+
+CACHE_SIZE = int(os.environ.get("KANBAN_CARD_CACHE_SIZE", "5000"))
+
+
+class FragmentCache:
+    """Thread-safe LRU mapping with hit/miss/eviction counters (maxsize 0 disables it)"""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Markup]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Markup]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Markup) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+cache = FragmentCache()
+
+
+class CardView(NamedTuple):
+    """What ``_card.html`` shows besides the card's own fields, computed once in Python"""
+    due_class: str
+    due_label: str
+    progress_label: str
+    progress_percent: int
+    selected: Dict[int, str]  # ' selected' on the card's column in the move menu
+
+
+_SELECTED = {column_id: {c: " selected" if c == column_id else "" for c in (1, 2, 3)} for column_id in (1, 2, 3)}
+_NOT_SELECTED = {1: "", 2: "", 3: ""}
+
+
+def card_view(card, today: date) -> CardView:
+    due_class = due_label = ""
+    if card.due_at:
+        days = (card.due_at.date() - today).days
+        if days < 0:
+            due_class, due_label = "due-overdue", "Overdue"
+        elif days == 0:
+            due_class, due_label = "due-today", "Due Today"
+        else:
+            due_class, due_label = "due-soon" if days <= DUE_SOON_DAYS else "", f"Due {card.due_at.strftime('%m/%d')}"
+    total, done = card.checklist_total, card.checklist_done
+    return CardView(
+        due_class=due_class,
+        due_label=due_label,
+        progress_label=f"{done}/{total}",
+        progress_percent=round(done * 100 / total) if total else 0,
+        selected=_SELECTED.get(card.column_id, _NOT_SELECTED),
+    )
+
+
+def _card_macro(env: Environment):
+    # The module of a template is built once per (re)load of the template
+    return env.get_template("_card.html").module.card
+
+
+def render(env: Environment, card, today: Optional[date] = None) -> Markup:
+    """Rendered ``_card.html`` for a card (and its subtree), from the cache when possible"""
+    today = today or date.today()
+    key = (card.id, card.version, today)
+    html = cache.get(key)
+    if html is None:
+        start = time.perf_counter()
+        html = Markup(_card_macro(env)(card, card_view(card, today), today))
+        if metrics.ENABLED:
+            metrics.RENDER_SECONDS.observe(time.perf_counter() - start, "_card.html")
+        cache.put(key, html)
+    return html
+
+
+@pass_context
+def render_card(context, card, today: Optional[date] = None) -> Markup:
+    """Template global: ``{{ render_card(card) }}`` using the ``today`` of the calling template"""
+    return render(context.environment, card, today or context.get("today"))
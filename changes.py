@@ -0,0 +1,159 @@
+"""
+Change log of the ``cards`` and ``checklist_items`` tables.
+
+Triggers append a row to ``card_changes`` for every insert, update and delete,
+so changes made by any process - the web app, the CLI agent, the JSON API or a
+plain sqlite3 shell - can be picked up with a cheap ``WHERE id > ?`` read: by
+the live board (events.py), by ``GET /api/changes?since=`` and by
+``kanban_agent.py changes --since`` / ``list --since``. The id is the sequence
+number readers resume from. Each row names the entity, the operation and, for
+updates, the columns that changed. Checklist edits also bump the card's
+version (mutations.touch_card), so they are logged as card updates too, as are
+the ancestors whose rendered subtree contains the changed card.
+
+Two kinds of upkeep keep the log small. ``compact`` drops entries older than
+COMPACT_AFTER_SECONDS that a newer entry for the same card or item supersedes,
+so a reader that resumes from an old id still sees the latest state of
+everything that changed. ``prune`` drops everything older than the retention
+window and records how far it went: readers from before that point must
+re-read the board.
+"""
+import os
+from typing import Dict, List
+from sqlalchemy import text, select, delete, update, func
+from sqlalchemy.orm import Session
+from models import CardChange, ChangeLogState
+
+# How long logged changes are kept for reconnecting clients and pollers
+RETENTION_SECONDS = int(os.environ.get("KANBAN_CHANGES_RETENTION", str(24 * 3600)))
+# Entries older than this are merged per card / checklist item
+COMPACT_AFTER_SECONDS = int(os.environ.get("KANBAN_CHANGES_COMPACT_AFTER", "3600"))
+
+# Columns whose changes are recorded, per table
+CARD_FIELDS = ("column_id", "parent_id", "title", "notes", "due_at", "position", "version",
+               "checklist_total", "checklist_done", "completed_at")
+ITEM_FIELDS = ("card_id", "text", "done", "position")
+
+
+def _changed_fields(columns) -> str:
+    """SQL for the comma-separated names of the columns an UPDATE changed ('' if none)"""
+    names = " || ".join(f"CASE WHEN old.{c} IS NOT new.{c} THEN '{c},' ELSE '' END" for c in columns)
+    return f"rtrim({names}, ',')"
+
+
+_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS card_changes_ai AFTER INSERT ON cards BEGIN
+        INSERT INTO card_changes(card_id, op, entity, entity_id) VALUES (new.id, 'upsert', 'card', new.id);
+    END""",
+    # Updates that change nothing (same values written back) are not logged
+    f"""CREATE TRIGGER IF NOT EXISTS card_changes_au AFTER UPDATE ON cards BEGIN
+        INSERT INTO card_changes(card_id, op, entity, entity_id, fields)
+        SELECT new.id, 'upsert', 'card', new.id, f FROM (SELECT {_changed_fields(CARD_FIELDS)} AS f) WHERE f != '';
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS card_changes_ad AFTER DELETE ON cards BEGIN
+        INSERT INTO card_changes(card_id, op, entity, entity_id) VALUES (old.id, 'delete', 'card', old.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS card_changes_item_ai AFTER INSERT ON checklist_items BEGIN
+        INSERT INTO card_changes(card_id, op, entity, entity_id) VALUES (new.card_id, 'upsert', 'checklist_item', new.id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS card_changes_item_au AFTER UPDATE ON checklist_items BEGIN
+        INSERT INTO card_changes(card_id, op, entity, entity_id, fields)
+        SELECT new.card_id, 'upsert', 'checklist_item', new.id, f FROM (SELECT {_changed_fields(ITEM_FIELDS)} AS f)
+        WHERE f != '';
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS card_changes_item_ad AFTER DELETE ON checklist_items BEGIN
+        INSERT INTO card_changes(card_id, op, entity, entity_id) VALUES (old.card_id, 'delete', 'checklist_item', old.id);
+    END""",
+]
+
+
+def create_log(conn) -> None:
+    """Create the change log tables and their triggers on a connection"""
+    CardChange.__table__.create(conn, checkfirst=True)
+    ChangeLogState.__table__.create(conn, checkfirst=True)
+    for statement in _TRIGGERS:
+        conn.execute(text(statement))
+
+
+def recreate_triggers(conn) -> None:
+    """Replace the log triggers with their current definitions; starts the pruning horizon if there is none"""
+    for name in conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE 'card_changes_%'"
+    )).scalars().all():
+        conn.execute(text(f"DROP TRIGGER {name}"))
+    create_log(conn)
+    conn.execute(text("UPDATE card_changes SET entity_id = card_id WHERE entity_id IS NULL"))
+    # Whatever was pruned before the horizon was recorded ended just below the oldest entry
+    conn.execute(text("""INSERT INTO card_changes_state(id, pruned_through) SELECT 1, coalesce(
+        (SELECT min(id) - 1 FROM card_changes), (SELECT seq FROM sqlite_sequence WHERE name = 'card_changes'), 0)
+        WHERE NOT EXISTS (SELECT 1 FROM card_changes_state)"""))
+
+
+def latest_id(db: Session) -> int:
+    """
+    Id of the newest logged change (0 if none). Never goes backwards: once
+    ``prune`` has emptied the log it is the pruning horizon.
+    """
+    return db.scalar(select(func.max(
+        func.coalesce(select(func.max(CardChange.id)).scalar_subquery(), 0),
+        func.coalesce(select(ChangeLogState.pruned_through).scalar_subquery(), 0),
+    )))
+
+
+def horizon(db: Session) -> int:
+    """Newest change id removed by ``prune``; a reader resuming from before it has missed changes"""
+    return db.scalar(select(ChangeLogState.pruned_through)) or 0
+
+
+def since(db: Session, after_id: int, limit: int) -> List[CardChange]:
+    """Changes logged after ``after_id``, oldest first"""
+    return db.scalars(select(CardChange).where(CardChange.id > after_id).order_by(CardChange.id).limit(limit)).all()
+
+
+def change_json(change: CardChange) -> Dict:
+    return {
+        "seq": change.id,
+        "entity": change.entity,
+        "id": change.entity_id,
+        "card_id": change.card_id,
+        "op": change.op,
+        "fields": change.fields.split(",") if change.fields else None,
+        "at": change.created_at.isoformat() if change.created_at else None,
+    }
+
+
+def compact(db: Session, older_than_seconds: int = COMPACT_AFTER_SECONDS) -> int:
+    """
+    Drop entries older than the cutoff that a newer entry for the same entity
+    supersedes. The newest entry keeps its id; its ``fields`` become NULL (any
+    column may have changed) when it absorbed entries that listed others.
+    Returns the number of rows removed.
+    """
+    cutoff = func.datetime("now", f"-{int(older_than_seconds)} seconds")
+    older, newer = CardChange.__table__.alias("older"), CardChange.__table__.alias("newer")
+
+    def same_entity(other):
+        return (other.c.entity == CardChange.entity) & (other.c.entity_id == CardChange.entity_id)
+
+    superseded = select(newer.c.id).where(same_entity(newer), newer.c.id > CardChange.id).exists()
+    db.execute(
+        update(CardChange).where(
+            CardChange.fields.is_not(None), ~superseded,
+            select(older.c.id).where(same_entity(older), older.c.id < CardChange.id, older.c.created_at < cutoff,
+                                     older.c.fields.is_distinct_from(CardChange.fields)).exists(),
+        ).values(fields=None).execution_options(synchronize_session=False)
+    )
+    return db.execute(
+        delete(CardChange).where(CardChange.created_at < cutoff, superseded).execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def prune(db: Session, retention_seconds: int = RETENTION_SECONDS) -> int:
+    """Drop changes older than the retention window and move the horizon; returns the number of rows removed"""
+    through = db.scalar(select(func.max(CardChange.id)).where(
+        CardChange.created_at < func.datetime("now", f"-{int(retention_seconds)} seconds")))
+    if through is None:
+        return 0
+    db.execute(update(ChangeLogState).values(pruned_through=func.max(ChangeLogState.pruned_through, through)))
+    return db.execute(delete(CardChange).where(CardChange.id <= through)).rowcount
+
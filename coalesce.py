@@ -0,0 +1,108 @@
+"""
+Write coalescing for rapid edits (autosave, checklist clicking).
+
+Routes hand their change to ``WriteCoalescer.submit`` instead of committing it
+themselves. Changes to the same target within a short window (KANBAN_COALESCE_WINDOW
+seconds) are merged - card edits last-writer-wins per field - and a single
+writer task applies everything pending in one session and one commit, then
+answers every waiting request with the result for its target. Changes that
+arrive while a batch is being committed wait for the next one, so commits per
+second stay flat however fast clients send.
+
+The writer task runs in a context of its own, not that of the request that
+started it, and the SQL of each commit is counted for every request it
+answered (metrics.py). The writer runs in each web process; with several
+workers each one groups its own requests. KANBAN_COALESCE=0 makes the routes write directly again.
+"""
+import asyncio
+import contextvars
+import os
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import metrics
+
+ENABLED = os.environ.get("KANBAN_COALESCE", "1") != "0"
+WINDOW = float(os.environ.get("KANBAN_COALESCE_WINDOW", "0.005"))  # seconds
+
+# apply(batch) -> result per target key; runs on a worker thread and commits
+Apply = Callable[[Dict[Hashable, Any]], Dict[Hashable, Any]]
+Merge = Callable[[Any, Any], Any]
+# A waiting request: its future and its SQL counters (metrics.request_sql)
+Waiter = Tuple[asyncio.Future, Optional[List]]
+Batch = Dict[Hashable, Tuple[Any, List[Waiter]]]
+
+
+def replace(old: Any, new: Any) -> Any:
+    return new
+
+
+def merge_fields(old: Dict, new: Dict) -> Dict:
+    """Last writer wins, field by field"""
+    return {**old, **new}
+
+
+def count(old: int, new: int) -> int:
+    return old + new
+
+
+class WriteCoalescer:
+    def __init__(self, apply: Apply, window: float = WINDOW):
+        self.apply = apply
+        self.window = window
+        # key -> (merged change, the requests waiting on it)
+        self._pending: Batch = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, key: Hashable, change: Any, merge: Merge = replace) -> Any:
+        """Queue ``change`` for ``key`` and wait until it is committed; returns apply's result for ``key``"""
+        future = asyncio.get_running_loop().create_future()
+        waiter = (future, metrics.request_sql())
+        if key in self._pending:
+            merged, waiters = self._pending[key]
+            self._pending[key] = (merge(merged, change), waiters + [waiter])
+        else:
+            self._pending[key] = (change, [waiter])
+        if self._task is None:
+            # A fresh context: the writer outlives this request and serves others
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+        return await future
+
+    async def _run(self) -> None:
+        try:
+            # Runs while there is work; the next submit starts a new writer
+            while self._pending:
+                await asyncio.sleep(self.window)
+                batch, self._pending = self._pending, {}
+                await self._flush(batch)
+        finally:
+            self._task = None
+            if self._pending:  # cancelled (loop shutting down): nobody will commit these
+                batch, self._pending = self._pending, {}
+                self._fail(batch, RuntimeError("write coalescer stopped"))
+
+    async def _flush(self, batch: Batch) -> None:
+        try:
+            results, sql = await asyncio.to_thread(
+                metrics.collect_sql, self.apply, {key: change for key, (change, _) in batch.items()})
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        if metrics.ENABLED:
+            metrics.WRITE_BATCH_SIZE.observe(sum(len(waiters) for _, waiters in batch.values()))
+        for key, (_, waiters) in batch.items():
+            for future, request_sql in waiters:
+                metrics.add_request_sql(request_sql, sql)
+                if not future.done():
+                    future.set_result(results.get(key))
+
+    @staticmethod
+    def _fail(batch: Batch, exc: BaseException) -> None:
+        for _, waiters in batch.values():
+            for future, _ in waiters:
+                if not future.done():
+                    future.set_exception(exc)
+
+    async def close(self) -> None:
+        """Commit whatever is pending (server shutdown)"""
+        if self._pending:
+            batch, self._pending = self._pending, {}
+            await self._flush(batch)
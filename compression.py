@@ -0,0 +1,70 @@
+"""
+Response compression for HTML and JSON.
+
+Brotli when the client accepts it and the optional ``brotli`` package is
+installed (pip install brotli), gzip otherwise. Both flush after every chunk
+of a streamed response (KANBAN_STREAM_BOARD), so the browser can render it as
+it arrives. Bodies under ``MIN_SIZE`` bytes go out as they are, and so do event
+streams (events.py), whose messages must not wait in a compressor's buffer.
+The responders extend Starlette's GZipMiddleware internals, which is why
+requirements.txt pins starlette.
+"""
+import os
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENABLED = os.environ.get("KANBAN_COMPRESS", "1") != "0"
+MIN_SIZE = int(os.environ.get("KANBAN_COMPRESS_MIN_SIZE", "1024"))  # bytes
+# Mid-range levels: nearly the ratio of the maximum at a fraction of the CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = BROTLI_QUALITY) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        # Flushed per chunk so a streamed page renders as it arrives
+        return self.compressor.process(body) + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class FlushingGZipResponder(GZipResponder):
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        # Starlette's responder holds streamed chunks back in the compressor
+        if more_body:
+            self.gzip_file.write(body)
+            self.gzip_file.flush()
+            body = self.gzip_buffer.getvalue()
+            self.gzip_buffer.seek(0)
+            self.gzip_buffer.truncate()
+            return body
+        return super().apply_compression(body, more_body=more_body)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def __init__(self, app: ASGIApp, minimum_size: int = MIN_SIZE, compresslevel: int = GZIP_LEVEL) -> None:
+        super().__init__(app, minimum_size, compresslevel)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("Accept-Encoding", "")
+        if brotli is not None and "br" in accept:
+            responder = BrotliResponder(self.app, self.minimum_size)
+        elif "gzip" in accept:
+            responder = FlushingGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -0,0 +1,28 @@
+"""
+Settings needed before - or without - importing SQLAlchemy.
+
+Standard library only, so read-only CLI commands can start fast.
+"""
+import os
+
+# Create .kanban directory in the parent project (one level up from kanbanlite)
+KANBAN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".kanban")
+os.makedirs(KANBAN_DIR, exist_ok=True)
+
+# Database path in the .kanban directory
+DB_PATH = os.environ.get("KANBAN_DB_PATH", os.path.join(KANBAN_DIR, "app.db"))
+
+# Archived cards live in their own file, ATTACHed to every connection (archive.py)
+ARCHIVE_PATH = os.environ.get("KANBAN_ARCHIVE_PATH", os.path.join(os.path.dirname(DB_PATH), "archive.db"))
+
+# How long a connection waits for another writer's lock before SQLITE_BUSY
+BUSY_TIMEOUT_MS = int(os.environ.get("KANBAN_DB_BUSY_TIMEOUT", "5000"))
+
+# Column ids are fixed: 1 Todo, 2 Doing, 3 Done
+DONE_COLUMN_ID = 3
+
+# Cards due within this many days count as "due soon" (badge, agenda, kanban_agent.py due)
+DUE_SOON_DAYS = 3
+
+# Stored in PRAGMA user_version; equals the number of steps in schema.MIGRATIONS
+SCHEMA_VERSION = 13
@@ -1,20 +1,219 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import time
+import asyncio
+import random
+import functools
+import contextlib
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+from config import DB_PATH, ARCHIVE_PATH, BUSY_TIMEOUT_MS
+import metrics
 
-# Create .kanban directory in the parent project (one level up from kanbanlite)
-KANBAN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".kanban")
-os.makedirs(KANBAN_DIR, exist_ok=True)
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Connection tuning applied to every new SQLite connection. The web server and
+# the CLI agent write the same file concurrently, so WAL (readers never block
+# the writer) plus a busy timeout matter more than raw single-writer speed.
+# KANBAN_DB_PROFILE=legacy skips all of it (plain rollback journal, as before)
+# except foreign keys: card deletes rely on their ON DELETE CASCADE.
+DB_PROFILE = os.environ.get("KANBAN_DB_PROFILE", "tuned")
+PRAGMAS = {
+    "journal_mode": os.environ.get("KANBAN_DB_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("KANBAN_DB_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": BUSY_TIMEOUT_MS,
+    "cache_size": int(os.environ.get("KANBAN_DB_CACHE_SIZE", "-32000")),        # negative = KiB
+    "mmap_size": int(os.environ.get("KANBAN_DB_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": os.environ.get("KANBAN_DB_TEMP_STORE", "MEMORY"),
+}
+
+# Retries for writes that still hit SQLITE_BUSY (e.g. a read transaction that
+# cannot be upgraded to a write while another connection holds the lock)
+BUSY_RETRIES = int(os.environ.get("KANBAN_DB_BUSY_RETRIES", "0" if DB_PROFILE == "legacy" else "5"))
+BUSY_BACKOFF = float(os.environ.get("KANBAN_DB_BUSY_BACKOFF", "0.02"))  # seconds, doubled per attempt
+
+# Optional async path for the web app (KANBAN_DB_ASYNC=1, needs aiosqlite).
+# The CLI agent always uses the synchronous engine.
+ASYNC_DB = os.environ.get("KANBAN_DB_ASYNC", "0").lower() in ("1", "true", "yes")
 
-# Database path in the .kanban directory
-DB_PATH = os.environ.get("KANBAN_DB_PATH", os.path.join(KANBAN_DIR, "app.db"))
 engine = create_engine(f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
+
+@event.listens_for(engine, "connect")
+def _apply_pragmas(dbapi_conn, connection_record):
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    # Cold storage for finished cards (archive.py); the file is created on first attach
+    cursor.execute("ATTACH DATABASE ? AS archive", (ARCHIVE_PATH,))
+    if DB_PROFILE != "legacy":
+        for name, value in PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+# Statement counts and timings for /metrics (metrics.py); one statement runs at a
+# time on a connection, so its start time fits in the connection's info dict
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics.record_sql(statement, time.perf_counter() - conn.info.pop("query_start", time.perf_counter()))
+
+
+def _instrument(engine):
+    if metrics.ENABLED:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+_instrument(engine)
+
+@contextlib.contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """
+    Cross-process lock on ``path`` (flock), for work that several web workers or
+    CLI processes must not do at once. Yields whether the lock is held: always
+    True when blocking, False when ``blocking=False`` and another process has it.
+    Where fcntl is missing (Windows) nothing is locked; SQLite's own locking
+    still applies.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            locked = False
+        else:
+            locked = True
+        try:
+            yield locked
+        finally:
+            if locked:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+async_engine = AsyncSessionLocal = None
+if ASYNC_DB:
+    try:
+        import aiosqlite  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("KANBAN_DB_ASYNC=1 requires aiosqlite (pip install aiosqlite)") from e
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    # aiosqlite defaults to NullPool (a new connection + thread per session); keep a
+    # small warm pool instead - SQLite has a single writer, more connections only contend
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{DB_PATH}", poolclass=AsyncAdaptedQueuePool,
+        pool_size=int(os.environ.get("KANBAN_DB_ASYNC_POOL_SIZE", "8")), max_overflow=0,
+    )
+    event.listen(async_engine.sync_engine, "connect", _apply_pragmas)
+    _instrument(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+
+def is_busy_error(exc: Exception) -> bool:
+    """True for SQLITE_BUSY / SQLITE_LOCKED errors worth retrying"""
+    message = str(getattr(exc, "orig", exc)).lower()
+    return "database is locked" in message or "database is busy" in message or "database table is locked" in message
+
+
+def _backoff(attempt: int) -> float:
+    return BUSY_BACKOFF * (2 ** attempt) * (0.5 + random.random())
+
+
+def _sleep(seconds: float) -> None:
+    # In async mode run_db runs the helper in a greenlet on the event loop
+    # (AsyncSession.run_sync): wait there with asyncio.sleep, so other requests
+    # keep being served. Threadpool threads and the CLI sleep normally.
+    if in_greenlet():
+        await_only(asyncio.sleep(seconds))
+    else:
+        time.sleep(seconds)
+
+
+def retry_on_busy(fn):
+    """
+    Re-run a write helper when SQLite reports the database as locked.
+
+    If the helper received a session (as ``db=`` or as its first argument) it is
+    rolled back before the retry; helpers that open their own session simply
+    start over.
+    """
+    def session_of(args, kwargs):
+        if kwargs.get("db") is not None:
+            return kwargs["db"]
+        return args[0] if args and isinstance(args[0], Session) else None
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(BUSY_RETRIES + 1):
+            try:
+                return fn(*args, **kwargs)
+            except OperationalError as e:
+                if not is_busy_error(e) or attempt == BUSY_RETRIES:
+                    raise
+                db = session_of(args, kwargs)
+                if db is not None:
+                    db.rollback()
+                _sleep(_backoff(attempt))
+    return wrapper
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Session dependency for the web routes: AsyncSession in async mode, Session otherwise
+get_session = get_async_db if ASYNC_DB else get_db
+
+
+class Render:
+    """
+    What a run_db helper returns to have a response rendered after its database
+    work: ``Render(fn, *args)`` makes run_db return ``fn(*args)`` computed on a
+    threadpool thread. The greenlet bridge runs helpers on the event loop, where
+    a template render would block it. Everything rendered must be loaded already.
+    """
+    def __init__(self, fn, *args, **kwargs):
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+
+    def __call__(self):
+        return self.fn(*self.args, **self.kwargs)
+
+
+def _run_and_render(fn, *args, **kwargs):
+    result = fn(*args, **kwargs)
+    return result() if isinstance(result, Render) else result
+
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Run ``fn(session, *args, **kwargs)`` - plain synchronous ORM code - through
+    the aiosqlite greenlet bridge for an AsyncSession, otherwise on a threadpool
+    thread. The bridge awaits the database calls but runs the Python between
+    them on the event loop. A ``Render`` it returns is computed on a threadpool
+    thread either way.
+    """
+    from starlette.concurrency import run_in_threadpool
+    if not isinstance(db, Session):
+        result = await db.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(result) if isinstance(result, Render) else result
+    return await run_in_threadpool(_run_and_render, fn, db, *args, **kwargs)
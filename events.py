@@ -0,0 +1,159 @@
+"""
+Live board updates over Server-Sent Events.
+
+One broadcaster per web process notices commits made by any connection or
+process. It polls ``PRAGMA data_version`` on a dedicated connection, so an idle
+board costs one PRAGMA per tick. When the version moves it reads the new rows
+of the change log (changes.py) through ``fetch``, which renders each changed
+card once, and fans the resulting events out to every open stream. A tab
+keeps one EventSource open instead of re-fetching the board.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from config import DB_PATH
+
+POLL_INTERVAL = float(os.environ.get("KANBAN_EVENTS_POLL", "0.5"))  # seconds
+KEEPALIVE_SECONDS = 15
+# The server only notices a closed tab when it checks; it also ends every stream
+# after a while so a shutdown never waits long (the browser resumes by Last-Event-ID)
+DISCONNECT_CHECK_SECONDS = 1
+MAX_STREAM_SECONDS = 60
+PRUNE_EVERY_SECONDS = 600
+
+# Events buffered per stream; a client that falls this far behind is told to reload
+QUEUE_SIZE = 500
+
+RELOAD = {"event": "reload", "data": {}}
+
+# fetch(after_id, upto_id) -> (events, last change id seen); runs on a worker thread
+Fetch = Callable[[int, Optional[int]], Tuple[List[Dict], int]]
+
+
+class Broadcaster:
+    def __init__(self, fetch: Fetch, latest: Callable[[], int], prune: Optional[Callable[[], int]] = None):
+        self.fetch = fetch
+        self.latest = latest
+        self.prune = prune
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.last_id = 0
+        self._task: Optional[asyncio.Task] = None
+        # Held while a batch is fetched and fanned out, so a new subscriber's
+        # catch-up never interleaves with (or misses) a live batch
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, since: Optional[int] = None) -> asyncio.Queue:
+        """
+        A queue receiving every event after change ``since`` (default: from
+        now). Catching up covers changes between the page render, or a dropped
+        connection, and this call.
+        """
+        queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+        async with self._lock:
+            if self._task is None:
+                self.last_id = await asyncio.to_thread(self.latest)
+            # Subscribed before catching up: _offer drops a queue that overflows
+            self.subscribers.add(queue)
+            if since is not None and since < self.last_id:
+                events, _ = await asyncio.to_thread(self.fetch, since, self.last_id)
+                for event in events:
+                    self._offer(queue, event)
+            # Started only now: the poller stops as soon as it finds no subscribers
+            if self._task is None:
+                self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+
+    def _offer(self, queue: asyncio.Queue, event: Dict) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind to catch up event by event
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RELOAD)
+            self.subscribers.discard(queue)
+
+    async def _run(self) -> None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        version = None
+        last_prune = time.monotonic()
+        try:
+            while self.subscribers:
+                await asyncio.sleep(POLL_INTERVAL)
+                # Changes whenever any other connection commits; no lock, no table read
+                current = conn.execute("PRAGMA data_version").fetchone()[0]
+                if current == version:
+                    continue
+                version = current
+                async with self._lock:
+                    events, self.last_id = await asyncio.to_thread(self.fetch, self.last_id, None)
+                    for queue in list(self.subscribers):
+                        for event in events:
+                            self._offer(queue, event)
+                if self.prune and time.monotonic() - last_prune > PRUNE_EVERY_SECONDS:
+                    last_prune = time.monotonic()
+                    await asyncio.to_thread(self.prune)
+        finally:
+            conn.close()
+            self._task = None
+
+    async def close(self) -> None:
+        """Stop polling and end every open stream (server shutdown)"""
+        for queue in list(self.subscribers):
+            self._offer(queue, None)
+        self.subscribers.clear()
+        if self._task is not None:
+            self._task.cancel()
+
+
+def format_event(event: Dict) -> str:
+    """One SSE message; events with an ``id`` let the browser resume after a reconnect"""
+    lines = []
+    if event.get("id") is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['event']}")
+    lines.append(f"data: {json.dumps(event['data'], separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream(broadcaster: Broadcaster, since: Optional[int] = None,
+                 is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> AsyncIterator[str]:
+    """Body of a text/event-stream response; ends on reload, shutdown, disconnect or after MAX_STREAM_SECONDS"""
+    queue = await broadcaster.subscribe(since)
+    loop = asyncio.get_running_loop()
+    started = last_sent = loop.time()
+    getter = None
+    try:
+        yield "retry: 1000\n\n"
+        while True:
+            # One pending get across checks, so a timeout never drops an event
+            if getter is None:
+                getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter}, timeout=DISCONNECT_CHECK_SECONDS)
+            if not done:
+                if is_disconnected is not None and await is_disconnected():
+                    return
+                now = loop.time()
+                if now - started > MAX_STREAM_SECONDS:
+                    return
+                if now - last_sent > KEEPALIVE_SECONDS:
+                    last_sent = now
+                    yield ": keepalive\n\n"  # keeps proxies from closing an idle stream
+                continue
+            event, getter = getter.result(), None
+            if event is None:
+                return
+            last_sent = loop.time()
+            yield format_event(event)
+            if event is RELOAD:
+                return
+    finally:
+        if getter is not None:
+            getter.cancel()
+        broadcaster.unsubscribe(queue)
@@ -2,273 +2,29 @@
 """
 Kanban Agent - Direct database manipulation for task management
 Can be used by Claude Code or as a CLI tool for automation
+
+Startup is kept cheap: the read-only commands (agent_reads.py) use plain
+sqlite3, and the ORM-backed operations (agent_ops.py) are imported only when a
+command needs them. Both are importable from here, e.g.
+``from kanban_agent import add_card``.
 """
 import sys
 import os
-from datetime import datetime
-from typing import Optional, List, Dict
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+import json
 
 # Add current directory to path to import local modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from db import get_db, Base, engine
-from models import Board, ColumnModel, Card, ChecklistItem
-
-def ensure_setup() -> Board:
-    """Ensure database and initial setup exists"""
-    Base.metadata.create_all(bind=engine)
-
-    with next(get_db()) as db:
-        board = db.scalar(select(Board).where(Board.name=="My Board"))
-        if board:
-            return board
-
-        # Create initial board with fixed columns
-        board = Board(name="My Board")
-        todo = ColumnModel(name="Todo", position=0)
-        doing = ColumnModel(name="Doing", position=1)
-        done = ColumnModel(name="Done", position=2)
-        board.columns = [todo, doing, done]
-        db.add(board)
-        db.commit()
-        db.refresh(board)
-        return board
-
-def get_column_id(column_name: str) -> Optional[int]:
-    """Get column ID by name (case insensitive)"""
-    column_map = {"todo": 1, "doing": 2, "done": 3}
-    return column_map.get(column_name.lower())
-
-def add_card(title: str, notes: str = "", column: str = "todo", due_date: str = None) -> Dict:
-    """Add a new card to the specified column"""
-    ensure_setup()
-
-    column_id = get_column_id(column)
-    if not column_id:
-        return {"success": False, "error": f"Invalid column: {column}. Use 'todo', 'doing', or 'done'"}
-
-    with next(get_db()) as db:
-        # Get next position in column
-        pos = db.scalar(select(func.coalesce(func.max(Card.position), -1)).where(
-            Card.column_id == column_id, Card.parent_id == None)) + 1
-
-        card = Card(
-            column_id=column_id,
-            title=title,
-            notes=notes,
-            position=pos
-        )
-
-        if due_date:
-            try:
-                card.due_at = datetime.fromisoformat(due_date)
-            except ValueError:
-                return {"success": False, "error": f"Invalid date format: {due_date}. Use YYYY-MM-DD format"}
-
-        db.add(card)
-        db.commit()
-        db.refresh(card)
-
-        return {
-            "success": True,
-            "card_id": card.id,
-            "title": card.title,
-            "column": column,
-            "position": card.position
-        }
-
-def list_cards(column: Optional[str] = None) -> Dict:
-    """List all cards or cards in a specific column"""
-    ensure_setup()
-
-    with next(get_db()) as db:
-        query = select(Card).where(Card.parent_id == None).order_by(Card.column_id, Card.position)
-
-        if column:
-            column_id = get_column_id(column)
-            if not column_id:
-                return {"success": False, "error": f"Invalid column: {column}"}
-            query = query.where(Card.column_id == column_id)
-
-        cards = db.scalars(query).all()
-
-        card_list = []
-        for card in cards:
-            column_name = ["", "todo", "doing", "done"][card.column_id]
-            card_data = {
-                "id": card.id,
-                "title": card.title,
-                "notes": card.notes,
-                "column": column_name,
-                "position": card.position,
-                "due_at": card.due_at.isoformat() if card.due_at else None,
-                "checklist_count": len(card.checklist) if card.checklist else 0
-            }
-            card_list.append(card_data)
-
-        return {"success": True, "cards": card_list, "count": len(card_list)}
-
-def move_card(card_id: int, column: str) -> Dict:
-    """Move a card to a different column"""
-    ensure_setup()
-
-    column_id = get_column_id(column)
-    if not column_id:
-        return {"success": False, "error": f"Invalid column: {column}"}
-
-    with next(get_db()) as db:
-        card = db.get(Card, card_id)
-        if not card:
-            return {"success": False, "error": f"Card {card_id} not found"}
-
-        old_column = ["", "todo", "doing", "done"][card.column_id]
-
-        # Get next position in new column
-        pos = db.scalar(select(func.coalesce(func.max(Card.position), -1)).where(
-            Card.column_id == column_id, Card.parent_id == None)) + 1
-
-        card.column_id = column_id
-        card.position = pos
-        db.commit()
-
-        return {
-            "success": True,
-            "card_id": card_id,
-            "title": card.title,
-            "moved_from": old_column,
-            "moved_to": column,
-            "new_position": pos
-        }
-
-def update_card(card_id: int, title: Optional[str] = None, notes: Optional[str] = None, due_date: Optional[str] = None) -> Dict:
-    """Update card details"""
-    ensure_setup()
-
-    with next(get_db()) as db:
-        card = db.get(Card, card_id)
-        if not card:
-            return {"success": False, "error": f"Card {card_id} not found"}
-
-        if title is not None:
-            card.title = title
-        if notes is not None:
-            card.notes = notes
-        if due_date is not None:
-            if due_date == "":
-                card.due_at = None
-            else:
-                try:
-                    card.due_at = datetime.fromisoformat(due_date)
-                except ValueError:
-                    return {"success": False, "error": f"Invalid date format: {due_date}"}
-
-        db.commit()
-        column_name = ["", "todo", "doing", "done"][card.column_id]
-
-        return {
-            "success": True,
-            "card_id": card_id,
-            "title": card.title,
-            "notes": card.notes,
-            "column": column_name,
-            "due_at": card.due_at.isoformat() if card.due_at else None
-        }
-
-def remove_card(card_id: int) -> Dict:
-    """Remove a card and all its checklist items"""
-    ensure_setup()
-
-    with next(get_db()) as db:
-        card = db.get(Card, card_id)
-        if not card:
-            return {"success": False, "error": f"Card {card_id} not found"}
-
-        title = card.title
-        column_name = ["", "todo", "doing", "done"][card.column_id]
-
-        db.delete(card)
-        db.commit()
-
-        return {
-            "success": True,
-            "card_id": card_id,
-            "title": title,
-            "column": column_name,
-            "message": "Card deleted successfully"
-        }
-
-def add_checklist(card_id: int, text: str) -> Dict:
-    """Add a checklist item to a card"""
-    ensure_setup()
-
-    with next(get_db()) as db:
-        card = db.get(Card, card_id)
-        if not card:
-            return {"success": False, "error": f"Card {card_id} not found"}
+from agent_reads import get_column_id, list_cards, list_changes, list_due, get_agenda, get_subtree, get_status  # noqa: E402
 
-        # Get next position in checklist
-        pos = db.scalar(select(func.coalesce(func.max(ChecklistItem.position), -1)).where(
-            ChecklistItem.card_id == card_id)) + 1
 
-        item = ChecklistItem(
-            card_id=card_id,
-            text=text,
-            position=pos
-        )
-
-        db.add(item)
-        db.commit()
-        db.refresh(item)
-
-        return {
-            "success": True,
-            "item_id": item.id,
-            "card_id": card_id,
-            "text": item.text,
-            "done": item.done,
-            "position": item.position
-        }
-
-def toggle_checklist(item_id: int) -> Dict:
-    """Toggle completion status of a checklist item"""
-    ensure_setup()
-
-    with next(get_db()) as db:
-        item = db.get(ChecklistItem, item_id)
-        if not item:
-            return {"success": False, "error": f"Checklist item {item_id} not found"}
-
-        item.done = not item.done
-        db.commit()
-
-        return {
-            "success": True,
-            "item_id": item_id,
-            "card_id": item.card_id,
-            "text": item.text,
-            "done": item.done
-        }
-
-def get_status() -> Dict:
-    """Get overall kanban board status"""
-    ensure_setup()
-
-    with next(get_db()) as db:
-        todo_count = db.scalar(select(func.count(Card.id)).where(Card.column_id == 1, Card.parent_id == None)) or 0
-        doing_count = db.scalar(select(func.count(Card.id)).where(Card.column_id == 2, Card.parent_id == None)) or 0
-        done_count = db.scalar(select(func.count(Card.id)).where(Card.column_id == 3, Card.parent_id == None)) or 0
-
-        return {
-            "success": True,
-            "status": {
-                "todo": todo_count,
-                "doing": doing_count,
-                "done": done_count,
-                "total": todo_count + doing_count + done_count
-            }
-        }
+def __getattr__(name):
+    # Everything else (add_card, ensure_setup, run_batch, ...) comes from agent_ops on first access
+    import agent_ops
+    try:
+        return getattr(agent_ops, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
 
 # CLI interface
 def main():
@@ -277,17 +33,32 @@ def main():
         print("Kanban Agent - Direct database manipulation")
         print("Usage:")
         print("  python kanban_agent.py add 'Task title' [notes] [column] [due_date]")
-        print("  python kanban_agent.py list [column]")
+        print("  python kanban_agent.py list [column] [--since <seq>]")
         print("  python kanban_agent.py move <card_id> <column>")
+        print("  python kanban_agent.py reparent <card_id> <parent_id|top>")
+        print("  python kanban_agent.py subtree <card_id>")
         print("  python kanban_agent.py update <card_id> [--title 'New title'] [--notes 'New notes'] [--due 'YYYY-MM-DD']")
         print("  python kanban_agent.py remove <card_id>")
         print("  python kanban_agent.py checklist <card_id> 'Item text'")
         print("  python kanban_agent.py toggle <item_id>")
         print("  python kanban_agent.py status")
+        print("  python kanban_agent.py due [--days N] | due <from> [<to>] [--counts]")
+        print("  python kanban_agent.py changes [--since <seq>] [--limit N] | changes --compact")
+        print("  python kanban_agent.py search 'query' [limit]")
+        print("  python kanban_agent.py check-counters [--fix]")
+        print("  python kanban_agent.py purge-done <days>")
+        print("  python kanban_agent.py archive <days>")
+        print("  python kanban_agent.py archive-list [limit] [offset]")
+        print("  python kanban_agent.py archive-search 'query' [limit]")
+        print("  python kanban_agent.py restore <card_id>")
+        print("  python kanban_agent.py batch [ops.jsonl|-] [--chunk-size N] [--continue-on-error]")
+        print("  python kanban_agent.py serve [--stdio | --socket /path/to/kanban.sock]")
         print("\nColumns: todo, doing, done")
         return
 
     command = sys.argv[1].lower()
+    if command not in ("list", "status", "changes", "subtree", "due") or "--compact" in sys.argv[2:]:
+        import agent_ops  # SQLAlchemy and the ORM models: only for commands that write or search
 
     try:
         if command == "add":
@@ -295,18 +66,30 @@ def main():
             notes = sys.argv[3] if len(sys.argv) > 3 else ""
             column = sys.argv[4] if len(sys.argv) > 4 else "todo"
             due_date = sys.argv[5] if len(sys.argv) > 5 else None
-            result = add_card(title, notes, column, due_date)
+            result = agent_ops.add_card(title, notes, column, due_date)
             print(result)
 
         elif command == "list":
-            column = sys.argv[2] if len(sys.argv) > 2 else None
-            result = list_cards(column)
+            args = sys.argv[2:]
+            since = int(args[args.index("--since") + 1]) if "--since" in args else None
+            column = next((a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or args[i - 1] != "--since")), None)
+            result = list_cards(column, since)
             print(result)
 
         elif command == "move":
             card_id = int(sys.argv[2])
             column = sys.argv[3]
-            result = move_card(card_id, column)
+            result = agent_ops.move_card(card_id, column)
+            print(result)
+
+        elif command == "reparent":
+            card_id = int(sys.argv[2])
+            parent_id = None if sys.argv[3].lower() == "top" else int(sys.argv[3])
+            result = agent_ops.reparent_card(card_id, parent_id)
+            print(result)
+
+        elif command == "subtree":
+            result = get_subtree(int(sys.argv[2]))
             print(result)
 
         elif command == "update":
@@ -326,29 +109,103 @@ def main():
                     i += 2
                 else:
                     i += 1
-            result = update_card(card_id, **kwargs)
+            result = agent_ops.update_card(card_id, **kwargs)
             print(result)
 
         elif command == "remove":
             card_id = int(sys.argv[2])
-            result = remove_card(card_id)
+            result = agent_ops.remove_card(card_id)
             print(result)
 
         elif command == "checklist":
             card_id = int(sys.argv[2])
             text = sys.argv[3]
-            result = add_checklist(card_id, text)
+            result = agent_ops.add_checklist(card_id, text)
             print(result)
 
         elif command == "toggle":
             item_id = int(sys.argv[2])
-            result = toggle_checklist(item_id)
+            result = agent_ops.toggle_checklist(item_id)
             print(result)
 
         elif command == "status":
             result = get_status()
             print(result)
 
+        elif command == "due":
+            args = sys.argv[2:]
+            dates = [a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or args[i - 1] != "--days")]
+            if dates:
+                result = get_agenda(dates[0], dates[1] if len(dates) > 1 else None, counts="--counts" in args)
+            else:
+                result = list_due(int(args[args.index("--days") + 1])) if "--days" in args else list_due()
+            print(result)
+
+        elif command == "changes":
+            args = sys.argv[2:]
+            if "--compact" in args:
+                result = agent_ops.compact_changes()
+            else:
+                since = int(args[args.index("--since") + 1]) if "--since" in args else 0
+                limit = int(args[args.index("--limit") + 1]) if "--limit" in args else 1000
+                result = list_changes(since, limit)
+            print(result)
+
+        elif command == "search":
+            query = sys.argv[2]
+            limit = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+            result = agent_ops.search_cards(query, limit)
+            print(result)
+
+        elif command == "check-counters":
+            result = agent_ops.check_counters(fix="--fix" in sys.argv[2:])
+            print(result)
+
+        elif command == "purge-done":
+            result = agent_ops.purge_done(float(sys.argv[2]))
+            print(result)
+
+        elif command == "archive":
+            result = agent_ops.archive_done(float(sys.argv[2]))
+            print(result)
+
+        elif command == "archive-list":
+            limit = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+            offset = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+            result = agent_ops.list_archive(limit, offset)
+            print(result)
+
+        elif command == "archive-search":
+            query = sys.argv[2]
+            limit = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+            result = agent_ops.search_archive(query, limit)
+            print(result)
+
+        elif command == "restore":
+            result = agent_ops.restore_card(int(sys.argv[2]))
+            print(result)
+
+        elif command == "batch":
+            args = sys.argv[2:]
+            continue_on_error = "--continue-on-error" in args
+            chunk_size = int(args[args.index("--chunk-size") + 1]) if "--chunk-size" in args else 1000
+            paths = [a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or args[i - 1] != "--chunk-size")]
+            if paths and paths[0] != "-":
+                with open(paths[0], encoding="utf-8") as f:
+                    summary = agent_ops.run_batch(f, chunk_size, continue_on_error)
+            else:
+                summary = agent_ops.run_batch(sys.stdin, chunk_size, continue_on_error)
+            # Per-op results went to stdout as JSON lines; the summary goes to stderr
+            print(json.dumps(summary), file=sys.stderr)
+            if not summary["success"]:
+                sys.exit(1)
+
+        elif command == "serve":
+            if "--socket" in sys.argv:
+                agent_ops.serve_socket(sys.argv[sys.argv.index("--socket") + 1])
+            else:
+                agent_ops.serve_stdio()
+
         else:
             print(f"Unknown command: {command}")
 
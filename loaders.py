@@ -0,0 +1,110 @@
+"""
+Board loading with a fixed number of SQL statements.
+
+Lazy relationship loading costs one query per card for ``checklist`` and one
+per card (and per nesting level) for ``children``. The loaders here fetch a
+whole forest of cards with one query on the materialized paths (tree.py) plus one checklist query and wire
+the relationships up in memory, so rendering never triggers a lazy load.
+"""
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from models import Board, Card, ChecklistItem
+import tree
+
+# Top-level cards rendered per column before the client has to ask for more
+PAGE_SIZE = int(os.environ.get("KANBAN_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = 500
+
+
+def load_trees(db: Session, root_ids) -> List[Card]:
+    """
+    Load the cards selected by ``root_ids`` (a SELECT or list of ids) together with
+    all their descendants and checklist items: two statements whatever the size
+    or depth. Returns the roots ordered by position with ``children`` and
+    ``checklist`` populated on every card of the tree.
+    """
+    # One range of the path index per root (tree.py). IN (SELECT ...) rather than
+    # a join: SQLite then looks the tree's rows up by card id and sorts them,
+    # instead of walking the whole position index
+    tree_ids = tree.subtree_ids(root_ids)
+    cards = db.scalars(select(Card).where(Card.id.in_(tree_ids)).order_by(Card.position, Card.id)).all()
+    items = db.scalars(
+        select(ChecklistItem).where(ChecklistItem.card_id.in_(tree_ids))
+        .order_by(ChecklistItem.position, ChecklistItem.id)
+    ).all()
+
+    by_id = {card.id: card for card in cards}
+    children = defaultdict(list)
+    checklists = defaultdict(list)
+    roots = []
+    for card in cards:
+        if card.parent_id in by_id:
+            children[card.parent_id].append(card)
+        else:
+            roots.append(card)
+    for item in items:
+        checklists[item.card_id].append(item)
+    for card in cards:
+        set_committed_value(card, "children", children.get(card.id, []))
+        set_committed_value(card, "checklist", checklists.get(card.id, []))
+    return roots
+
+
+def load_board(db: Session, name: str = "My Board", page_size: int = PAGE_SIZE, with_cards: bool = True) -> Optional[Board]:
+    """
+    Load a board, its columns and the first ``page_size`` card trees of each
+    column in four statements. Further pages come from ``load_column_page``.
+    ``with_cards=False`` stops after the columns (two statements), for callers
+    that page each column themselves.
+    """
+    board = db.scalar(select(Board).where(Board.name == name).options(selectinload(Board.columns)))
+    if not board or not with_cards:
+        return board
+    column_ids = [col.id for col in board.columns]
+    ranked = (
+        select(Card.id, func.row_number().over(partition_by=Card.column_id, order_by=(Card.position, Card.id)).label("rn"))
+        .where(Card.column_id.in_(column_ids), Card.parent_id.is_(None))
+        .subquery()
+    )
+    roots = load_trees(db, select(ranked.c.id).where(ranked.c.rn <= page_size))
+
+    by_column = defaultdict(list)
+    for card in roots:
+        by_column[card.column_id].append(card)
+    for col in board.columns:
+        set_committed_value(col, "cards", by_column.get(col.id, []))
+    return board
+
+
+def load_column_page(db: Session, column_id: int, after: Optional[int] = None, after_id: Optional[int] = None,
+                     limit: int = PAGE_SIZE) -> Tuple[List[Card], bool]:
+    """
+    Keyset page of top-level cards in a column, ordered by (position, id), with
+    their subtrees loaded. ``after``/``after_id`` are the position and id of the
+    last card already shown; the seek runs on idx_card_column_parent_position.
+    Returns the cards and whether more follow.
+    """
+    query = select(Card.id).where(Card.column_id == column_id, Card.parent_id.is_(None))
+    if after is not None and after_id is not None:
+        query = query.where(tuple_(Card.position, Card.id) > tuple_(after, after_id))
+    elif after is not None:
+        query = query.where(Card.position > after)
+    ids = db.scalars(query.order_by(Card.position, Card.id).limit(limit + 1)).all()
+    return load_trees(db, ids[:limit]), len(ids) > limit
+
+
+def column_counts(db: Session, column_ids: Iterable[int]) -> Dict[int, int]:
+    """Number of top-level cards per column, counted in SQL"""
+    column_ids = list(column_ids)
+    rows = db.execute(
+        select(Card.column_id, func.count(Card.id))
+        .where(Card.column_id.in_(column_ids), Card.parent_id.is_(None))
+        .group_by(Card.column_id)
+    ).all()
+    counts = {column_id: 0 for column_id in column_ids}
+    counts.update(dict(rows))
+    return counts
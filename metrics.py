@@ -0,0 +1,273 @@
+"""
+Request metrics in the Prometheus text format, served at ``/metrics``.
+
+Per route (the name of the route function: ``home``, ``move_card``,
+``toggle_item`` ...) the web app records request counts, latency, and the SQL
+statements each request ran and the time they took. Per template it records
+render time, and at scrape time it reads the connection pool state. SQL
+statements are counted by the cursor hooks in db.py, which also see the CLI
+agent's queries when it shares a process with the app.
+
+Everything lives in memory in the current process: with several workers every
+process answers for itself. KANBAN_METRICS=0 turns recording off.
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from jinja2 import Template
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ENABLED = os.environ.get("KANBAN_METRICS", "1") != "0"
+
+# Seconds; a board page is expected in the low milliseconds, an event stream
+# stays open for up to a minute (events.MAX_STREAM_SECONDS)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 60.0)
+RENDER_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 1000)
+BATCH_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 500)
+
+SQL_VERBS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT",
+             "RELEASE", "CREATE", "DROP", "ALTER", "ATTACH"}
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket (non-cumulative, last is +Inf), sum]
+        self._values: Dict[LabelValues, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        for labels, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % ("+Inf" if bound == float("inf") else _number(bound))
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(float(total))}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}"
+
+
+REQUESTS = Counter("kanban_http_requests_total", "HTTP requests by route, method and status",
+                   ("route", "method", "status"))
+LATENCY = Histogram("kanban_http_request_duration_seconds", "Time until the last byte of the response was sent",
+                    ("route", "method"))
+REQUEST_STATEMENTS = Histogram("kanban_http_request_sql_statements", "SQL statements run per request",
+                               ("route",), STATEMENT_BUCKETS)
+REQUEST_SQL_SECONDS = Histogram("kanban_http_request_sql_seconds", "Time spent executing SQL per request", ("route",))
+SQL_STATEMENTS = Counter("kanban_sql_statements_total", "SQL statements executed, by leading keyword", ("verb",))
+SQL_SECONDS = Counter("kanban_sql_seconds_total", "Time spent executing SQL, by leading keyword", ("verb",))
+RENDER_SECONDS = Histogram("kanban_template_render_seconds", "Jinja template render time (includes nested renders)",
+                           ("template",), RENDER_BUCKETS)
+# _count is the number of grouped commits, _sum the requests they answered (coalesce.py)
+WRITE_BATCH_SIZE = Histogram("kanban_coalesced_write_requests", "Write requests answered per grouped commit", (),
+                             BATCH_BUCKETS)
+METRICS = (REQUESTS, LATENCY, REQUEST_STATEMENTS, REQUEST_SQL_SECONDS, SQL_STATEMENTS, SQL_SECONDS, RENDER_SECONDS,
+           WRITE_BATCH_SIZE)
+
+# [statements, seconds] of the request being served; context variables follow
+# the request into run_db's worker thread or greenlet
+_request_sql: ContextVar[Optional[List]] = ContextVar("kanban_request_sql", default=None)
+
+
+def record_sql(statement: str, seconds: float) -> None:
+    """Called by the cursor hooks in db.py after every statement"""
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    verb = verb if verb in SQL_VERBS else "OTHER"
+    SQL_STATEMENTS.inc(verb)
+    SQL_SECONDS.inc(verb, amount=seconds)
+    current = _request_sql.get()
+    if current is not None:
+        current[0] += 1
+        current[1] += seconds
+
+
+def request_sql() -> Optional[List]:
+    """The [statements, seconds] of the request being served, or None outside one"""
+    return _request_sql.get()
+
+
+def collect_sql(fn, *args):
+    """Run ``fn(*args)`` counting its SQL on its own, not for the current request: returns (result, [statements, seconds])"""
+    sql = [0, 0.0]
+    token = _request_sql.set(sql)
+    try:
+        return fn(*args), sql
+    finally:
+        _request_sql.reset(token)
+
+
+def add_request_sql(target: Optional[List], sql: List) -> None:
+    """Count ``sql`` (from collect_sql) for the request that ``target`` (from request_sql) belongs to"""
+    if target is not None:
+        target[0] += sql[0]
+        target[1] += sql[1]
+
+
+class TimedTemplate(Template):
+    """Template class that records its render time (``env.template_class = TimedTemplate``)"""
+
+    def render(self, *args, **kwargs) -> str:
+        if not ENABLED:
+            return super().render(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            RENDER_SECONDS.observe(time.perf_counter() - start, self.name or "<string>")
+
+    def generate(self, *args, **kwargs):
+        # Streamed renders: only the time spent producing output, not waiting on the client
+        if not ENABLED:
+            yield from super().generate(*args, **kwargs)
+            return
+        chunks, elapsed = super().generate(*args, **kwargs), 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield chunk
+        finally:
+            RENDER_SECONDS.observe(elapsed, self.name or "<string>")
+
+
+def _route_name(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "name", None) or route.path
+    # Mounted apps (static files) set no route, only their endpoint
+    return "static" if scope.get("path", "").startswith("/static/") else "unmatched"
+
+
+class MetricsMiddleware:
+    """Times each HTTP request and counts the SQL it ran"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        sql = [0, 0.0]
+        token = _request_sql.set(sql)
+        status, finished = 500, None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_sql.reset(token)
+            # Background tasks run after the body is sent: they count towards the
+            # request's SQL but not its latency
+            route = _route_name(scope)
+            REQUESTS.inc(route, scope["method"], str(status))
+            LATENCY.observe((finished or time.perf_counter()) - start, route, scope["method"])
+            REQUEST_STATEMENTS.observe(sql[0], route)
+            REQUEST_SQL_SECONDS.observe(sql[1], route)
+
+
+def _pool_samples(engines: Dict[str, object]) -> List[str]:
+    lines = [
+        "# HELP kanban_db_pool_connections Connections held by the SQLAlchemy pool, by state",
+        "# TYPE kanban_db_pool_connections gauge",
+    ]
+    size_lines = [
+        "# HELP kanban_db_pool_size Configured size of the SQLAlchemy pool",
+        "# TYPE kanban_db_pool_size gauge",
+    ]
+    for name, engine in engines.items():
+        pool = getattr(engine, "pool", None)
+        if pool is None or not hasattr(pool, "checkedout"):
+            continue  # pools without counters (NullPool, StaticPool)
+        for state, value in (("checked_out", pool.checkedout()), ("checked_in", pool.checkedin()),
+                             ("overflow", max(pool.overflow(), 0))):
+            lines.append(f'kanban_db_pool_connections{{engine="{name}",state="{state}"}} {value}')
+        size_lines.append(f'kanban_db_pool_size{{engine="{name}"}} {pool.size()}')
+    return lines + size_lines
+
+
+def render(engines: Optional[Dict[str, object]] = None, cache_stats: Optional[Dict[str, int]] = None) -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    if engines:
+        lines.extend(_pool_samples(engines))
+    if cache_stats:
+        lines.append("# HELP kanban_card_cache_events_total Rendered card fragment cache lookups and evictions")
+        lines.append("# TYPE kanban_card_cache_events_total counter")
+        for event in ("hits", "misses", "evictions"):
+            lines.append(f'kanban_card_cache_events_total{{event="{event}"}} {cache_stats[event]}')
+        lines.append("# HELP kanban_card_cache_entries Rendered card fragments in the cache")
+        lines.append("# TYPE kanban_card_cache_entries gauge")
+        lines.append(f"kanban_card_cache_entries {cache_stats['size']}")
+    return "\n".join(lines) + "\n"
@@ -1,5 +1,5 @@
-from sqlalchemy import Integer, String, Text, ForeignKey, DateTime, Boolean, Index
-from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy import Integer, String, Text, ForeignKey, DateTime, Boolean, Index, func, text
+from sqlalchemy.orm import relationship, backref, Mapped, mapped_column
 from datetime import datetime
 from db import Base
 
@@ -7,7 +7,7 @@ class Board(Base):
     __tablename__ = "boards"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, index=True)
-    columns = relationship("ColumnModel", back_populates="board", cascade="all, delete-orphan", order_by="ColumnModel.position")
+    columns = relationship("ColumnModel", back_populates="board", cascade="all, delete-orphan", passive_deletes=True, order_by="ColumnModel.position")
 
 class ColumnModel(Base):
     __tablename__ = "columns"
@@ -18,7 +18,7 @@ class ColumnModel(Base):
     board = relationship("Board", back_populates="columns")
     cards = relationship(
         "Card", back_populates="column",
-        cascade="all, delete-orphan",
+        cascade="all, delete-orphan", passive_deletes=True,
         primaryjoin="and_(Card.column_id==ColumnModel.id, Card.parent_id==None)",
         order_by="Card.position"
     )
@@ -30,19 +30,26 @@ class Card(Base):
     parent_id: Mapped[int | None] = mapped_column(ForeignKey("cards.id", ondelete="CASCADE"), nullable=True, index=True)
     title: Mapped[str] = mapped_column(String(200), index=True)  # Index for search
     notes: Mapped[str] = mapped_column(Text, default="")
-    due_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)  # Index for due date queries
+    due_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)  # Indexed by idx_card_due_date_column
     position: Mapped[int] = mapped_column(Integer, default=0, index=True)  # Index for ordering
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")  # Bumped on every rendered change (fragment cache key)
+    checklist_total: Mapped[int] = mapped_column(Integer, default=0, server_default="0")  # Denormalized checklist progress,
+    checklist_done: Mapped[int] = mapped_column(Integer, default=0, server_default="0")   # maintained by mutations.py
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)  # UTC, set by a trigger on entering Done
+    path: Mapped[str | None] = mapped_column(String, nullable=True, index=True)  # "12/40/41/": ids from the top-level card down, kept by triggers (tree.py)
 
     column = relationship("ColumnModel", back_populates="cards")
-    children = relationship("Card", cascade="all, delete-orphan",
-                          backref="parent", remote_side=[id],
-                          order_by="Card.position", single_parent=True)
-    checklist = relationship("ChecklistItem", back_populates="card", cascade="all, delete-orphan", order_by="ChecklistItem.position")
+    # Deletes cascade in the database (ON DELETE CASCADE), never by loading the subtree
+    children = relationship("Card", cascade="all, delete-orphan", passive_deletes=True,
+                          backref=backref("parent", remote_side=[id]),
+                          order_by="Card.position")
+    checklist = relationship("ChecklistItem", back_populates="card", cascade="all, delete-orphan", passive_deletes=True, order_by="ChecklistItem.position")
 
     # Composite indexes for better query performance
     __table_args__ = (
         Index('idx_card_column_parent_position', 'column_id', 'parent_id', 'position'),
         Index('idx_card_due_date_column', 'due_at', 'column_id'),
+        {"sqlite_autoincrement": True},  # ids of deleted or archived cards are never reused (card_cache keys on them)
     )
 
 class ChecklistItem(Base):
@@ -59,3 +66,26 @@ class ChecklistItem(Base):
         Index('idx_checklist_card_position', 'card_id', 'position'),
         Index('idx_checklist_card_done', 'card_id', 'done'),
     )
+
+class CardChange(Base):
+    """Change log of cards and checklist items, written by the triggers in changes.py"""
+    __tablename__ = "card_changes"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # AUTOINCREMENT: ids are never reused after pruning
+    card_id: Mapped[int] = mapped_column(Integer, index=True)  # no foreign key: deletions are logged too
+    op: Mapped[str] = mapped_column(String(10))  # "upsert" or "delete"
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp(), index=True)
+    # "card" (entity_id = card_id) or "checklist_item" (entity_id = item id, card_id = its card)
+    entity: Mapped[str] = mapped_column(String(20), server_default=text("'card'"))
+    entity_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    fields: Mapped[str | None] = mapped_column(Text, nullable=True)  # changed columns, comma-separated; NULL = whole row
+
+    __table_args__ = (
+        Index("idx_card_changes_entity", "entity", "entity_id", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
+class ChangeLogState(Base):
+    """One row: the newest change id pruned from card_changes (readers from before it must resync)"""
+    __tablename__ = "card_changes_state"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    pruned_through: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
@@ -0,0 +1,180 @@
+"""
+Bookkeeping shared by every write path (web app and CLI agent).
+
+Call these inside the same session/transaction as the change itself so the
+bookkeeping commits or rolls back together with it.
+"""
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select, insert, update, delete, func, case, or_, bindparam
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from config import DONE_COLUMN_ID
+from models import Card, ChecklistItem
+import ordering
+
+
+def touch_card(db: Session, card_id: Optional[int]) -> None:
+    """
+    Bump ``version`` on a card and all of its ancestors, in one statement.
+
+    A card's rendered fragment contains its whole subtree, so a change anywhere
+    below a card invalidates the cached HTML of every card above it too.
+    """
+    if card_id is None:
+        return
+    touch_cards(db, [card_id])
+
+
+def touch_cards(db: Session, card_ids: Iterable[Optional[int]]) -> None:
+    """``touch_card`` for many cards at once (each ancestor is bumped once)"""
+    card_ids = {card_id for card_id in card_ids if card_id is not None}
+    if not card_ids:
+        return
+    chain = select(Card.id, Card.parent_id).where(Card.id.in_(card_ids)).cte("chain", recursive=True)
+    chain = chain.union_all(select(Card.id, Card.parent_id).join(chain, Card.id == chain.c.parent_id))
+    db.execute(
+        update(Card).where(Card.id.in_(select(chain.c.id))).values(version=Card.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _adjust_checklist_counts(db: Session, card_id: int, total: int = 0, done: int = 0) -> None:
+    db.execute(
+        update(Card).where(Card.id == card_id)
+        .values(checklist_total=Card.checklist_total + total, checklist_done=Card.checklist_done + done)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def add_checklist_item(db: Session, card_id: int, text: str) -> ChecklistItem:
+    """Append a checklist item and count it on the card"""
+    item = ChecklistItem(card_id=card_id, text=text, done=False, position=ordering.next_checklist_position(db, card_id))
+    db.add(item); db.flush()
+    _adjust_checklist_counts(db, card_id, total=1)
+    touch_card(db, card_id)
+    return item
+
+
+def add_checklist_items(db: Session, items: List[Dict]) -> List[int]:
+    """
+    Bulk ``add_checklist_item``: ``items`` are dicts with card_id, text and
+    optionally done. One INSERT and one counter UPDATE (both executemany) for
+    the lot; items append to each card in the given order. Returns the new ids.
+    """
+    if not items:
+        return []
+    next_pos = ordering.next_checklist_positions(db, {item["card_id"] for item in items})
+    rows = []
+    for item in items:
+        card_id = item["card_id"]
+        rows.append({"card_id": card_id, "text": item["text"], "done": bool(item.get("done")), "position": next_pos[card_id]})
+        next_pos[card_id] += ordering.POSITION_GAP
+    ids = db.scalars(insert(ChecklistItem).returning(ChecklistItem.id, sort_by_parameter_order=True), rows).all()
+
+    counts: Dict[int, List[int]] = {}
+    for row in rows:
+        total_done = counts.setdefault(row["card_id"], [0, 0])
+        total_done[0] += 1
+        total_done[1] += row["done"]
+    cards = Card.__table__  # Core UPDATE: executemany with a WHERE clause
+    db.execute(
+        update(cards).where(cards.c.id == bindparam("card_id"))
+        .values(checklist_total=cards.c.checklist_total + bindparam("total"),
+                checklist_done=cards.c.checklist_done + bindparam("done")),
+        [{"card_id": card_id, "total": total, "done": done} for card_id, (total, done) in counts.items()],
+    )
+    touch_cards(db, counts)
+    return ids
+
+
+def toggle_checklist_item(db: Session, item_id: int) -> Optional[Row]:
+    """
+    Flip an item's ``done`` flag and the card's done counter. The flip happens in
+    the UPDATE itself, so concurrent toggles cannot double count. Returns the
+    item's (id, card_id, text, done) after the change, or None if it is missing.
+    """
+    row = db.execute(
+        update(ChecklistItem).where(ChecklistItem.id == item_id).values(done=~ChecklistItem.done)
+        .returning(ChecklistItem.id, ChecklistItem.card_id, ChecklistItem.text, ChecklistItem.done)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        return None
+    _adjust_checklist_counts(db, row.card_id, done=1 if row.done else -1)
+    touch_card(db, row.card_id)
+    return row
+
+
+def delete_checklist_item(db: Session, item_id: int) -> Optional[Row]:
+    """Delete an item and uncount it; returns its (id, card_id, done) or None if missing"""
+    row = db.execute(
+        delete(ChecklistItem).where(ChecklistItem.id == item_id)
+        .returning(ChecklistItem.id, ChecklistItem.card_id, ChecklistItem.done)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        return None
+    _adjust_checklist_counts(db, row.card_id, total=-1, done=-1 if row.done else 0)
+    touch_card(db, row.card_id)
+    return row
+
+
+def delete_cards(db: Session, card_ids) -> List[Row]:
+    """
+    Delete the cards selected by ``card_ids`` (ids or a SELECT) in one DELETE.
+    Their subcards and checklist items go with them through ON DELETE CASCADE,
+    inside SQLite, however large the subtree. Returns the (id, title, column_id,
+    parent_id) of each selected card that existed.
+    """
+    rows = db.execute(
+        delete(Card).where(Card.id.in_(card_ids))
+        .returning(Card.id, Card.title, Card.column_id, Card.parent_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    touch_cards(db, (row.parent_id for row in rows))
+    return rows
+
+
+def delete_done_cards(db: Session, older_than_days: float) -> List[Row]:
+    """Delete top-level Done cards completed more than ``older_than_days`` ago, with their subtrees"""
+    cutoff = func.datetime("now", f"-{float(older_than_days)} days")
+    return delete_cards(db, select(Card.id).where(
+        Card.column_id == DONE_COLUMN_ID, Card.parent_id.is_(None), Card.completed_at < cutoff))
+
+
+def _actual_checklist_counts():
+    return (
+        select(ChecklistItem.card_id,
+               func.count(ChecklistItem.id).label("total"),
+               func.sum(case((ChecklistItem.done, 1), else_=0)).label("done"))
+        .group_by(ChecklistItem.card_id)
+        .subquery()
+    )
+
+
+def find_checklist_drift(db: Session) -> List[Dict]:
+    """Cards whose stored checklist counters disagree with their checklist items"""
+    actual = _actual_checklist_counts()
+    total = func.coalesce(actual.c.total, 0)
+    done = func.coalesce(actual.c.done, 0)
+    rows = db.execute(
+        select(Card.id, Card.checklist_total, Card.checklist_done, total.label("total"), done.label("done"))
+        .outerjoin(actual, actual.c.card_id == Card.id)
+        .where(or_(Card.checklist_total != total, Card.checklist_done != done))
+        .order_by(Card.id)
+    ).all()
+    return [
+        {"card_id": r.id, "stored": [r.checklist_done, r.checklist_total], "actual": [r.done, r.total]}
+        for r in rows
+    ]
+
+
+def recount_checklists(db, card_ids: Optional[List[int]] = None) -> None:
+    """Recompute the checklist counters from checklist_items (backfill / repair)"""
+    total = select(func.count(ChecklistItem.id)).where(ChecklistItem.card_id == Card.id).scalar_subquery()
+    done = select(func.count(ChecklistItem.id)).where(
+        ChecklistItem.card_id == Card.id, ChecklistItem.done.is_(True)).scalar_subquery()
+    stmt = update(Card).values(checklist_total=total, checklist_done=done)
+    if card_ids is not None:
+        stmt = stmt.where(Card.id.in_(card_ids))
+    db.execute(stmt.execution_options(synchronize_session=False))
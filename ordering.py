@@ -0,0 +1,115 @@
+"""
+Sparse ordering for cards and checklist items.
+
+Positions are integers spaced ``POSITION_GAP`` apart. Moving a card gives it a
+position between its new neighbours, so a move writes only the moved row. When
+two neighbours end up adjacent there is no integer left between them and the
+sibling list is renumbered once (a rebalance), which restores the spacing.
+"""
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select, func, update, or_
+from sqlalchemy.orm import Session
+from models import Card, ChecklistItem
+import mutations  # imports this module too; only used inside functions
+
+POSITION_GAP = 1024
+
+# Remaining room below which a background rebalance is worth scheduling
+MIN_GAP = 4
+
+
+def _siblings(column_id: int, parent_id: Optional[int]):
+    parent = Card.parent_id.is_(None) if parent_id is None else Card.parent_id == parent_id
+    return (Card.column_id == column_id, parent)
+
+
+def next_position(db: Session, column_id: int, parent_id: Optional[int] = None) -> int:
+    """Position after the last card among the given siblings"""
+    last = db.scalar(select(func.max(Card.position)).where(*_siblings(column_id, parent_id)))
+    return 0 if last is None else last + POSITION_GAP
+
+
+def next_positions(db: Session, groups) -> Dict[Tuple[int, Optional[int]], int]:
+    """``next_position`` for many (column_id, parent_id) sibling lists in one grouped query"""
+    groups = set(groups)
+    parent_ids = {parent_id for _, parent_id in groups if parent_id is not None}
+    last = {(column_id, parent_id): pos for column_id, parent_id, pos in db.execute(
+        select(Card.column_id, Card.parent_id, func.max(Card.position))
+        .where(Card.column_id.in_({column_id for column_id, _ in groups}),
+               or_(Card.parent_id.is_(None), Card.parent_id.in_(parent_ids)))
+        .group_by(Card.column_id, Card.parent_id)
+    ).all()}
+    return {group: 0 if last.get(group) is None else last[group] + POSITION_GAP for group in groups}
+
+
+def next_checklist_position(db: Session, card_id: int) -> int:
+    """Position after the last checklist item of a card"""
+    last = db.scalar(select(func.max(ChecklistItem.position)).where(ChecklistItem.card_id == card_id))
+    return 0 if last is None else last + POSITION_GAP
+
+
+def next_checklist_positions(db: Session, card_ids) -> Dict[int, int]:
+    """``next_checklist_position`` for many cards in one grouped query"""
+    card_ids = list(card_ids)
+    last = dict(db.execute(
+        select(ChecklistItem.card_id, func.max(ChecklistItem.position))
+        .where(ChecklistItem.card_id.in_(card_ids)).group_by(ChecklistItem.card_id)
+    ).all())
+    return {card_id: 0 if last.get(card_id) is None else last[card_id] + POSITION_GAP for card_id in card_ids}
+
+
+def position_between(before: Optional[int], after: Optional[int]) -> Optional[int]:
+    """Integer strictly between two neighbours, or None if they are adjacent"""
+    if before is None and after is None:
+        return 0
+    if before is None:
+        return after - POSITION_GAP
+    if after is None:
+        return before + POSITION_GAP
+    if after - before > 1:
+        return (before + after) // 2
+    return None
+
+
+def _neighbours(db: Session, card_id: int, column_id: int, parent_id: Optional[int], index: int) -> Tuple[Optional[int], Optional[int]]:
+    """Positions of the siblings that will sit just before and after ``index``"""
+    query = (select(Card.position)
+             .where(*_siblings(column_id, parent_id), Card.id != card_id)
+             .order_by(Card.position, Card.id))
+    if index <= 0:
+        return None, db.scalar(query.limit(1))
+    rows = db.scalars(query.offset(index - 1).limit(2)).all()
+    if not rows:
+        # Past the end: append after the last sibling
+        return db.scalar(query.order_by(None).order_by(Card.position.desc()).limit(1)), None
+    return rows[0], rows[1] if len(rows) > 1 else None
+
+
+def rebalance(db: Session, column_id: int, parent_id: Optional[int] = None) -> int:
+    """Renumber a sibling list with full spacing; returns the number of rows written"""
+    ids = db.scalars(select(Card.id).where(*_siblings(column_id, parent_id)).order_by(Card.position, Card.id)).all()
+    if ids:
+        db.execute(update(Card), [{"id": cid, "position": i * POSITION_GAP} for i, cid in enumerate(ids)])
+        # Rendered fragments carry data-position, so cached ones are stale now, and
+        # so are the ancestors' fragments, which contain these cards in order
+        mutations.touch_cards(db, ids)
+    return len(ids)
+
+
+def place_card(db: Session, card: Card, column_id: int, index: int, parent_id: Optional[int] = None) -> bool:
+    """
+    Put ``card`` at ``index`` among its new siblings, writing only the card row.
+
+    Falls back to an inline rebalance when the neighbours are adjacent. Returns
+    True when the remaining gap around the card is small enough that the caller
+    should schedule a rebalance of the column.
+    """
+    before, after = _neighbours(db, card.id, column_id, parent_id, index)
+    pos = position_between(before, after)
+    if pos is None:
+        rebalance(db, column_id, parent_id)
+        before, after = _neighbours(db, card.id, column_id, parent_id, index)
+        pos = position_between(before, after)
+    card.column_id = column_id
+    card.position = pos
+    return (before is not None and pos - before < MIN_GAP) or (after is not None and after - pos < MIN_GAP)
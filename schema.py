@@ -0,0 +1,191 @@
+"""
+Database schema setup shared by the web app and the CLI agent.
+
+The schema version lives in ``PRAGMA user_version``. Opening an up-to-date
+database costs one PRAGMA read; an older one runs the missing steps of
+``MIGRATIONS`` in order, in one write transaction, and is stamped as it goes.
+"""
+from sqlalchemy import text, select, insert
+from sqlalchemy.schema import CreateTable
+from typing import Set
+from config import DB_PATH, SCHEMA_VERSION, DONE_COLUMN_ID
+from db import Base, engine, file_lock
+from models import Board, ColumnModel, Card
+import search
+import mutations
+import changes
+import tree
+
+
+def _add_missing_columns(conn) -> Set[str]:
+    """
+    Add model columns (and their indexes) that older databases predate, since
+    create_all never alters tables. Returns the added columns as "table.column".
+    """
+    added = set()
+    for table in Base.metadata.sorted_tables:
+        existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name})"))}
+        if not existing:
+            continue  # a table newer than this database: its migration step creates it
+        missing = [column for column in table.columns if column.name not in existing]
+        for column in missing:
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+            if column.server_default is not None:
+                default = column.server_default.arg
+                ddl += f" NOT NULL DEFAULT {getattr(default, 'text', default)}"
+            conn.execute(text(ddl))
+            added.add(f"{table.name}.{column.name}")
+        if missing:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+    return added
+
+
+def _create_tables(conn) -> None:
+    Base.metadata.create_all(bind=conn)
+
+
+def _add_card_columns(conn) -> None:
+    added = _add_missing_columns(conn)
+    if {"cards.checklist_total", "cards.checklist_done"} & added:
+        # Backfill the denormalized counters for databases created before they existed
+        mutations.recount_checklists(conn)
+
+
+def seed_board(conn) -> None:
+    """Create "My Board" and its columns unless it exists (safe when processes race: INSERT OR IGNORE)"""
+    # The CLI agent addresses these columns as ids 1-3 (todo/doing/done)
+    if conn.execute(select(Board.id).where(Board.name == "My Board")).first():
+        return
+    created = conn.execute(insert(Board).prefix_with("OR IGNORE").values(name="My Board"))
+    if not created.rowcount:
+        return  # another process got there first
+    conn.execute(insert(ColumnModel), [
+        {"board_id": created.inserted_primary_key[0], "name": name, "position": i}
+        for i, name in enumerate(("Todo", "Doing", "Done"))
+    ])
+
+
+# completed_at follows the column on every write path: set on entering Done, cleared on leaving it
+_COMPLETION_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS card_completed_ai AFTER INSERT ON cards
+        WHEN new.column_id = {DONE_COLUMN_ID} AND new.completed_at IS NULL BEGIN
+        UPDATE cards SET completed_at = CURRENT_TIMESTAMP WHERE id = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS card_completed_au AFTER UPDATE OF column_id ON cards
+        WHEN new.column_id IS NOT old.column_id BEGIN
+        UPDATE cards SET completed_at = CASE WHEN new.column_id = {DONE_COLUMN_ID} THEN CURRENT_TIMESTAMP END
+        WHERE id = new.id;
+    END""",
+]
+
+
+def _track_completion(conn) -> None:
+    _add_missing_columns(conn)
+    # Cards already in Done count as completed at upgrade time
+    conn.execute(text(f"UPDATE cards SET completed_at = CURRENT_TIMESTAMP WHERE column_id = {DONE_COLUMN_ID} AND completed_at IS NULL"))
+    for statement in _COMPLETION_TRIGGERS:
+        conn.execute(text(statement))
+
+
+def _add_card_paths(conn) -> None:
+    _add_missing_columns(conn)
+    tree.create_paths(conn)
+
+
+def _extend_change_log(conn) -> None:
+    _add_missing_columns(conn)
+    changes.recreate_triggers(conn)
+
+
+def _autoincrement_card_ids(conn) -> None:
+    """
+    Rebuild ``cards`` with AUTOINCREMENT so the id of a deleted or archived card
+    is never given to a new one (card_cache keys fragments on it). This is
+    SQLite's table rebuild: copy into a new table, drop the old one, rename,
+    then restore its indexes and triggers; ensure_schema runs it with foreign
+    keys off so dropping the table does not cascade to subcards and checklists.
+    """
+    ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE type='table' AND name='cards'")).scalar()
+    if "AUTOINCREMENT" not in ddl.upper():
+        columns = ", ".join(column.name for column in Card.__table__.columns)
+        create = str(CreateTable(Card.__table__).compile(conn)).replace("CREATE TABLE cards", "CREATE TABLE cards_new", 1)
+        conn.execute(text(create))
+        conn.execute(text(f"INSERT INTO cards_new ({columns}) SELECT {columns} FROM cards"))
+        conn.execute(text("DROP TABLE cards"))  # its indexes and triggers go with it
+        # The checklist triggers name cards, which does not exist until the rename: skip checking them
+        conn.execute(text("PRAGMA legacy_alter_table=ON"))
+        conn.execute(text("ALTER TABLE cards_new RENAME TO cards"))
+        conn.execute(text("PRAGMA legacy_alter_table=OFF"))
+        for index in Card.__table__.indexes:
+            index.create(conn)
+        search.recreate_triggers(conn)
+        for statement in _COMPLETION_TRIGGERS:
+            conn.execute(text(statement))
+        changes.recreate_triggers(conn)
+        tree.create_paths(conn)
+    # Start above every id handed out so far, including deleted (logged) and archived cards
+    archived = "(SELECT max(id) FROM archive.cards)" if conn.execute(
+        text("SELECT 1 FROM archive.sqlite_master WHERE type='table' AND name='cards'")).first() else "0"
+    conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'cards'"))
+    conn.execute(text(f"""INSERT INTO sqlite_sequence(name, seq) SELECT 'cards', max(
+        coalesce((SELECT max(id) FROM cards), 0), coalesce((SELECT max(card_id) FROM card_changes), 0),
+        coalesce({archived}, 0))"""))
+
+
+def _drop_due_date_index(conn) -> None:
+    # idx_card_due_date_column (due_at, column_id) serves every due_at query; this one only cost writes
+    conn.execute(text("DROP INDEX IF EXISTS ix_cards_due_at"))
+
+
+# (version, description, step) - append new steps, never edit or reorder old ones.
+# Databases from before the version stamp start at 0 in any of the states below,
+# so these first steps are idempotent.
+MIGRATIONS = [
+    (1, "tables and indexes", _create_tables),
+    (2, "card version and checklist counter columns", _add_card_columns),
+    (3, "full-text search index", search.create_index),
+    (4, "default board with Todo/Doing/Done columns", seed_board),
+    (5, "card change log for live board updates", changes.create_log),
+    (6, "card completion time for clean-up of old Done cards", _track_completion),
+    (7, "search triggers skip checklist items deleted with their card", search.recreate_triggers),
+    (8, "change log of cards and checklist items with changed fields", _extend_change_log),
+    (9, "materialized card paths for subtree queries", _add_card_paths),
+    (10, "card ids never reused (AUTOINCREMENT)", _autoincrement_card_ids),
+    (11, "subcards follow their top-level card's column", tree.follow_columns),
+    (12, "drop the due date index covered by idx_card_due_date_column", _drop_due_date_index),
+    (13, "subcards moved with their card get a new version", tree.recreate_triggers),
+]
+assert MIGRATIONS[-1][0] == SCHEMA_VERSION, "bump config.SCHEMA_VERSION with each migration"
+
+
+def schema_version(conn) -> int:
+    return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+def ensure_schema(bind=engine) -> None:
+    """Bring the database up to SCHEMA_VERSION (a single PRAGMA read when it already is)"""
+    with bind.connect() as conn:
+        if schema_version(conn) >= SCHEMA_VERSION:
+            return
+    # Web workers start together: the file lock lets one of them migrate while
+    # the others wait, and BEGIN IMMEDIATE serializes against processes without
+    # it (the CLI on Windows). Whoever waited re-reads the version and usually
+    # finds nothing to do.
+    with file_lock(f"{DB_PATH}.init-lock"), bind.connect() as conn:
+        # Foreign keys are off while migrating, as table rebuilds require; the
+        # pragma does nothing inside a transaction, so it goes around it
+        conn.execute(text("PRAGMA foreign_keys=OFF"))
+        try:
+            conn.execute(text("BEGIN IMMEDIATE"))
+            version = schema_version(conn)
+            for target, _, step in MIGRATIONS:
+                if target > version:
+                    step(conn)
+                    conn.execute(text(f"PRAGMA user_version = {target}"))
+            if conn.execute(text("PRAGMA foreign_key_check")).first():
+                raise RuntimeError("schema migration left rows with dangling foreign keys")
+            conn.commit()
+        finally:
+            conn.rollback()
+            conn.execute(text("PRAGMA foreign_keys=ON"))
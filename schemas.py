@@ -18,3 +18,12 @@ class CardUpdate(BaseModel):
 
 class ChecklistCreate(BaseModel):
     text: str
+
+class ChecklistBulkItem(ChecklistCreate):
+    card_id: int
+    done: bool = False
+
+class CardMove(BaseModel):
+    card_id: int
+    column_id: int
+    index: int | None = None  # place among the new siblings; None appends at the end
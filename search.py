@@ -0,0 +1,118 @@
+"""
+Full-text search over cards backed by an SQLite FTS5 index.
+
+The ``card_search`` virtual table holds one row per card (rowid == card id)
+with the card title, notes and the concatenated text of its checklist items.
+It is kept in sync by triggers on ``cards`` and ``checklist_items``, so every
+write path (web app, CLI agent, or anything else touching the database) keeps
+the index current without extra code.
+"""
+import re
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SEARCH_TABLE = "card_search"
+
+# Column weights for bm25(): title matches rank above notes, notes above checklist text
+RANK_WEIGHTS = (10.0, 4.0, 2.0)
+
+_CHECKLIST_TEXT = "(SELECT coalesce(group_concat(text, ' '), '') FROM checklist_items WHERE card_id = {ref})"
+
+_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        title, notes, checklist,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS card_search_ai AFTER INSERT ON cards BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, title, notes, checklist)
+        VALUES (new.id, new.title, coalesce(new.notes, ''), '');
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS card_search_au AFTER UPDATE OF title, notes ON cards BEGIN
+        UPDATE {SEARCH_TABLE} SET title = new.title, notes = coalesce(new.notes, '') WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS card_search_ad AFTER DELETE ON cards BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS card_search_checklist_ai AFTER INSERT ON checklist_items BEGIN
+        UPDATE {SEARCH_TABLE} SET checklist = {_CHECKLIST_TEXT.format(ref="new.card_id")} WHERE rowid = new.card_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS card_search_checklist_au AFTER UPDATE OF text, card_id ON checklist_items BEGIN
+        UPDATE {SEARCH_TABLE} SET checklist = {_CHECKLIST_TEXT.format(ref="old.card_id")} WHERE rowid = old.card_id;
+        UPDATE {SEARCH_TABLE} SET checklist = {_CHECKLIST_TEXT.format(ref="new.card_id")} WHERE rowid = new.card_id;
+    END""",
+    # Items deleted along with their card (ON DELETE CASCADE) have no index row left to update
+    f"""CREATE TRIGGER IF NOT EXISTS card_search_checklist_ad AFTER DELETE ON checklist_items
+        WHEN EXISTS (SELECT 1 FROM cards WHERE id = old.card_id) BEGIN
+        UPDATE {SEARCH_TABLE} SET checklist = {_CHECKLIST_TEXT.format(ref="old.card_id")} WHERE rowid = old.card_id;
+    END""",
+]
+
+_BACKFILL = f"""
+    INSERT INTO {SEARCH_TABLE}(rowid, title, notes, checklist)
+    SELECT c.id, c.title, coalesce(c.notes, ''), {_CHECKLIST_TEXT.format(ref="c.id")}
+    FROM cards c
+"""
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def create_index(conn) -> None:
+    """Create the FTS5 table and its sync triggers on a connection, backfilling on first creation"""
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"), {"name": SEARCH_TABLE}
+    ).first()
+    for statement in _DDL:
+        conn.execute(text(statement))
+    if not exists:
+        conn.execute(text(_BACKFILL))
+
+
+def recreate_triggers(conn) -> None:
+    """Replace the sync triggers with their current definitions (the index itself is kept)"""
+    for name in conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE 'card_search_%'"
+    )).scalars().all():
+        conn.execute(text(f"DROP TRIGGER {name}"))
+    for statement in _DDL[1:]:
+        conn.execute(text(statement))
+
+
+def optimize_index(db) -> None:
+    """Merge the index segments, dropping the entries of deleted cards (after bulk deletes)"""
+    db.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES('optimize')"))
+
+
+def match_expression(q: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, each as a prefix"""
+    tokens = _TOKEN_RE.findall(q or "")
+    return " ".join(f'"{tok}"*' for tok in tokens)
+
+
+def query(db: Session, q: str, limit: int = 20) -> List[Dict]:
+    """Return cards matching ``q`` ordered by relevance (best first)"""
+    expr = match_expression(q)
+    if not expr:
+        return []
+    rows = db.execute(text(f"""
+        SELECT c.id, c.title, c.column_id, c.parent_id,
+               snippet({SEARCH_TABLE}, -1, '[', ']', '…', 12) AS snippet,
+               bm25({SEARCH_TABLE}, {", ".join(map(str, RANK_WEIGHTS))}) AS score
+        FROM {SEARCH_TABLE}
+        JOIN cards c ON c.id = {SEARCH_TABLE}.rowid
+        WHERE {SEARCH_TABLE} MATCH :expr
+        ORDER BY score
+        LIMIT :limit
+    """), {"expr": expr, "limit": limit}).mappings().all()
+    return [
+        {
+            "id": r["id"],
+            "title": r["title"],
+            "column_id": r["column_id"],
+            "parent_id": r["parent_id"],
+            "snippet": r["snippet"],
+            "score": round(-r["score"], 6),
+        }
+        for r in rows
+    ]
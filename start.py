@@ -5,6 +5,7 @@ Cross-platform launcher for the Kanban web server
 """
 import os
 import sys
+import argparse
 import subprocess
 import platform
 from pathlib import Path
@@ -37,7 +38,27 @@ def find_python_executable():
 
     return python_exe
 
-def start_server():
+def development_command(python_exe, host, port):
+    """uvicorn command line for development: what ``python app.py`` runs (auto-reload,
+    debug logging), on the requested address"""
+    return [python_exe, "-m", "uvicorn", "app:app", "--host", host, "--port", str(port),
+            "--reload", "--log-level", "debug", "--timeout-graceful-shutdown", "5"]
+
+def production_command(python_exe, host, port, workers):
+    """uvicorn command line for --prod: no reload or file watcher, quiet logs, N worker processes"""
+    command = [python_exe, "-m", "uvicorn", "app:app", "--host", host, "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+               "--timeout-graceful-shutdown", "5"]
+    if has_fast_server(python_exe):
+        command += ["--loop", "uvloop", "--http", "httptools"]
+    return command
+
+def has_fast_server(python_exe):
+    """uvloop and httptools (pip install "uvicorn[standard]"): much faster than the
+    pure-Python event loop and HTTP parser uvicorn otherwise falls back to"""
+    return subprocess.run([python_exe, "-c", "import uvloop, httptools"], capture_output=True).returncode == 0
+
+def start_server(prod=False, workers=1, host="127.0.0.1", port=8000):
     """Start the Kanban web server"""
     python_exe = find_python_executable()
     if not python_exe:
@@ -52,13 +73,19 @@ def start_server():
 
     print("🚀 Starting KanbanLite Server")
     print("============================")
-    print(f"Server will start at: http://127.0.0.1:8000")
+    print(f"Server will start at: http://{host}:{port}")
+    if prod:
+        print(f"Production mode: {workers} worker{'s' if workers != 1 else ''}, no auto-reload")
+        if not has_fast_server(python_exe):
+            print("💡 pip install \"uvicorn[standard]\" for the faster uvloop event loop and httptools parser")
     print(f"Press Ctrl+C to stop the server")
     print()
 
     try:
-        # Start the FastAPI server
-        subprocess.run([python_exe, app_path], cwd=script_dir)
+        if prod:
+            subprocess.run(production_command(python_exe, host, port, workers), cwd=script_dir)
+        else:
+            subprocess.run(development_command(python_exe, host, port), cwd=script_dir)
         return True
     except KeyboardInterrupt:
         print("\n👋 Server stopped")
@@ -69,9 +96,19 @@ def start_server():
 
 def main():
     """Main entry point"""
-    if not start_server():
+    parser = argparse.ArgumentParser(description="Start the KanbanLite web server")
+    parser.add_argument("--prod", action="store_true", help="production mode: no auto-reload, quiet logs, --workers processes")
+    parser.add_argument("--workers", type=int, help="worker processes in --prod mode (default: CPU count)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    if args.workers and not args.prod:
+        parser.error("--workers needs --prod (the development server runs a single reloading process)")
+    workers = args.workers or os.cpu_count() or 1
+
+    if not start_server(args.prod, workers, args.host, args.port):
         print("\n❌ Failed to start server")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -43,9 +43,14 @@ async function dropCard(ev){
   
   const cardEl = document.querySelector(`.card[data-card="${cardId}"]`);
   cardEl.style.opacity = '1';
+  const oldColId = cardEl.closest('.col').dataset.col;
   
   const dropZone = col.querySelector(".drop");
-  dropZone.appendChild(cardEl);
+  appendToColumn(dropZone, cardEl);
+  if (oldColId !== colId) {
+    updateCardCount(oldColId, -1);
+    updateCardCount(colId, 1);
+  }
   
   // Add slide animation
   cardEl.style.transform = 'translateY(-10px)';
@@ -134,8 +139,8 @@ async function submitNewCard(event, columnId) {
       temp.innerHTML = html;
       const newCard = temp.firstElementChild;
 
-      // Insert at beginning of drop zone
-      column.insertBefore(newCard, column.firstChild);
+      // New cards go to the end of the column, where the server puts them
+      appendToColumn(column, newCard);
 
       // Add checklist items if any exist
       if (checklistItems.length > 0) {
@@ -152,7 +157,7 @@ async function submitNewCard(event, columnId) {
           }
         }
         // Refresh the card to show checklist
-        location.reload();
+        await refreshCard(cardId);
       } else {
         // Animate in
         newCard.style.transform = 'translateY(-20px)';
@@ -164,7 +169,7 @@ async function submitNewCard(event, columnId) {
       }
 
       showToast('Card added successfully!', 'success');
-      updateCardCount(columnId);
+      updateCardCount(columnId, 1);
     } else {
       showToast('Error adding card', 'error');
     }
@@ -378,16 +383,39 @@ function cancelEdit(cardElement) {
   currentlyEditing = null;
 }
 
-// Update card count in column header
-function updateCardCount(columnId) {
+// Update card count in column header. Columns are loaded a page at a time, so
+// the server-side count is adjusted rather than recounted from the DOM.
+function updateCardCount(columnId, delta) {
   const column = document.querySelector(`[data-col="${columnId}"]`);
-  const cards = column.querySelectorAll('.card');
-  const countElement = column.querySelector('.card-count');
+  const countElement = column && column.querySelector('.card-count');
   if (countElement) {
-    countElement.textContent = `(${cards.length})`;
+    const current = parseInt(countElement.textContent.replace(/[()]/g, ''), 10) || 0;
+    countElement.textContent = `(${Math.max(0, current + delta)})`;
+  }
+  const total = document.querySelector('.global-stats .stat');
+  if (total) {
+    const counts = Array.from(document.querySelectorAll('.card-count'))
+      .map(el => parseInt(el.textContent.replace(/[()]/g, ''), 10) || 0);
+    total.textContent = `Total: ${counts.reduce((a, b) => a + b, 0)}`;
   }
 }
 
+// Add a card at the end of the loaded part of a column (before the "load more" sentinel)
+function appendToColumn(dropZone, cardEl) {
+  dropZone.insertBefore(cardEl, dropZone.querySelector(':scope > .load-more'));
+}
+
+// A lazily loaded page can repeat a card the user already dropped into view
+document.addEventListener('htmx:afterSwap', function() {
+  document.querySelectorAll('.drop').forEach(dropZone => {
+    const seen = new Set();
+    dropZone.querySelectorAll(':scope > .card').forEach(card => {
+      if (seen.has(card.dataset.card)) card.remove();
+      else seen.add(card.dataset.card);
+    });
+  });
+});
+
 // Quick Actions
 async function quickDelete(cardId) {
   if (!confirm('Delete this card?')) return;
@@ -399,15 +427,13 @@ async function quickDelete(cardId) {
     
     if (response.ok) {
       const cardElement = document.querySelector(`[data-card="${cardId}"]`);
+      const isTopLevel = cardElement.parentElement.classList.contains('drop');
+      const colId = cardElement.closest('.col').dataset.col;
       cardElement.style.transform = 'scale(0.8)';
       cardElement.style.opacity = '0';
       setTimeout(() => {
         cardElement.remove();
-        // Update card counts
-        document.querySelectorAll('.col').forEach(col => {
-          const colId = col.dataset.col;
-          updateCardCount(colId);
-        });
+        if (isTopLevel) updateCardCount(colId, -1);
       }, 200);
     }
   } catch (error) {
@@ -425,7 +451,7 @@ async function quickMove(cardId, newColumnId) {
     const newDropZone = newColumn.querySelector('.drop');
     
     // Move the card visually
-    newDropZone.appendChild(cardElement);
+    appendToColumn(newDropZone, cardElement);
     
     // Animate the move
     cardElement.style.transform = 'scale(1.05)';
@@ -443,10 +469,10 @@ async function quickMove(cardId, newColumnId) {
       })
     });
     
-    if (response.ok) {
+    if (response.ok && oldColumn.dataset.col !== String(newColumnId)) {
       // Update card counts
-      updateCardCount(oldColumn.dataset.col);
-      updateCardCount(newColumnId);
+      updateCardCount(oldColumn.dataset.col, -1);
+      updateCardCount(newColumnId, 1);
     }
   } catch (error) {
     console.error('Error moving card:', error);
@@ -618,12 +644,13 @@ async function addChecklistItem(event, cardId) {
         // Add to existing checklist
         checklistUl.insertAdjacentHTML('beforeend', itemHtml);
       } else {
-        // Replace card (first checklist item)
-        location.reload(); // Temporary - should replace with better solution
+        // First checklist item: the card grows a checklist section
+        await refreshCard(cardId);
       }
 
       input.value = '';
-      updateChecklistProgress(form.closest('.card'));
+      const card = document.querySelector(`.card[data-card="${cardId}"]`);
+      if (card) updateChecklistProgress(card);
       showToast('Item added', 'success', 1500);
     }
   } catch (error) {
@@ -673,34 +700,150 @@ function updateChecklistProgress(card) {
   }
 }
 
-// Search functionality
+// Search functionality (server-side full-text index, see GET /search)
 function initSearch() {
   const searchInput = document.getElementById('search-input');
   if (searchInput) {
-    searchInput.addEventListener('input', debounce(function() {
-      const query = this.value.toLowerCase();
+    searchInput.addEventListener('input', debounce(async function() {
+      const query = this.value.trim();
       const cards = document.querySelectorAll('.card');
 
-      cards.forEach(card => {
-        const title = card.querySelector('strong').textContent.toLowerCase();
-        const notes = card.querySelector('.card-notes');
-        const notesText = notes ? notes.textContent.toLowerCase() : '';
-
-        if (title.includes(query) || notesText.includes(query)) {
+      if (!query) {
+        cards.forEach(card => {
           card.style.display = '';
           card.classList.remove('filtered-out');
-        } else {
-          card.style.display = query ? 'none' : '';
-          card.classList.toggle('filtered-out', !!query);
+        });
+        return;
+      }
+
+      let hits;
+      try {
+        const response = await fetch(`/search?q=${encodeURIComponent(query)}&limit=500`);
+        if (!response.ok) throw new Error('Search failed');
+        const data = await response.json();
+        hits = new Set(data.results.map(r => String(r.id)));
+      } catch (error) {
+        console.error('Error searching cards:', error);
+        showToast('Search failed', 'error');
+        return;
+      }
+      // Ignore responses for queries the user has already typed past
+      if (this.value.trim() !== query) return;
+
+      cards.forEach(card => {
+        const match = hits.has(card.dataset.card);
+        card.style.display = match ? '' : 'none';
+        card.classList.toggle('filtered-out', !match);
+      });
+
+      // Keep the parents of matching subcards visible
+      cards.forEach(card => {
+        if (!hits.has(card.dataset.card)) return;
+        let parent = card.parentElement.closest('.card');
+        while (parent) {
+          parent.style.display = '';
+          parent.classList.remove('filtered-out');
+          parent = parent.parentElement.closest('.card');
         }
       });
     }, 300));
   }
 }
 
+// Swap a card element for a freshly rendered fragment, keeping its selection
+function swapCard(cardEl, html) {
+  const temp = document.createElement('div');
+  temp.innerHTML = html;
+  const fresh = temp.firstElementChild;
+  if (cardEl.classList.contains('selected')) fresh.classList.add('selected');
+  cardEl.replaceWith(fresh);
+  return fresh;
+}
+
+// Re-render one card from the server (GET /cards/{id})
+async function refreshCard(cardId) {
+  const cardEl = document.querySelector(`.card[data-card="${cardId}"]`);
+  if (!cardEl) return;
+  try {
+    const response = await fetch(`/cards/${cardId}`);
+    if (response.ok) swapCard(cardEl, await response.text());
+  } catch (error) {
+    console.error('Error refreshing card:', error);
+  }
+}
+
+// Live updates: the server streams every card change, made in this tab, another
+// tab or the CLI agent, as a re-rendered fragment (GET /events).
+function placeCard(data) {
+  const existing = document.querySelector(`.drop > .card[data-card="${data.card_id}"]`);
+  // Never yank a card out from under an open editor
+  if (existing && existing.classList.contains('editing')) return;
+
+  const dropZone = document.getElementById(`col-${data.column_id}`);
+  if (!dropZone) return;
+  if (existing && existing.parentElement === dropZone && Number(existing.dataset.position) === data.position) {
+    swapCard(existing, data.html);
+    return;
+  }
+
+  // Position among the loaded siblings; past the last loaded card it belongs to a page not loaded yet
+  const next = Array.from(dropZone.querySelectorAll(':scope > .card')).find(card =>
+    card !== existing && Number(card.dataset.position) > data.position);
+  if (!next && dropZone.querySelector(':scope > .load-more')) {
+    if (existing) existing.remove();
+    return;
+  }
+  const temp = document.createElement('div');
+  temp.innerHTML = data.html;
+  const fresh = temp.firstElementChild;
+  if (existing) {
+    if (existing.classList.contains('selected')) fresh.classList.add('selected');
+    existing.remove();
+  }
+  if (next) dropZone.insertBefore(fresh, next);
+  else appendToColumn(dropZone, fresh);
+}
+
+function setCounts(counts) {
+  let total = 0;
+  for (const [columnId, count] of Object.entries(counts)) {
+    const countElement = document.querySelector(`[data-col="${columnId}"] .card-count`);
+    if (countElement) countElement.textContent = `(${count})`;
+    total += count;
+  }
+  const totalElement = document.querySelector('.global-stats .stat');
+  if (totalElement) totalElement.textContent = `Total: ${total}`;
+}
+
+function initLiveUpdates() {
+  const board = document.querySelector('.board[data-change-id]');
+  if (!board || !window.EventSource) return;
+  // Start right after the change the page was rendered at; reconnects resume from Last-Event-ID
+  const source = new EventSource(`/events?since=${board.dataset.changeId}`);
+  source.addEventListener('card', ev => {
+    const data = JSON.parse(ev.data);
+    if (data.op === 'upsert') {
+      placeCard(data);
+    } else if (data.op === 'nested') {
+      const stale = document.querySelector(`.drop > .card[data-card="${data.card_id}"]`);
+      if (stale) stale.remove();
+    } else {
+      const gone = document.querySelector(`.card[data-card="${data.card_id}"]`);
+      if (gone) gone.remove();
+    }
+  });
+  source.addEventListener('counts', ev => setCounts(JSON.parse(ev.data)));
+  // Sent when too much changed to replay card by card
+  source.addEventListener('reload', () => {
+    source.close();
+    location.reload();
+  });
+}
+
 // Initialize when page loads
 document.addEventListener('DOMContentLoaded', function() {
   initSearch();
+  initLiveUpdates();
 
   // Add event listeners for card selection
   document.addEventListener('click', function(ev) {
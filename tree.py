@@ -0,0 +1,188 @@
+"""
+Materialized paths for nested cards.
+
+Every card stores ``path``: the ids from its top-level card down to itself,
+each followed by a slash ("12/40/41/"). Triggers keep it current on every
+write path. On insert a card takes its parent's path plus its own id. When
+``parent_id`` changes, the card's whole subtree is rewritten in one UPDATE. A
+move that would put a card under itself or one of its own subcards is rejected.
+When ``column_id`` changes the subtree follows, and the write paths put a new
+or moved subcard in its parent's column (parent_columns), so subcards are
+always in their top-level card's column. Deletes need
+nothing: ON DELETE CASCADE removes the subtree.
+
+A card's subtree is then one range on the path index, whatever its depth: the
+paths from P up to, but not including, P with its final slash replaced by "0"
+("12/" up to "120": "12/40/" is inside, "123/" is not).
+"""
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select, func, and_, text
+from sqlalchemy.orm import Session, aliased
+from models import Card
+from mutations import touch_cards
+import ordering
+
+_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS card_path_ai AFTER INSERT ON cards BEGIN
+        UPDATE cards SET path = coalesce((SELECT path FROM cards WHERE id = new.parent_id), '') || new.id || '/'
+        WHERE id = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS card_path_bu BEFORE UPDATE OF parent_id ON cards
+        WHEN new.parent_id IS NOT NULL AND (SELECT path FROM cards WHERE id = new.parent_id)
+            BETWEEN old.path AND substr(old.path, 1, length(old.path) - 1) || '0' BEGIN
+        SELECT RAISE(ABORT, 'a card cannot become a subcard of itself or of its own subcards');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS card_path_au AFTER UPDATE OF parent_id ON cards
+        WHEN new.parent_id IS NOT old.parent_id BEGIN
+        UPDATE cards SET path = coalesce((SELECT path FROM cards WHERE id = new.parent_id), '') || new.id || '/'
+                                || substr(path, length(old.path) + 1)
+        WHERE path >= old.path AND path < substr(old.path, 1, length(old.path) - 1) || '0';
+    END""",
+    # The card's stored path, not new.path: card_path_au may already have rewritten the subtree.
+    # The version bump retires the subcards' cached fragments (card_cache), which show the column.
+    """CREATE TRIGGER IF NOT EXISTS card_path_column_au AFTER UPDATE OF column_id ON cards
+        WHEN new.column_id IS NOT old.column_id BEGIN
+        UPDATE cards SET column_id = new.column_id, version = version + 1
+        WHERE path > (SELECT path FROM cards WHERE id = new.id)
+          AND path < (SELECT substr(path, 1, length(path) - 1) || '0' FROM cards WHERE id = new.id)
+          AND column_id IS NOT new.column_id;
+    END""",
+]
+
+
+def create_paths(conn) -> None:
+    """Install the path triggers and fill in the path of every existing card (parents first)"""
+    for statement in _TRIGGERS:
+        conn.execute(text(statement))
+    conn.execute(text("""
+        WITH RECURSIVE tree(id, path) AS (
+            SELECT id, id || '/' FROM cards WHERE parent_id IS NULL
+            UNION ALL
+            SELECT c.id, tree.path || c.id || '/' FROM cards c JOIN tree ON c.parent_id = tree.id
+        )
+        UPDATE cards SET path = (SELECT path FROM tree WHERE tree.id = cards.id)
+    """))
+
+
+def recreate_triggers(conn) -> None:
+    """Replace the path triggers with their current definitions"""
+    for name in conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE 'card_path_%'"
+    )).scalars().all():
+        conn.execute(text(f"DROP TRIGGER {name}"))
+    for statement in _TRIGGERS:
+        conn.execute(text(statement))
+
+
+def parent_columns(db: Session, parent_ids: Iterable[Optional[int]]) -> Dict[int, int]:
+    """Column of each existing parent in ``parent_ids``: the column its subcards must be in"""
+    ids = {parent_id for parent_id in parent_ids if parent_id is not None}
+    return dict(db.execute(select(Card.id, Card.column_id).where(Card.id.in_(ids))).all()) if ids else {}
+
+
+def follow_columns(conn) -> None:
+    """Install the triggers and move every subcard into its top-level card's column"""
+    for statement in _TRIGGERS:
+        conn.execute(text(statement))
+    conn.execute(text("""
+        UPDATE cards SET version = version + 1,
+                         column_id = (SELECT root.column_id FROM cards root
+                                      WHERE root.path = substr(cards.path, 1, instr(cards.path, '/')))
+        WHERE parent_id IS NOT NULL AND column_id IS NOT (SELECT root.column_id FROM cards root
+                                                         WHERE root.path = substr(cards.path, 1, instr(cards.path, '/')))
+    """))
+
+
+# The card a subtree hangs from; one alias for all queries (building a fresh one per query costs more than the query)
+_root = aliased(Card, name="root")
+
+
+def _upper(path):
+    """Exclusive upper bound of the subtree range starting at ``path`` (a string or SQL expression)"""
+    if isinstance(path, str):
+        return path[:-1] + "0"
+    return func.substr(path, 1, func.length(path) - 1).concat("0")
+
+
+def within(path_column, path):
+    """Condition: ``path_column`` lies in the subtree whose root has ``path`` (the root included)"""
+    return and_(path_column >= path, path_column < _upper(path))
+
+
+def subtree_ids(root_ids):
+    """SELECT of the ids of the cards selected by ``root_ids`` and all their descendants"""
+    return select(Card.id).join(_root, within(Card.path, _root.path)).where(_root.id.in_(root_ids))
+
+
+def depth(path: str) -> int:
+    """0 for a top-level card, 1 for its subcards, ..."""
+    return path.count("/") - 1
+
+
+def _counts(card_ids):
+    return (
+        select(_root.id, func.count(Card.id) - 1, func.sum(Card.checklist_total), func.sum(Card.checklist_done))
+        .join(Card, within(Card.path, _root.path)).where(_root.id.in_(list(card_ids))).group_by(_root.id)
+    )
+
+
+def subtree_counts(db: Session, card_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """
+    Per card: the number of subcards at any depth and the checklist items of
+    the whole subtree (the card's own included), in one statement. Cards that
+    do not exist are left out.
+    """
+    return {
+        card_id: {"descendants": descendants, "checklist_total": total, "checklist_done": done,
+                  "checklist_open": total - done}
+        for card_id, descendants, total, done in db.execute(_counts(card_ids)).all()
+    }
+
+
+def load_subtree(db: Session, card_id: int) -> List[Card]:
+    """A card and all its descendants, parents before children and siblings in order (one statement)"""
+    path = db.scalar(select(Card.path).where(Card.id == card_id))
+    if path is None:
+        return []
+    cards = db.scalars(select(Card).where(within(Card.path, path))).all()
+    by_parent: Dict[Optional[int], List[Card]] = {}
+    for card in cards:
+        by_parent.setdefault(card.parent_id, []).append(card)
+    ordered, pending = [], [card for card in cards if card.id == card_id]
+    while pending:
+        card = pending.pop()
+        ordered.append(card)
+        pending.extend(sorted(by_parent.get(card.id, []), key=lambda c: (c.position, c.id), reverse=True))
+    return ordered
+
+
+def reparent(db: Session, card: Card, parent_id: Optional[int], index: Optional[int] = None,
+             column_id: Optional[int] = None) -> bool:
+    """
+    Move ``card`` and its subtree under ``parent_id`` (None: to the top level
+    of ``column_id``, by default its own column), at ``index`` among the new
+    siblings or at the end. The subtree takes the new parent's column. Raises
+    ValueError for a missing parent or one inside the card's own subtree. Bumps
+    the versions of the old and new ancestors; does not commit. Returns
+    place_card's hint that the new siblings need a rebalance.
+    """
+    if parent_id is not None:
+        parent = db.execute(select(Card.path, Card.column_id).where(Card.id == parent_id)).first()
+        if parent is None:
+            raise ValueError(f"Parent card {parent_id} not found")
+        if parent.path.startswith(db.scalar(select(Card.path).where(Card.id == card.id))):
+            raise ValueError("A card cannot become a subcard of itself or of its own subcards")
+        column_id = parent.column_id
+    elif column_id is None:
+        column_id = card.column_id
+
+    touch_cards(db, [card.parent_id])
+    card.parent_id = parent_id
+    tight = False
+    if index is None:
+        card.column_id, card.position = column_id, ordering.next_position(db, column_id, parent_id)
+    else:
+        tight = ordering.place_card(db, card, column_id, index, parent_id)
+    db.flush()  # the path triggers rewrite the subtree and move it to the card's column
+    touch_cards(db, [card.id])
+    return tight